@@ -0,0 +1,128 @@
+#!/usr/bin/env python
+"""
+Per-message cost of getting a message from the Python thread onto
+SwiftSocket's event loop: the old ``queue.Queue`` + ``asyncio.to_thread()``
+producer (one worker-thread handoff, plus a fresh producer task raced
+against a long-lived consumer task, per message) against
+:class:`swift.LoopChannel` (``get_nowait()`` while anything is queued, one
+``call_soon_threadsafe`` wakeup otherwise).
+
+No browser or websocket involved -- the loop side just records when each
+message arrived, which isolates the bridge itself. Run directly::
+
+    python benchmarks/bench_channel.py [--rate 5000] [--seconds 2]
+
+Reports median/p99 put-to-receive latency and the process CPU time spent
+per message (both threads together) at a steady send rate.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from queue import Empty, Queue
+from typing import Any, Callable
+
+from swift import LoopChannel
+
+
+def _sender(put: Callable[[Any], None], rate: float, count: int) -> None:
+    # Paced rather than flat out -- the interesting regime is a steady
+    # stream of small messages (step() at a high rate). Sleeps between
+    # 1ms ticks, sending whatever is due, so the sender itself costs
+    # next to no CPU and process_time() is left measuring the bridge.
+    start = time.perf_counter()
+    sent = 0
+    while sent < count:
+        due = min(count, int((time.perf_counter() - start) * rate) + 1)
+        while sent < due:
+            put(time.perf_counter())
+            sent += 1
+        time.sleep(0.001)
+    put(None)
+
+
+async def _old_loop(q: Queue, latencies: list[float]) -> None:
+    # The pre-LoopChannel SwiftSocket.serve() shape: every message costs
+    # a producer task and a to_thread() handoff, raced against a
+    # long-lived consumer task.
+    closed = asyncio.get_running_loop().create_future()
+    while True:
+        producer = asyncio.ensure_future(asyncio.to_thread(q.get))
+        await asyncio.wait([producer, closed], return_when=asyncio.FIRST_COMPLETED)
+        sent = producer.result()
+        if sent is None:
+            return
+        latencies.append(time.perf_counter() - sent)
+
+
+async def _new_loop(channel: LoopChannel, latencies: list[float]) -> None:
+    channel.bind(asyncio.get_running_loop())
+    closed = asyncio.get_running_loop().create_future()
+    while True:
+        try:
+            sent = channel.get_nowait()
+        except Empty:
+            ready = channel.ready()
+            await asyncio.wait([ready, closed], return_when=asyncio.FIRST_COMPLETED)
+            continue
+        if sent is None:
+            return
+        latencies.append(time.perf_counter() - sent)
+
+
+def _run(
+    name: str, make: Callable[[], Any], loop_fn: Any, rate: float, count: int
+) -> None:
+    q = make()
+    latencies: list[float] = []
+    started = threading.Event()
+
+    def loop_thread() -> None:
+        async def main() -> None:
+            task = asyncio.ensure_future(loop_fn(q, latencies))
+            await asyncio.sleep(0)
+            started.set()
+            await task
+
+        asyncio.run(main())
+
+    t = threading.Thread(target=loop_thread)
+    t.start()
+    started.wait()
+    cpu0 = time.process_time()
+    wall0 = time.perf_counter()
+    sender = threading.Thread(target=_sender, args=(q.put, rate, count))
+    sender.start()
+    sender.join()
+    t.join()
+    wall = time.perf_counter() - wall0
+    cpu = time.process_time() - cpu0
+
+    lat = sorted(latencies)
+    print(
+        f"{name:>12}: median {statistics.median(lat) * 1e6:7.1f} us  "
+        f"p99 {lat[int(len(lat) * 0.99)] * 1e6:8.1f} us  "
+        f"cpu {cpu / count * 1e6:6.1f} us/msg ({cpu / wall:.0%} of a core)"
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--rate", type=float, default=5000.0, help="messages per second"
+    )
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+    count = int(args.rate * args.seconds)
+
+    print(f"{count} messages at {args.rate:.0f}/s")
+    _run("to_thread", Queue, _old_loop, args.rate, count)
+    _run("LoopChannel", LoopChannel, _new_loop, args.rate, count)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python
+"""
+Bytes on the wire and delivery latency per message type, with the Swift
+socket's permessage-deflate off, on for every message, and on above
+``launch(compression_threshold=)`` (the default).
+
+Bytes are what :class:`swift.SwiftRoute.ThresholdDeflate` actually
+produces for each payload (context takeover included, so a message's
+size depends on the ones before it, as on a real connection). Latency is
+measured end to end: put on Swift's outq -> received and decoded by a
+websockets client over loopback, which stands in for the browser. Run
+directly::
+
+    python benchmarks/bench_compression.py [--repeat 50] [--threshold 1024]
+
+Message types: a control message (``sim_time``), a UI element update, a
+Panda's ``"shape"`` part list, a 5000-point Polyline, and a 500-part
+``"shape_poses"`` frame as JSON and as a binary frame.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from queue import Queue
+from typing import Any, Callable
+
+import numpy as np
+import roboticstoolbox as rtb
+import spatialgeometry as sg
+import websockets
+from websockets.frames import Frame, Opcode
+
+from swift import LoopChannel, SwiftSocket
+from swift.Swift import _FRAME_SHAPE_POSES, _pack_pose_frame, _pack_pose_json
+from swift.SwiftRoute import ThresholdDeflate
+
+
+def _messages() -> dict[str, Callable[[np.random.Generator], Any]]:
+    # name -> function building a fresh [code, data] message. Poses are
+    # random each call so repeated frames can't just be back-references
+    # into the compressor's window.
+    panda = rtb.models.Panda()
+    panda_parts = panda._to_dict(robot_alpha=1.0, collision_alpha=0.0)
+    path = sg.Polyline(np.cumsum(np.full((3, 5000), 0.001), axis=1), radius=0.01)
+    path_parts = [path.to_dict()]
+    runs = [(i, 0, 1) for i in range(500)]
+
+    return {
+        "sim_time": lambda rng: ["sim_time", float(rng.random())],
+        "update_element": lambda rng: [
+            "update_element",
+            {"id": "3", "value": float(rng.random()), "label": "Speed"},
+        ],
+        "shape (panda)": lambda rng: ["shape", panda_parts],
+        "shape (polyline)": lambda rng: ["shape", path_parts],
+        "shape_poses json": lambda rng: [
+            "shape_poses",
+            _pack_pose_json(runs, rng.random((500, 7))),
+        ],
+        "shape_poses binary": lambda rng: [
+            "shape_poses",
+            _pack_pose_frame(_FRAME_SHAPE_POSES, runs, rng.random((500, 7)), 0),
+        ],
+    }
+
+
+def _payload(msg: list[Any]) -> bytes:
+    # What SwiftSocket sends: the packed frame itself, or the JSON text.
+    if isinstance(msg[1], bytes):
+        return msg[1]
+    return json.dumps(msg).encode()
+
+
+def _wire_bytes(
+    make: Callable[[np.random.Generator], Any], threshold: int | None, repeat: int
+) -> float:
+    rng = np.random.default_rng(0)
+    if threshold is None:
+        return statistics.mean(len(_payload(make(rng))) for _ in range(repeat))
+    ext = ThresholdDeflate(False, False, 12, 12, {"memLevel": 5}, threshold=threshold)
+    sizes = []
+    for _ in range(repeat):
+        data = _payload(make(rng))
+        opcode = Opcode.BINARY if data[:1] != b"[" else Opcode.TEXT
+        sizes.append(len(ext.encode(Frame(opcode, data)).data))
+    return statistics.mean(sizes)
+
+
+def _latencies(
+    messages: dict[str, Callable[[np.random.Generator], Any]],
+    threshold: int | None,
+    repeat: int,
+) -> dict[str, list[float]]:
+    outq, inq = LoopChannel(), Queue()
+    t = threading.Thread(
+        target=SwiftSocket,
+        args=(outq, inq, lambda: True, threading.Event(), None, None, None, threshold),
+        daemon=True,
+    )
+    t.start()
+    port, instance = inq.get(timeout=5)
+
+    result: dict[str, list[float]] = {}
+
+    async def client() -> None:
+        # max_size=None -- the Panda part list alone is well over
+        # websockets' 1 MiB default.
+        async with websockets.connect(f"ws://localhost:{port}/", max_size=None) as ws:
+            await ws.send("Connected")
+            rng = np.random.default_rng(0)
+            for name, make in messages.items():
+                samples = result[name] = []
+                for _ in range(repeat):
+                    msg = make(rng)
+                    sent = time.perf_counter()
+                    outq.put([None, msg])
+                    raw = await ws.recv()
+                    if isinstance(raw, str):
+                        json.loads(raw)
+                    samples.append(time.perf_counter() - sent)
+
+    asyncio.run(client())
+    instance.stop()
+    t.join(timeout=3)
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=50, help="messages of each type")
+    parser.add_argument("--threshold", type=int, default=1024)
+    args = parser.parse_args()
+
+    messages = _messages()
+    modes = {"off": None, "all": 0, f">= {args.threshold} B": args.threshold}
+    latencies = {
+        mode: _latencies(messages, threshold, args.repeat)
+        for mode, threshold in modes.items()
+    }
+
+    print(f"{'message':>20}  {'mode':>10}  {'bytes':>10}  {'median':>10}  {'p99':>10}")
+    for name, make in messages.items():
+        for mode, threshold in modes.items():
+            lat = sorted(latencies[mode][name])
+            size = _wire_bytes(make, threshold, args.repeat)
+            print(
+                f"{name:>20}  {mode:>10}  {size:10.0f}  "
+                f"{statistics.median(lat) * 1e6:7.0f} us  "
+                f"{lat[int(len(lat) * 0.99)] * 1e6:7.0f} us"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+#!/usr/bin/env python
+"""
+Time for a headless Swift to step N callback-posed markers: one
+``add_shape(..., callback=)`` per marker, each returning an ``SE3``, against
+a single ``add_shapes(..., callback=)`` returning all N poses as one
+``(N, 4, 4)`` or ``(N, 7)`` array. Both callbacks compute the same circular
+orbit. Run directly::
+
+    python benchmarks/bench_group_callback.py [--repeat 20] [--sizes 100 1000 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import spatialgeometry as sg
+import spatialmath as sm
+
+from swift import Swift
+
+
+def _env() -> Swift:
+    env = Swift()
+    env.launch(headless=True)
+    return env
+
+
+def _markers(n: int) -> list[sg.Shape]:
+    return [sg.Sphere(0.01) for _ in range(n)]
+
+
+def _orbit(n: int, t: float) -> np.ndarray:
+    angle = np.linspace(0, 2 * np.pi, n, endpoint=False) + t
+    return np.column_stack((np.cos(angle), np.sin(angle), np.zeros(n)))
+
+
+def _per_shape(n: int) -> Swift:
+    env = _env()
+    for k, marker in enumerate(_markers(n)):
+        phase = 2 * np.pi * k / n
+        env.add_shape(
+            marker,
+            callback=lambda t, values, phase=phase: sm.SE3(
+                np.cos(phase + t), np.sin(phase + t), 0
+            ),
+        )
+    return env
+
+
+def _grouped(n: int, width: int) -> Swift:
+    def transforms(t, values):
+        poses = np.tile(np.eye(4), (n, 1, 1))
+        poses[:, :3, 3] = _orbit(n, t)
+        return poses
+
+    def rows(t, values):
+        poses = np.zeros((n, 7))
+        poses[:, :3] = _orbit(n, t)
+        poses[:, 6] = 1.0
+        return poses
+
+    env = _env()
+    env.add_shapes(_markers(n), callback=transforms if width == 16 else rows)
+    return env
+
+
+def _time(env: Swift, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        env.step(0.01)
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20, help="steps timed per case")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(
+        f"{'shapes':>8}  {'per shape':>12}  {'group (N,4,4)':>14}  {'group (N,7)':>12}"
+    )
+    for n in args.sizes:
+        per_shape = _time(_per_shape(n), args.repeat)
+        transforms = _time(_grouped(n, 16), args.repeat)
+        rows = _time(_grouped(n, 7), args.repeat)
+        print(
+            f"{n:>8}  {per_shape * 1e3:9.2f} ms  {transforms * 1e3:11.2f} ms  "
+            f"{rows * 1e3:9.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
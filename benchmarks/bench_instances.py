@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+Per-step cost on the Python side of N moving markers in a headless Swift:
+N separate shapes posed by one ``add_shapes()`` group callback, against
+N copies of one shape from ``add_instances()`` posed by its callback --
+``step`` is the simulation step, ``frame`` gathering the frame's pose
+rows. The browser side is where instancing pays off most (one draw call
+for every copy rather than one per shape), which this can't measure.
+Run directly::
+
+    python benchmarks/bench_instances.py [--repeat 50] [--sizes 100 1000 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import spatialgeometry as sg
+
+from swift import Swift
+
+
+def _env(n: int, instanced: bool) -> Swift:
+    env = Swift()
+    env.launch(headless=True)
+    rng = np.random.default_rng(0)
+    start = rng.uniform(-1, 1, (n, 3))
+
+    def callback(t, values):
+        rows = np.zeros((n, 7))
+        rows[:, :3] = start + np.sin(t)
+        rows[:, 6] = 1.0
+        return rows
+
+    if instanced:
+        env.add_instances(
+            sg.Sphere(0.01),
+            np.c_[start, np.zeros((n, 3)), np.ones(n)],
+            callback=callback,
+        )
+    else:
+        env.add_shapes([sg.Sphere(0.01) for _ in range(n)], callback=callback)
+    return env
+
+
+def _median(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=50, help="steps timed per case")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    columns = ["step shapes", "frame shapes", "step instances", "frame instances"]
+    print(f"{'markers':>8}" + "".join(f"{c:>17}" for c in columns))
+    for n in args.sizes:
+        row = []
+        for instanced in (False, True):
+            env = _env(n, instanced)
+            row.append(_median(lambda: env.step(0.01), args.repeat))
+            row.append(_median(env._frame_poses, args.repeat))
+        print(f"{n:>8}" + "".join(f"{t * 1e3:14.2f} ms" for t in row))
+
+
+if __name__ == "__main__":
+    main()
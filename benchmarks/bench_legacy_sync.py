@@ -0,0 +1,75 @@
+#!/usr/bin/env python
+"""
+Per-step cost of checking N robot handles for the deprecated robot.q /
+robot.qd direct-mutation style: by default (``add_robot(robot)``, only a
+reassigned ``robot.q``/``robot.qd``/``robot.control_mode`` is looked at,
+found by identity) against ``add_robot(robot, legacy=True)`` (every
+robot's ``q``/``qd`` compared by value each step, as before). Every handle
+is driven the modern way, velocity-controlled through ``handle.qd``, so
+neither ever finds a legacy write. ``sync`` is the store-wide check
+``step()`` makes once, ``handles`` the one ``AssemblyHandle._sync_legacy()``
+per handle a frame makes for callback-driven robots. Run directly::
+
+    python benchmarks/bench_legacy_sync.py [--repeat 200] [--sizes 10 100 1000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import roboticstoolbox as rtb
+
+from swift import Swift
+
+
+def _env(n: int, legacy: bool) -> Swift:
+    env = Swift()
+    env.launch(headless=True)
+    panda = rtb.models.Panda()
+    for _ in range(n):
+        handle = env.add_robot(panda, legacy=legacy)
+        handle.qd[:] = 0.01
+    return env
+
+
+def _median(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=200, help="calls timed per case")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10, 100, 1000])
+    args = parser.parse_args()
+
+    columns = [
+        "sync",
+        "handles",
+        "step",
+        "sync legacy",
+        "handles legacy",
+        "step legacy",
+    ]
+    print(f"{'robots':>8}" + "".join(f"{c:>16}" for c in columns))
+    for n in args.sizes:
+        row = []
+        for legacy in (False, True):
+            env = _env(n, legacy)
+            handles = env._joint_store.handles
+            row.append(_median(env._joint_store.sync, args.repeat))
+            row.append(
+                _median(lambda: [h._sync_legacy() for h in handles], args.repeat)
+            )
+            row.append(_median(lambda: env.step(0.001), args.repeat))
+        print(f"{n:>8}" + "".join(f"{t * 1e6:13.1f} us" for t in row))
+
+
+if __name__ == "__main__":
+    main()
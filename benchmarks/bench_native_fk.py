@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+Time for a headless Swift to gather one frame of N moving Pandas: each
+robot posed by ``robot.fkine_geometry()`` (``add_robot(robot)``), against
+every robot posed by one batched ``phys.chain_fk()`` call
+(``add_robot(robot, native_fk=True)``). Every robot's ``q`` changes each
+frame, so neither side is helped by the fk cache. Run directly::
+
+    python benchmarks/bench_native_fk.py [--repeat 20] [--sizes 1 10 50]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import roboticstoolbox as rtb
+
+from swift import Swift
+
+
+def _env(n: int, native_fk: bool) -> tuple[Swift, list]:
+    env = Swift()
+    env.launch(headless=True)
+    panda = rtb.models.Panda()
+    handles = [env.add_robot(panda, native_fk=native_fk) for _ in range(n)]
+    return env, handles
+
+
+def _time(n: int, native_fk: bool, repeat: int) -> float:
+    env, handles = _env(n, native_fk)
+    rng = np.random.default_rng(0)
+    samples = []
+    for _ in range(repeat):
+        for handle in handles:
+            handle.q[:] = rng.uniform(-1, 1, 7)
+        start = time.perf_counter()
+        env._frame_poses()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20, help="frames timed per case")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1, 10, 50])
+    args = parser.parse_args()
+
+    print(f"{'robots':>8}  {'fkine_geometry':>14}  {'chain_fk':>10}")
+    for n in args.sizes:
+        rtb_fk = _time(n, False, args.repeat)
+        native = _time(n, True, args.repeat)
+        print(f"{n:>8}  {rtb_fk * 1e3:11.2f} ms  {native * 1e3:7.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+#!/usr/bin/env python
+"""
+Time to advance N velocity-controlled Panda handles by one step: the old
+per-handle path (``_sync_legacy()``, ``phys.step_v()``, ``_push_legacy()``
+for each) against :class:`swift.JointStore`'s single
+``phys.step_joints()`` call plus the bookkeeping Swift does around it
+(``sync()``, ``active()``, ``joints()``, ``legacy()``). Headless, so
+nothing here touches the browser. Run directly::
+
+    python benchmarks/bench_step_joints.py [--repeat 50] [--sizes 8 64 512]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import roboticstoolbox as rtb
+
+from swift import AssemblyHandle, JointStore
+from swift.Swift import _step_joints_py, step_joints, step_v
+
+
+def _handles(robot: rtb.Robot, n: int) -> list[AssemblyHandle]:
+    rng = np.random.default_rng(0)
+    handles = []
+    for _ in range(n):
+        handle = AssemblyHandle(lambda q: [], robot.q, robot=robot)
+        handle.qd = rng.normal(scale=0.1, size=robot.n)
+        handles.append(handle)
+    return handles
+
+
+def _per_handle(handles: list[AssemblyHandle], dt: float) -> None:
+    for handle in handles:
+        handle._sync_legacy()
+        robot = handle.robot
+        step_v(robot._n, robot._valid_qlim, dt, handle.q, handle.qd, robot._qlim)
+        handle._push_legacy()
+
+
+def _stored(store: JointStore, step, dt: float) -> None:
+    store.sync()
+    active = store.active()
+    step(dt, *store.buffers(), store.joints(active))
+    for handle in store.legacy(active):
+        handle._push_legacy()
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=50, help="steps timed per case")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[8, 64, 512])
+    args = parser.parse_args()
+
+    panda = rtb.models.Panda()
+    print(
+        f"{'robots':>8}  {'per handle':>12}  {'store (C)':>12}  {'store (numpy)':>14}"
+    )
+    for n in args.sizes:
+        loose = _handles(panda, n)
+        store = JointStore()
+        for id, handle in enumerate(_handles(panda, n)):
+            store.add(handle, id)
+
+        per_handle = _time(lambda: _per_handle(loose, 0.01), args.repeat)
+        batched = _time(lambda: _stored(store, step_joints, 0.01), args.repeat)
+        numpy = _time(lambda: _stored(store, _step_joints_py, 0.01), args.repeat)
+        print(
+            f"{n:>8}  {per_handle * 1e3:9.3f} ms  {batched * 1e3:9.3f} ms  "
+            f"{numpy * 1e3:11.3f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
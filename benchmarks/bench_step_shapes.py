@@ -0,0 +1,84 @@
+#!/usr/bin/env python
+"""
+Time to advance N velocity-driven shapes by one step: the old per-shape
+path (``phys.step_shape()`` then ``update()`` for each shape) against
+:class:`swift.ShapeStore`'s single ``phys.step_shapes()`` call, plus the
+per-step bookkeeping Swift does around it (``changed()``, ``sync_v()``,
+``evict_linked()``). Headless, so nothing here touches the browser. Run
+directly::
+
+    python benchmarks/bench_step_shapes.py [--repeat 20] [--sizes 100 1000 10000]
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import time
+
+import numpy as np
+import spatialgeometry as sg
+import spatialmath as sm
+
+from swift import ShapeStore
+from swift.Swift import _step_shapes_py, step_shape, step_shapes
+
+
+def _markers(n: int) -> list[sg.Shape]:
+    rng = np.random.default_rng(0)
+    shapes = []
+    for _ in range(n):
+        marker = sg.Sphere(0.01, pose=sm.SE3(*rng.uniform(-1, 1, 3)))
+        marker.v = rng.normal(size=6)
+        shapes.append(marker)
+    return shapes
+
+
+def _per_shape(shapes: list[sg.Shape], dt: float) -> None:
+    for shape in shapes:
+        step_shape(
+            dt, shape.v, shape._SceneNode__T, shape._SceneNode__wT, shape._SceneNode__wq
+        )
+        shape.update()
+
+
+def _stored(store: ShapeStore, step, dt: float) -> None:
+    store.evict_linked()
+    store.changed()
+    store.sync_v()
+    step(dt, *store.buffers())
+
+
+def _time(fn, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeat", type=int, default=20, help="steps timed per case")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[100, 1000, 10000])
+    args = parser.parse_args()
+
+    print(f"{'shapes':>8}  {'per shape':>12}  {'store (C)':>12}  {'store (numpy)':>14}")
+    for n in args.sizes:
+        loose = _markers(n)
+        store = ShapeStore()
+        for id, shape in enumerate(_markers(n)):
+            store.add(shape, id)
+
+        per_shape = _time(lambda: _per_shape(loose, 0.01), args.repeat)
+        batched = _time(lambda: _stored(store, step_shapes, 0.01), args.repeat)
+        numpy = _time(lambda: _stored(store, _step_shapes_py, 0.01), args.repeat)
+        print(
+            f"{n:>8}  {per_shape * 1e3:9.2f} ms  {batched * 1e3:9.2f} ms  "
+            f"{numpy * 1e3:11.2f} ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
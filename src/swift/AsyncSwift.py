@@ -0,0 +1,578 @@
+#!/usr/bin/env python
+"""
+@author Jesse Haviland
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+from concurrent.futures import Future
+from typing import TYPE_CHECKING, Any, Callable, Literal
+
+from numpy.typing import NDArray
+from spatialgeometry import Shape
+from spatialgeometry.geom.Shape import ArrayLike
+from spatialmath import SE3
+
+from swift.Elements import SwiftElement
+from swift.Handle import AssemblyHandle, InstanceHandle
+from swift.KinematicChain import KinematicChain
+from swift.Swift import (
+    Swift,
+    _DISCONNECT_POLL_INTERVAL,
+    _REPLY_TIMEOUT,
+    _mount_disconnected,
+    _reply_timeout,
+)
+from swift.SwiftRoute import start_servers_async
+
+if TYPE_CHECKING:
+    import roboticstoolbox as _rtb_types
+
+
+class AsyncSwift(Swift):
+    """
+    Swift for asyncio applications
+
+    The same scene model as :class:`~swift.Swift.Swift` -- every object,
+    handle, element and ``launch()`` option behaves identically -- but
+    everything that talks to the browser is a coroutine, run directly on
+    the caller's event loop. The websocket server is served from that
+    same loop too, rather than from a private loop on a thread of its
+    own, so nothing ever blocks it: a reply the browser sends wakes the
+    awaiting coroutine as an ordinary loop callback.
+
+    Examples
+    --------
+    .. code-block:: python
+        :linenos:
+
+        import asyncio
+        import spatialgeometry as sg
+        from swift import AsyncSwift
+
+        async def main():
+            env = AsyncSwift()
+            await env.launch()
+            box = sg.Cuboid([0.1, 0.1, 0.1])
+            await env.add_shape(box)
+            box.v = [0.1, 0, 0, 0, 0, 0]
+            await env.run(duration=5)
+            await env.close()
+
+        asyncio.run(main())
+
+    Non-blocking methods -- :meth:`set_camera_pose`, :meth:`set_lights`,
+    :meth:`process_events`, indexing, :meth:`show` -- stay plain methods.
+    Only one coroutine should :meth:`step` the scene at a time; any number
+    may add or remove objects concurrently, as with threads on
+    :class:`~swift.Swift.Swift`.
+    """
+
+    async def launch(self, *args: Any, **kwargs: Any) -> None:  # type: ignore[override]
+        """
+        Launch the Swift Simulator
+
+        Takes exactly the same arguments as :meth:`Swift.launch
+        <swift.Swift.Swift.launch>`.
+
+        :raises TimeoutError: the browser tab never connected
+        :raises ValueError: ``render_thread=True`` -- :meth:`step` already
+            hands the loop back while it waits on the browser
+        """
+        self._configure(*args, **kwargs)
+        if self._render_threaded:
+            raise ValueError("AsyncSwift doesn't support render_thread")
+
+        if not self.headless:
+            self._begin_session()
+            # No socket thread to keep -- the socket is served from this
+            # loop (see start_servers_async()).
+            self.socket_thread = None
+            (
+                self.socket,
+                self.server_thread,
+                self.server,
+                self._notebook_display_handle,
+            ) = await start_servers_async(
+                self.outq,
+                self.inq,
+                self._servers_running,
+                self._disconnected,
+                browser=self.browser,
+                evq=self.evq,
+                replies=self._replies,
+                mounts=self._mounts,
+                compression_threshold=(
+                    self._compression_threshold if self._compression else None
+                ),
+            )
+
+            for element in self._control_elements():
+                await self.add_ui(element)
+            self._send_scene_settings()
+
+    async def step(  # type: ignore[override]
+        self, dt: float = 0.05, render: bool = True, substeps: int = 1
+    ) -> None:
+        """
+        Update the graphical scene
+
+        :param dt: time step in seconds, defaults to 0.05
+        :param render: render the change in Swift
+        :param substeps: integration substeps, see
+            :meth:`Swift.step <swift.Swift.Swift.step>`
+
+        See :meth:`Swift.step <swift.Swift.Swift.step>`. Realtime pacing
+        awaits ``asyncio.sleep()`` instead of blocking, so other tasks on
+        the loop keep running while a step waits out its ``dt``.
+        """
+        for code, reply in self._advance(dt, substeps):
+            await self._reply(code, reply)
+
+        if self.realtime_speed:
+            delay = self._pace(dt)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self.last_time = time.time()
+
+        reply = self._render(render)
+        if reply is not None:
+            self.process_events(await self._reply("shape_poses", reply))
+
+        # The pause button only flips _paused here (see _pause_control())
+        # -- hold the step until it's clicked again, still polling the
+        # browser for that click.
+        while self._paused:
+            await asyncio.sleep(0.1)
+            self.process_events(
+                await self._reply("shape_poses", self._request("shape_poses", []))
+            )
+
+    async def reset(self) -> None:  # type: ignore[override]
+        """
+        Reset the graphical scene -- see :meth:`restart`
+        """
+        await self.restart()
+
+    async def restart(self) -> None:  # type: ignore[override]
+        """
+        Restart the graphics display
+
+        Closes and relaunches with the settings from the last
+        :meth:`launch`.
+        """
+        prior_speed = self.realtime_speed
+        settings = self._relaunch_settings()
+
+        await self.close()
+        self._init()
+        await self.launch(**settings)
+        self.realtime_speed = prior_speed
+
+    async def close(self, clear_cell: bool = False) -> None:  # type: ignore[override]
+        """
+        Close the graphics display
+
+        :param clear_cell: see :meth:`Swift.close <swift.Swift.Swift.close>`
+        """
+        self._send_socket("close", "0", False)
+        if not self.headless:
+            # Let serve() flush the "close" above (and anything queued
+            # ahead of it) before telling it to stop.
+            deadline = time.time() + 1
+            while self.outq.qsize() and self.socket.USERS and time.time() < deadline:
+                await asyncio.sleep(0.001)
+            await asyncio.sleep(0)
+        self._run_thread = False
+        if not self.headless:
+            self.socket.stop()
+            await self.socket.wait_closed()
+            if not self._dev:
+                # httpd.shutdown() waits for serve_forever()'s next poll
+                # (up to half a second) -- not on this loop.
+                await asyncio.to_thread(self.server.stop)
+                await asyncio.to_thread(self.server_thread.join, 1)
+        self._clear_cell(clear_cell)
+
+    #
+    #  Methods to interface with the robots created in other environemnts
+    #
+
+    async def add(  # type: ignore[override]
+        self,
+        ob: "Shape | SwiftElement | _rtb_types.Robot",
+        robot_alpha: float = 1.0,
+        collision_alpha: float = 0.0,
+        readonly: bool = False,
+        name: str | None = None,
+    ) -> int | AssemblyHandle | SwiftElement | None:
+        """
+        Add an object to the graphical scene
+
+        .. deprecated:: 2.0
+
+            Prefer :meth:`add_shape`, :meth:`add_ui`, :meth:`add_assembly`,
+            or :meth:`add_robot`.
+        """
+        from swift.Swift import rtb
+
+        if isinstance(ob, Shape):
+            return await self.add_shape(ob, name=name)
+        elif isinstance(ob, SwiftElement):
+            return await self.add_ui(ob, name=name)
+        elif isinstance(ob, rtb.Robot):
+            return await self.add_robot(
+                ob,
+                robot_alpha=robot_alpha,
+                collision_alpha=collision_alpha,
+                readonly=readonly,
+                name=name,
+            )
+        return None
+
+    async def add_shape(  # type: ignore[override]
+        self,
+        shape: Shape,
+        callback: Callable[[float, dict[str, object]], SE3] | None = None,
+        name: str | None = None,
+        wait: bool = True,
+    ) -> int:
+        """
+        Add a single shape to the graphical scene
+
+        See :meth:`Swift.add_shape <swift.Swift.Swift.add_shape>`.
+        """
+        (id,) = await self._add_objects_async(
+            [shape], self._prepare_shapes([shape]), wait
+        )
+        self._register(id, name, callback)
+        return id
+
+    async def add_shapes(  # type: ignore[override]
+        self,
+        shapes: list[Shape],
+        names: list[str | None] | None = None,
+        wait: bool = True,
+        callback: Callable[[float, dict[str, object]], NDArray] | None = None,
+    ) -> list[int]:
+        """
+        Add many shapes to the graphical scene at once
+
+        See :meth:`Swift.add_shapes <swift.Swift.Swift.add_shapes>`.
+        """
+        if names is not None and len(names) != len(shapes):
+            raise ValueError(
+                f"names has {len(names)} entries but there are {len(shapes)} shapes"
+            )
+        ids = await self._add_objects_async(
+            list(shapes), self._prepare_shapes(shapes), wait
+        )
+
+        for id, name in zip(ids, names or []):
+            self._register(id, name)
+        self._register_group(ids, callback)
+        return ids
+
+    async def add_ui(  # type: ignore[override]
+        self, element: SwiftElement, name: str | None = None
+    ) -> SwiftElement:
+        """
+        Add a UI element (Slider, Button, ...) to the graphical scene
+
+        See :meth:`Swift.add_ui <swift.Swift.Swift.add_ui>`.
+        """
+        if element._added_to_swift:
+            raise ValueError("This element has already been added to Swift")
+
+        reply = self._queue_element(element, name)
+        if reply is not None:
+            await self._reply("element", reply)
+        return element
+
+    async def add_assembly(  # type: ignore[override]
+        self,
+        fk: Callable[[ArrayLike], list[SE3] | NDArray] | KinematicChain,
+        parts: list[Shape],
+        q0: ArrayLike | None = None,
+        callback: Callable[[float, dict[str, object]], ArrayLike] | None = None,
+        readonly: bool = False,
+        name: str | None = None,
+        wait: bool = True,
+    ) -> AssemblyHandle:
+        """
+        Add an assembly of parts driven by a pure forward-kinematics function
+
+        See :meth:`Swift.add_assembly <swift.Swift.Swift.add_assembly>`.
+        """
+        handle, part_dicts = self._assembly_handle(
+            fk, parts, q0, callback, readonly, name
+        )
+        (handle.id,) = await self._add_objects_async([handle], part_dicts, wait)
+        self._register(handle.id, name)
+
+        return handle
+
+    async def add_robot(  # type: ignore[override]
+        self,
+        robot: "_rtb_types.Robot",
+        robot_alpha: float = 1.0,
+        collision_alpha: float = 0.0,
+        readonly: bool = False,
+        callback: Callable[[float, dict[str, object]], ArrayLike] | None = None,
+        name: str | None = None,
+        wait: bool = True,
+        native_fk: bool = False,
+        legacy: bool = False,
+    ) -> AssemblyHandle:
+        """
+        Add an ``rtb.Robot`` to the graphical scene
+
+        See :meth:`Swift.add_robot <swift.Swift.Swift.add_robot>`.
+        """
+        handle, robob = self._robot_handle(
+            robot,
+            robot_alpha,
+            collision_alpha,
+            readonly,
+            callback,
+            name,
+            native_fk,
+            legacy,
+        )
+        (handle.id,) = await self._add_objects_async([handle], robob, wait)
+        self._register(handle.id, name)
+
+        return handle
+
+    async def add_instances(  # type: ignore[override]
+        self,
+        shape: "Shape | list[Shape] | _rtb_types.Robot",
+        poses: ArrayLike,
+        q: ArrayLike | None = None,
+        chain: KinematicChain | None = None,
+        callback: Callable[[float, dict[str, object]], NDArray] | None = None,
+        robot_alpha: float = 1.0,
+        collision_alpha: float = 0.0,
+        name: str | None = None,
+        wait: bool = True,
+    ) -> InstanceHandle:
+        """
+        Add many copies of the same shape or robot model to the graphical scene
+
+        See :meth:`Swift.add_instances <swift.Swift.Swift.add_instances>`.
+        """
+        handle, payload = self._instance_handle(
+            shape, poses, q, chain, callback, robot_alpha, collision_alpha, name
+        )
+        (handle.id,) = await self._add_objects_async(
+            [handle], payload, wait, code="instances"
+        )
+        self._register(handle.id, name)
+
+        return handle
+
+    async def remove(  # type: ignore[override]
+        self, id: "int | AssemblyHandle | InstanceHandle | Shape | _rtb_types.ERobot"
+    ) -> None:
+        """
+        Remove a robot/shape from the graphical scene
+
+        See :meth:`Swift.remove <swift.Swift.Swift.remove>`.
+        """
+        idd = self._forget(id)
+
+        if not self.headless:
+            await self._reply("remove", self._request("remove", idd))
+
+    def mounted(  # type: ignore[override]
+        self, id: "int | AssemblyHandle | InstanceHandle"
+    ) -> "asyncio.Future[int]":
+        """
+        Find out when an object has finished loading in the browser
+
+        :return: an awaitable resolving to the object's id -- see
+            :meth:`Swift.mounted <swift.Swift.Swift.mounted>`
+        """
+        return asyncio.wrap_future(Swift.mounted(self, id))
+
+    async def hold(  # type: ignore[override]
+        self, duration: float | None = None, timeout: float | None = None
+    ) -> None:
+        """
+        Wait for up to ``duration`` seconds (or indefinitely)
+
+        See :meth:`Swift.hold <swift.Swift.Swift.hold>` -- returns early,
+        after closing, once the browser has been disconnected for longer
+        than ``timeout``.
+        """
+        if timeout is None:
+            timeout = self._hold_timeout
+
+        start_time = time.time()
+        disconnected_since = None
+
+        while duration is None or (time.time() - start_time) < duration:
+            await asyncio.sleep(1)
+            disconnected_since, expired = self._check_disconnected(
+                disconnected_since, timeout
+            )
+            if expired:
+                print("\nSwift browser tab closed.")
+                await self.close()
+                return
+
+    async def run(  # type: ignore[override]
+        self,
+        duration: float | None = None,
+        dt: float = 0.05,
+        timeout: float | None = None,
+        substeps: int = 1,
+    ) -> None:
+        """
+        Repeatedly :meth:`step` until ``duration`` (sim-time seconds) has
+        elapsed
+
+        See :meth:`Swift.run <swift.Swift.Swift.run>`.
+        """
+        if timeout is None:
+            timeout = self._hold_timeout
+
+        start_time = self.sim_time
+        disconnected_since = None
+
+        while duration is None or (self.sim_time - start_time) < duration:
+            await self.step(dt, substeps=substeps)
+            await asyncio.sleep(dt)
+            disconnected_since, expired = self._check_disconnected(
+                disconnected_since, timeout
+            )
+            if expired:
+                print("\nSwift browser tab closed.")
+                await self.close()
+                return
+
+    async def start_recording(  # type: ignore[override]
+        self,
+        file_name: str,
+        framerate: float,
+        format: Literal["webm", "gif", "png", "jpg"] = "webm",
+    ) -> None:
+        """
+        Start recording the canvas in the Swift simulator
+
+        See :meth:`Swift.start_recording <swift.Swift.Swift.start_recording>`.
+        """
+        if format not in ["webm", "gif", "png", "jpg"]:
+            raise ValueError("Format can one of 'webm', 'gif', 'png', or 'jpg'")
+        if self.recording:
+            raise ValueError(
+                "You are already recording, you can only record one video at a time"
+            )
+
+        await self._reply(
+            "start_recording",
+            self._request("start_recording", [framerate, file_name, format]),
+        )
+        self.recording = True
+
+    async def stop_recording(self) -> None:  # type: ignore[override]
+        """
+        Stop recording the canvas in the Swift simulator
+
+        See :meth:`Swift.stop_recording <swift.Swift.Swift.stop_recording>`.
+        """
+        if not self.recording:
+            raise ValueError(
+                "You must call swift.start_recording(file_name) before trying"
+                " to stop the recording"
+            )
+
+        await self._reply("stop_recording", self._request("stop_recording"))
+        self.recording = False
+
+    async def screenshot(  # type: ignore[override]
+        self, file_name: str = "swift_snap"
+    ) -> None:
+        """
+        Save a screenshot of the current Swift frame as a png file
+
+        See :meth:`Swift.screenshot <swift.Swift.Swift.screenshot>`.
+        """
+        if file_name.endswith(".png"):
+            file_name = file_name[:-4]
+
+        await self._reply("screenshot", self._request("screenshot", [file_name]))
+
+    async def _add_objects_async(
+        self,
+        objs: list[Any],
+        parts: list[Any] | None,
+        wait: bool = True,
+        code: str | None = None,
+    ) -> list[int]:
+        # _add_objects(), awaiting instead of blocking.
+        code, ids, reply = self._queue_objects(objs, parts, code)
+        if reply is not None:
+            self._check_first_id(ids, await self._reply(code, reply))
+            if wait:
+                await self._wait_mounted_async(ids)
+
+        self._place(ids, objs)
+        return ids
+
+    async def _reply(self, code: str, reply: "Future[Any]") -> Any:
+        """
+        Await the browser's reply to a queued request -- _await_reply()'s
+        counterpart, with the same disconnect and _REPLY_TIMEOUT bounds.
+        """
+        waiter = asyncio.wrap_future(reply)
+        start = time.time()
+        while True:
+            done, _ = await asyncio.wait({waiter}, timeout=_DISCONNECT_POLL_INTERVAL)
+            if done:
+                return waiter.result()
+            elapsed = time.time() - start
+            if self._disconnected.is_set() or elapsed >= _REPLY_TIMEOUT:
+                waiter.cancel()
+                raise _reply_timeout(code, elapsed)
+
+    async def _wait_mounted_async(self, ids: list[int]) -> None:
+        # _wait_mounted(), awaiting instead of blocking.
+        for id in ids:
+            waiter = asyncio.wrap_future(self._mounts.future(id))
+            while True:
+                done, _ = await asyncio.wait(
+                    {waiter}, timeout=_DISCONNECT_POLL_INTERVAL
+                )
+                if done:
+                    waiter.result()
+                    break
+                if self._disconnected.is_set():
+                    raise _mount_disconnected(id)
+
+    def _await_reply(self, code: str, reply: "Future[Any]") -> Any:
+        # Blocking here would deadlock: the reply can only arrive via the
+        # socket served from this very loop. Every path that waits on the
+        # browser is overridden with a coroutine above -- reaching this
+        # means a Swift method without one tried to.
+        reply.cancel()
+        raise RuntimeError(
+            f"'{code}' was sent through a blocking Swift method on an "
+            "AsyncSwift -- use the awaitable AsyncSwift method instead"
+        )
+
+    def _wait_mounted(self, ids: list[int]) -> None:
+        # See _await_reply() above.
+        raise RuntimeError(
+            "blocking Swift method called on an AsyncSwift -- use the "
+            "awaitable AsyncSwift method instead"
+        )
+
+    def _pause_control(self, _: Any) -> None:
+        # Swift's version loops right here until resumed, which would
+        # stall this whole loop -- step() does the holding instead.
+        self._paused = not self._paused
+        self._pause_button.label = "▶" if self._paused else "||"
+        self._step_elements()
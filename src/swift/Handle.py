@@ -6,9 +6,12 @@ import warnings
 from typing import TYPE_CHECKING, Callable, Protocol, runtime_checkable
 
 import numpy as np
+from numpy.typing import NDArray
 from spatialgeometry.geom.Shape import ArrayLike
 from spatialmath import SE3
 
+from swift.KinematicChain import KinematicChain
+
 if TYPE_CHECKING:
     import roboticstoolbox as rtb
 
@@ -17,41 +20,56 @@ if TYPE_CHECKING:
 class SwiftPart(Protocol):
     """Minimal contract for anything Swift can render each step."""
 
-    def part_poses(self) -> list[SE3]: ...
+    def part_poses(self) -> "list[SE3] | NDArray": ...
 
 
 class AssemblyHandle:
     """
     Per-instance simulation state for an assembly of parts added to a
     Swift scene -- an ``rtb.Robot`` (via ``Swift.add_robot``) or any bare
-    ``fk(q) -> list[SE3]`` callable plus a parts list (via
+    ``fk(q) -> list[SE3]`` (or ``(N, 4, 4)`` ndarray) callable or
+    :class:`~swift.KinematicChain.KinematicChain` plus a parts list (via
     ``Swift.add_assembly``).
 
     Whatever model produced it stays a plain, shareable, pure-FK thing --
     this handle owns the live, per-simulation joint state (``q``, ``qd``,
-    ``control_mode``) that ``Swift.step()`` reads and mutates each frame,
-    so several handles can drive independent instances of the same model.
+    ``qdd``, ``control_mode``) that ``Swift.step()`` reads and mutates
+    each frame, so several handles can drive independent instances of the
+    same model.
+
+    A robot's handle is stepped according to ``control_mode``: ``"p"``
+    leaves ``q`` to the caller, ``"v"`` integrates ``qd`` into ``q``, and
+    ``"a"`` integrates ``qdd`` into ``qd`` and ``qd`` into ``q``, clamping
+    ``qd`` to each joint link's ``qdlim`` and ``q`` to the robot's
+    ``qlim``.
 
     .. deprecated:: 2.0
 
         For an ``rtb.Robot`` handle, driving it by mutating
         ``robot.q``/``robot.qd`` directly (without ever touching the
         handle) still works, but is deprecated -- set
-        ``handle.q``/``handle.qd`` instead.
+        ``handle.q``/``handle.qd`` instead. Assigning
+        ``robot.q = ...``/``robot.qd = ...``/``robot.control_mode = ...``
+        is picked up by default; writing elements in place
+        (``robot.q[0] = ...``) only with ``legacy=True``.
     """
 
     def __init__(
         self,
-        pose_fn: Callable[[np.ndarray], list[SE3]],
+        pose_fn: "Callable[[np.ndarray], list[SE3] | NDArray] | KinematicChain",
         q0: ArrayLike,
         robot: "rtb.Robot | None" = None,
         readonly: bool = False,
         name: str | None = None,
         callback: Callable[[float, dict[str, object]], ArrayLike] | None = None,
+        legacy: bool = False,
     ) -> None:
         self._pose_fn = pose_fn
         self.q = np.array(q0, dtype=float)
         self.qd = np.zeros_like(self.q)
+        # Only read in acceleration control (control_mode "a"), where
+        # step() integrates it into qd, and qd into q
+        self.qdd = np.zeros_like(self.q)
         # Robots default to velocity control (matches Robot.control_mode's
         # own default); a bare assembly has no qd-integration support
         # (no qlim/n to integrate against) so defaults to position control
@@ -61,8 +79,15 @@ class AssemblyHandle:
         self.readonly = readonly
         self.name = name
         self.callback = callback
+        #: compare the robot's q/qd with the snapshot every step, catching
+        #: element writes as well as reassignment -- see _sync_legacy()
+        self.legacy = legacy
         self.id: int | None = None
         self._warned = False
+        # The last fk result -- [pose_fn, state, poses, rows], see
+        # part_poses() -- reused for as long as nothing it depends on
+        # changes, so an idle handle costs no fk call per frame.
+        self._fk_cache: list | None = None
 
         if robot is not None:
             # Snapshot of the model's own state as of the last sync, used
@@ -73,6 +98,7 @@ class AssemblyHandle:
             self._model_q = np.array(robot.q, dtype=float)
             self._model_qd = np.array(robot.qd, dtype=float)
             self._model_control_mode = robot.control_mode
+            self._see_model()
 
     @property
     def control_mode(self) -> str:
@@ -84,24 +110,106 @@ class AssemblyHandle:
             raise ValueError("control_mode must be one of 'p', 'v', or 'a'")
         self._control_mode = cn
 
-    def part_poses(self) -> list[SE3]:
-        """World pose of every rendered part, from this handle's ``q``."""
+    def part_poses(self) -> "list[SE3] | NDArray":
+        """
+        World pose of every rendered part, from this handle's ``q`` -- an
+        SE3 per part, or one ``(N, 4, 4)`` array, whichever ``fk`` gives.
+
+        The result is cached, and ``fk`` only called again once ``q`` has
+        changed, ``fk`` itself has been replaced, or -- for a robot -- its
+        base or a gripper's ``q`` has moved (for a
+        :class:`~swift.KinematicChain.KinematicChain`, its base). Call
+        :meth:`invalidate` after changing anything else ``fk`` reads.
+        """
+        return self._fk()[2]
+
+    def part_rows(self, encode: Callable[["list[SE3] | NDArray"], NDArray]) -> NDArray:
+        """
+        :meth:`part_poses` encoded by ``encode`` (Swift's ``(N, 7)`` pose
+        rows), cached alongside them -- do not write to the result.
+        """
+        cache = self._fk()
+        if cache[3] is None:
+            cache[3] = encode(cache[2])
+        return cache[3]
+
+    def invalidate(self) -> None:
+        """Drop the cached :meth:`part_poses`, forcing the next to call ``fk``."""
+        self._fk_cache = None
+
+    def _fk(self) -> list:
+        # part_poses()'s cache, refreshed if stale
+        state = self._fk_state()
+        cache = self._fk_cache
+        if self._fk_stale(state):
+            cache = self._fk_cache = [self._pose_fn, state, self._fk_eval(), None]
+        return cache
+
+    def _fk_stale(self, state: list[np.ndarray]) -> bool:
+        cache = self._fk_cache
+        return (
+            cache is None
+            or cache[0] is not self._pose_fn
+            or not all(map(np.array_equal, state, cache[1]))
+        )
+
+    def _fk_eval(self) -> "list[SE3] | NDArray":
+        if isinstance(self._pose_fn, KinematicChain):
+            return self._pose_fn(*self._chain_input())
         return self._pose_fn(self.q)
 
+    def _chain_input(self) -> tuple[np.ndarray, np.ndarray]:
+        # The (q, base) a KinematicChain pose_fn is evaluated at: for a
+        # robot (see KinematicChain.from_robot()), q followed by each
+        # gripper's, from the robot's own base
+        robot = self.robot
+        if robot is None:
+            return self.q, self._pose_fn.base
+        q = self.q
+        if robot.grippers:
+            q = np.concatenate([q, *(gripper.q for gripper in robot.grippers)])
+        return q, robot._T
+
+    def _fk_state(self) -> list[np.ndarray]:
+        # Everything besides pose_fn that fk's result depends on: q, plus
+        # a robot's base and gripper joints, which fkine_geometry() reads,
+        # or a bare KinematicChain's base -- all copies, as any of them
+        # may be written in place (q is a view a JointStore writes into)
+        state = [np.array(self.q)]
+        robot = self.robot
+        if robot is not None:
+            state.append(np.array(robot._T))
+            state.extend(np.array(gripper.q) for gripper in robot.grippers)
+        elif isinstance(self._pose_fn, KinematicChain):
+            state.append(np.array(self._pose_fn.base))
+        return state
+
     def _sync_legacy(self) -> None:
         """
         Backward-compat bridge for the deprecated robot.q/robot.qd
         direct-mutation style. Only applies to a handle wrapping an actual
         ``rtb.Robot`` (``Swift.add_robot``) -- a bare assembly has no
         model to diverge from.
+
+        rtb's ``q``/``qd``/``control_mode`` setters always store a new
+        object, so the objects seen at the last sync work as a write
+        generation: while the robot still holds the same three, nothing
+        was assigned and there's nothing to compare -- three identity
+        checks per handle. Only a ``legacy`` handle, whose robot may be
+        written in place, compares values every time.
         """
-        if self.robot is None:
+        robot = self.robot
+        if robot is None:
+            return
+
+        if not self.legacy and self._model_seen(robot):
             return
+        self._see_model()
 
         if (
-            np.array_equal(self.robot._q, self._model_q)
-            and np.array_equal(self.robot._qd, self._model_qd)
-            and self.robot._control_mode == self._model_control_mode
+            np.array_equal(robot._q, self._model_q)
+            and np.array_equal(robot._qd, self._model_qd)
+            and robot._control_mode == self._model_control_mode
         ):
             return
 
@@ -148,3 +256,157 @@ class AssemblyHandle:
         self._model_q = self.q.copy()
         self._model_qd = self.qd.copy()
         self._model_control_mode = self._control_mode
+        self._see_model()
+
+    def _see_model(self) -> None:
+        # The robot's current q/qd/control_mode objects -- its write
+        # generation, see _sync_legacy()
+        robot = self.robot
+        self._seen = (robot._q, robot._qd, robot._control_mode)
+
+    def _model_seen(self, robot: "rtb.Robot") -> bool:
+        seen = self._seen
+        return (
+            robot._q is seen[0]
+            and robot._qd is seen[1]
+            and robot._control_mode is seen[2]
+        )
+
+
+def _prime_chains(
+    handles: list[AssemblyHandle], encode: Callable[[NDArray], NDArray]
+) -> None:
+    """
+    Refreshes the cached part poses (and their ``encode`` rows) of every
+    stale handle in ``handles`` driven by a :class:`KinematicChain` shared
+    with another -- one ``fk_many()`` and one ``encode`` call per chain,
+    rather than one of each per handle. The rest are left to refresh
+    themselves on their next :meth:`AssemblyHandle.part_rows`.
+    """
+    groups: dict[int, list[tuple[AssemblyHandle, list[np.ndarray]]]] = {}
+    for handle in handles:
+        if not isinstance(handle._pose_fn, KinematicChain):
+            continue
+        state = handle._fk_state()
+        if handle._fk_stale(state):
+            groups.setdefault(id(handle._pose_fn), []).append((handle, state))
+
+    for group in groups.values():
+        if len(group) < 2:
+            continue
+        chain = group[0][0]._pose_fn
+        Q, bases = zip(*(handle._chain_input() for handle, _ in group))
+        poses = chain.fk_many(np.stack(Q), np.stack(bases))
+        rows = encode(poses.reshape(-1, 4, 4)).reshape(len(group), chain.nparts, 7)
+        for (handle, state), P, R in zip(group, poses, rows):
+            handle._fk_cache = [chain, state, P, R]
+
+
+class InstanceHandle:
+    """
+    Many copies of one model added to a Swift scene with
+    ``Swift.add_instances`` -- a list of shapes kept rigidly together, a
+    :class:`~swift.KinematicChain.KinematicChain` posing them, or an
+    ``rtb.Robot``. The browser draws each of the model's parts as one
+    ``THREE.InstancedMesh`` covering every copy, so its geometry is
+    uploaded once and costs one draw call however many copies there are.
+
+    ``poses`` is the ``(count, 4, 4)`` world pose of each copy, set or
+    written in place like an assembly's ``q``; a chain's or robot's copies
+    each also have their own configuration, a row of the ``(count, n)``
+    ``q``. Every part of every copy goes out in a frame as one block of
+    pose rows, copy by copy -- part ``p`` of copy ``k`` is row
+    ``k * nparts + p``.
+    """
+
+    def __init__(
+        self,
+        model: "NDArray | KinematicChain",
+        poses: ArrayLike,
+        q: ArrayLike | None = None,
+        robot: "rtb.Robot | None" = None,
+        name: str | None = None,
+        callback: Callable[[float, dict[str, object]], ArrayLike] | None = None,
+    ) -> None:
+        """
+        :param model: each part's ``(P, 4, 4)`` pose in its copy's frame,
+            or the KinematicChain posing the parts from each copy's ``q``
+        :param poses: ``(count, 4, 4)`` world pose of each copy -- a
+            chain's base
+        :param q: ``(count, n)`` configuration of each copy of a chain,
+            defaults to zeros
+        :raises ValueError: ``poses`` or ``q`` has the wrong shape
+        """
+        self._model = model
+        self.poses = np.array(poses, dtype=float)
+        if self.poses.ndim != 3 or self.poses.shape[1:] != (4, 4):
+            raise ValueError(
+                f"expected (count, 4, 4) poses, got shape {self.poses.shape}"
+            )
+        self.count = len(self.poses)
+        if isinstance(model, KinematicChain):
+            self.nparts = model.nparts
+            self.q = (
+                np.zeros((self.count, model.n))
+                if q is None
+                else np.array(q, dtype=float)
+            )
+            if self.q.shape != (self.count, model.n):
+                raise ValueError(
+                    f"expected ({self.count}, {model.n}) joint configurations, "
+                    f"got shape {self.q.shape}"
+                )
+        else:
+            self.nparts = len(model)
+            self.q = None
+        self.robot = robot
+        self.name = name
+        self.callback = callback
+        self.id: int | None = None
+        # [state, poses, rows], as AssemblyHandle._fk_cache -- recomputed
+        # only once poses or q have changed
+        self._cache: list | None = None
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __repr__(self) -> str:
+        return f"InstanceHandle(count={self.count}, parts={self.nparts})"
+
+    def part_poses(self) -> NDArray:
+        """
+        ``(count * nparts, 4, 4)`` world pose of every part of every copy,
+        copy by copy -- cached until ``poses`` or ``q`` changes.
+        """
+        return self._eval()[1]
+
+    def part_rows(self, encode: Callable[[NDArray], NDArray]) -> NDArray:
+        """
+        :meth:`part_poses` encoded by ``encode`` (Swift's ``(N, 7)`` pose
+        rows), cached alongside them -- do not write to the result.
+        """
+        cache = self._eval()
+        if cache[2] is None:
+            cache[2] = encode(cache[1])
+        return cache[2]
+
+    def _eval(self) -> list:
+        state = (
+            [np.array(self.poses)]
+            if self.q is None
+            else [np.array(self.poses), np.array(self.q)]
+        )
+        cache = self._cache
+        if cache is not None and all(map(np.array_equal, state, cache[0])):
+            return cache
+        if state[0].shape != (self.count, 4, 4):
+            raise ValueError(
+                f"poses must stay ({self.count}, 4, 4) -- the browser holds "
+                f"{self.count} copies -- got shape {state[0].shape}"
+            )
+        if self.q is None:
+            poses = np.matmul(state[0][:, None], self._model[None])
+        else:
+            poses = self._model.fk_many(state[1], state[0])
+        cache = self._cache = [state, poses.reshape(-1, 4, 4), None]
+        return cache
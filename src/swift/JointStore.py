@@ -0,0 +1,411 @@
+#!/usr/bin/env python
+"""
+Structure-of-arrays joint storage for the robots in a Swift scene.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+
+from swift.Handle import AssemblyHandle
+
+# The per-joint handle attributes that are views into the store: the live
+# state, and the snapshot of the robot's own state AssemblyHandle keeps to
+# spot the deprecated robot.q/robot.qd style
+_VIEWS = ("q", "qd", "qdd", "_model_q", "_model_qd")
+
+
+def _joint_limits(robot) -> tuple[NDArray, NDArray, NDArray]:
+    """
+    ``(lo, hi, qdlim)`` for each of ``robot``'s joints -- its ``qlim``, as
+    ``-inf``/``inf`` when the robot has no valid limits (``phys.step_v()``
+    wouldn't clamp), and each joint link's ``qdlim``, ``inf`` where unset.
+    """
+    if robot._valid_qlim:
+        lo, hi = np.array(robot._qlim[0], dtype=float), np.array(
+            robot._qlim[1], dtype=float
+        )
+    else:
+        lo, hi = np.full(robot._n, -np.inf), np.full(robot._n, np.inf)
+    qdlim = [getattr(link, "qdlim", None) for link in robot.links if link.isjoint]
+    qdlim = np.array([np.inf if v is None else v for v in qdlim], dtype=float)
+    if qdlim.shape != (robot._n,):
+        qdlim = np.full(robot._n, np.inf)
+    return lo, hi, qdlim
+
+
+class JointStore:
+    """
+    The joint positions, velocities, accelerations and limits of many
+    robot handles, held in contiguous arrays so one ``phys.step_joints()``
+    call can integrate every velocity-controlled robot at once, and one
+    ``phys.step_joints_a()`` call every acceleration-controlled one.
+
+    Every stored handle's ``q``, ``qd`` and ``qdd`` are views into the
+    store's buffers, its joints laid end to end with the other handles',
+    so ``handle.q[i] = ...`` and ``handle.qd[:] = ...`` write straight into
+    what gets stepped. Reassigning ``handle.q``/``handle.qd`` (as
+    ``handle.q = ...``, a callback or the deprecated robot.q style do)
+    replaces the view with a new array; the store picks the new value up
+    and rebinds the view at the next :meth:`sync`.
+
+    The handle's snapshot of its robot's ``q``/``qd`` (what
+    ``AssemblyHandle._sync_legacy()`` compares against) is stored the same
+    way. :meth:`sync` only runs ``_sync_legacy()`` for handles whose robot
+    had ``q``/``qd``/``control_mode`` reassigned since the last one --
+    found by identity, with no array compared while none was -- and for
+    ``legacy=True`` handles.
+
+    Joint limits are copied in from ``robot._qlim`` when a handle is
+    added -- as ``-inf``/``inf`` for a robot without valid limits, which
+    ``phys.step_v()`` wouldn't clamp -- and again whenever the robot's
+    limits array is replaced, along with each joint link's ``qdlim``
+    velocity limit (``inf`` where unset).
+
+    Only handles wrapping an ``rtb.Robot`` can be stored (see
+    :meth:`eligible`): a bare assembly has no limits to integrate
+    against.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self._handles: list[AssemblyHandle] = []
+        # id(handle) -> slot; the store holds a reference to every handle,
+        # so an id can't be reused while it's a key here
+        self._slots: dict[int, int] = {}
+        self._ids: list[int] = []
+        # Each handle's first joint, plus a closing entry for the end of
+        # the last handle's -- slot i's joints are offsets[i]:offsets[i + 1]
+        self._offsets = np.zeros(1, dtype=np.intp)
+        self._counts: list[int] = []
+        # The views (see _VIEWS) and qlim array each handle was last bound
+        # to, by slot -- compared by identity in sync(). Holding them here
+        # also keeps their ids from being recycled for a replacement array.
+        self._bound: dict[str, list[NDArray]] = {name: [] for name in _VIEWS}
+        self._bound_qlim: list[NDArray] = []
+        self._allocate(max(capacity, 1))
+
+    def __len__(self) -> int:
+        return len(self._handles)
+
+    def __contains__(self, handle: object) -> bool:
+        return self._key(handle) in self._slots
+
+    @staticmethod
+    def eligible(handle: object) -> bool:
+        """
+        Whether ``handle`` can be stored: an AssemblyHandle for a robot
+        with at least one joint, whose ``q`` matches it.
+        """
+        return (
+            isinstance(handle, AssemblyHandle)
+            and handle.robot is not None
+            and handle.robot._n > 0
+            and handle.q.shape
+            == handle.qd.shape
+            == handle.qdd.shape
+            == (handle.robot._n,)
+            and handle._model_q.shape == handle._model_qd.shape == (handle.robot._n,)
+        )
+
+    @property
+    def capacity(self) -> int:
+        """Joints the buffers can hold before they grow"""
+        return len(self._buf["q"])
+
+    @property
+    def handles(self) -> list[AssemblyHandle]:
+        """The stored handles, in slot order"""
+        return list(self._handles)
+
+    @property
+    def ids(self) -> list[int]:
+        """Each stored handle's Swift object id, in slot order"""
+        return list(self._ids)
+
+    @property
+    def q(self) -> NDArray:
+        """Every stored handle's ``q``, end to end in slot order"""
+        return self._buf["q"][: self._m]
+
+    @property
+    def qd(self) -> NDArray:
+        """Every stored handle's ``qd``, end to end in slot order"""
+        return self._buf["qd"][: self._m]
+
+    def buffers(self) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+        """
+        The C-contiguous ``(q, qd, lo, hi)`` arrays ``phys.step_joints()``
+        takes, each (m,) for m stored joints.
+        """
+        m = self._m
+        return self._buf["q"][:m], self._buf["qd"][:m], self._lo[:m], self._hi[:m]
+
+    def accel_buffers(self) -> tuple[NDArray, ...]:
+        """
+        The C-contiguous ``(q, qd, qdd, lo, hi, qdlim)`` arrays
+        ``phys.step_joints_a()`` takes, each (m,) for m stored joints.
+        """
+        m = self._m
+        buf = self._buf
+        return (
+            buf["q"][:m],
+            buf["qd"][:m],
+            buf["qdd"][:m],
+            self._lo[:m],
+            self._hi[:m],
+            self._qdlim[:m],
+        )
+
+    def active(self, mode: str = "v") -> NDArray:
+        """
+        Slots of the handles ``Swift.step()`` integrates in ``mode``: in
+        that control mode, not readonly, no callback, and with something
+        to integrate -- a non-zero ``qd``, or for ``"a"`` a non-zero ``qd``
+        or ``qdd`` -- as ``Swift._step_assembly()`` decides for a handle on
+        its own.
+
+        :param mode: ``"v"`` or ``"a"``
+        """
+        n = len(self._handles)
+        if n == 0:
+            return np.zeros(0, dtype=np.intp)
+        driven = np.fromiter(
+            (
+                h._control_mode == mode and not h.readonly and h.callback is None
+                for h in self._handles
+            ),
+            dtype=bool,
+            count=n,
+        )
+        if not driven.any():
+            return np.zeros(0, dtype=np.intp)
+        nonzero = self.qd != 0
+        if mode == "a":
+            nonzero |= self._buf["qdd"][: self._m] != 0
+        moving = np.logical_or.reduceat(nonzero, self._offsets[:-1])
+        return np.flatnonzero(driven & moving)
+
+    def joints(self, slots: NDArray) -> NDArray:
+        """The joint indices of the handles in ``slots``, ascending"""
+        picked = np.zeros(len(self._handles), dtype=bool)
+        picked[slots] = True
+        return np.flatnonzero(picked[self._owner[: self._m]])
+
+    def legacy(self, slots: NDArray) -> list[AssemblyHandle]:
+        """
+        The handles in ``slots`` driven the deprecated robot.q/robot.qd
+        way -- the ones :meth:`AssemblyHandle._push_legacy` writes back to.
+        """
+        handles = [self._handles[i] for i in slots.tolist()]
+        return [h for h in handles if h._warned]
+
+    def add(self, handle: AssemblyHandle, id: int) -> None:
+        """
+        Move ``handle``'s joint state into the store.
+
+        :param handle: an :meth:`eligible` handle, not already stored
+        :param id: its Swift object id
+        :raises ValueError: ``handle`` can't be stored, or already is
+        """
+        if handle in self:
+            raise ValueError(f"{handle!r} is already in this JointStore")
+        if not self.eligible(handle):
+            raise ValueError(
+                f"{handle!r} can't be stored -- only a robot's handle, with "
+                "one q value per joint, can be"
+            )
+
+        n = handle.robot._n
+        if self._m + n > self.capacity:
+            self._sync_views()
+            self._allocate(max(2 * self.capacity, self._m + n))
+
+        a, b = self._m, self._m + n
+        i = len(self._handles)
+        for name in _VIEWS:
+            view = self._buf[name][a:b]
+            view[:] = getattr(handle, name)
+            self._bound[name].append(view)
+            setattr(handle, name, view)
+        self._owner[a:b] = i
+        self._m = b
+        self._offsets = np.append(self._offsets, b)
+        self._counts.append(n)
+        self._slots[self._key(handle)] = i
+        self._handles.append(handle)
+        self._ids.append(id)
+        self._bound_qlim.append(handle.robot._qlim)
+        self._copy_limits(i)
+
+    def remove(self, handle: AssemblyHandle) -> bool:
+        """
+        Give ``handle`` its own ``q``/``qd`` back and drop it from the
+        store, closing up the gap it leaves.
+
+        :return: whether ``handle`` was stored
+        """
+        i = self._slots.get(self._key(handle))
+        if i is None:
+            return False
+
+        keep = [j for j in range(len(self._handles)) if j != i]
+        self._sync_views(keep)
+        for name in _VIEWS:
+            if getattr(handle, name) is self._bound[name][i]:
+                setattr(handle, name, getattr(handle, name).copy())
+        self._allocate(self.capacity, keep)
+        return True
+
+    def sync(self) -> None:
+        """
+        Bring the store up to date with its handles before a step (or a
+        frame): copy in any ``q``/``qd`` that was reassigned (rather than
+        written into) since the last call and rebind its view, run
+        ``_sync_legacy()`` for every handle whose robot's own
+        ``q``/``qd``/``control_mode`` was reassigned -- the deprecated
+        style -- or that is ``legacy``, and re-read limits whose array
+        was replaced.
+
+        :raises ValueError: a reassigned ``q``/``qd`` doesn't have one
+            value per joint
+        """
+        handles = self._handles
+        if not handles:
+            return
+        self._sync_views()
+
+        for handle in self._legacy_writes():
+            if handle.callback is None:
+                handle._sync_legacy()
+                self._sync_views([self._slots[self._key(handle)]])
+
+        if not all(h.robot._qlim is b for h, b in zip(handles, self._bound_qlim)):
+            for i, handle in enumerate(handles):
+                if handle.robot._qlim is not self._bound_qlim[i]:
+                    self._bound_qlim[i] = handle.robot._qlim
+                    self._copy_limits(i)
+
+    @staticmethod
+    def _key(handle: AssemblyHandle) -> int:
+        return id(handle)
+
+    def _legacy_writes(self) -> list[AssemblyHandle]:
+        # The handles whose _sync_legacy() has anything to check: those
+        # whose robot's q/qd/control_mode object was replaced since the
+        # handle last saw it -- skipped for every handle at once by one
+        # identity sweep while none was -- plus the legacy=True ones
+        # whose robot no longer matches the snapshot by value
+        handles = self._handles
+        legacy = [i for i, h in enumerate(handles) if h.legacy]
+        slots = set(self._written(legacy)) if legacy else set()
+        if len(legacy) == len(handles):
+            return [handles[i] for i in sorted(slots)]
+
+        if not all(
+            h.robot._q is h._seen[0]
+            and h.robot._qd is h._seen[1]
+            and h.robot._control_mode is h._seen[2]
+            for h in handles
+        ):
+            slots.update(i for i, h in enumerate(handles) if not h._model_seen(h.robot))
+        return [handles[i] for i in sorted(slots)]
+
+    def _written(self, slots: list[int]) -> list[int]:
+        # Those of the (ascending) slots whose robot's q/qd/control_mode
+        # no longer match the snapshot by value -- what each one's
+        # _sync_legacy() would compare, for all of them at once
+        every = len(slots) == len(self._handles)
+        handles = self._handles if every else [self._handles[i] for i in slots]
+        counts = self._counts if every else [self._counts[i] for i in slots]
+        robot_q = [h.robot._q for h in handles]
+        robot_qd = [h.robot._qd for h in handles]
+        lengths = [len(q) for q in robot_q], [len(qd) for qd in robot_qd]
+        if lengths[0] != counts or lengths[1] != counts:
+            # A robot's joint count no longer matches -- let each handle
+            # sort itself out
+            return slots
+
+        if every:
+            idx, starts = slice(0, self._m), self._offsets[:-1]
+        else:
+            idx, starts = self.joints(np.array(slots)), np.cumsum([0] + counts[:-1])
+        written = (np.concatenate(robot_q) != self._buf["_model_q"][idx]) | (
+            np.concatenate(robot_qd) != self._buf["_model_qd"][idx]
+        )
+        flags = np.logical_or.reduceat(written, starts).tolist()
+        modes = [h.robot._control_mode != h._model_control_mode for h in handles]
+        return [i for i, flag, mode in zip(slots, flags, modes) if flag or mode]
+
+    def _sync_views(self, slots: list[int] | None = None) -> None:
+        # Copy reassigned arrays into the buffers -- before anything that
+        # moves the buffers, or the new values would be lost
+        handles = self._handles
+        for name in _VIEWS:
+            bound = self._bound[name]
+            if all(getattr(h, name) is b for h, b in zip(handles, bound)):
+                continue
+            for i in range(len(handles)) if slots is None else slots:
+                if getattr(handles[i], name) is not bound[i]:
+                    self._copy_in(handles[i], name, bound[i])
+
+    @staticmethod
+    def _copy_in(handle: AssemblyHandle, name: str, bound: NDArray) -> None:
+        value = np.asarray(getattr(handle, name), dtype=float)
+        if value.shape != bound.shape:
+            raise ValueError(
+                f"{handle!r}'s {name.lstrip('_')} has shape {value.shape}, "
+                f"but its robot has {len(bound)} joints"
+            )
+        bound[:] = value
+        setattr(handle, name, bound)
+
+    def _copy_limits(self, i: int) -> None:
+        a, b = self._offsets[i], self._offsets[i + 1]
+        self._lo[a:b], self._hi[a:b], self._qdlim[a:b] = _joint_limits(
+            self._handles[i].robot
+        )
+
+    def _allocate(self, capacity: int, keep: list[int] | None = None) -> None:
+        # New buffers holding the given slots (every slot by default),
+        # packed from 0, each handle rebound to its new place
+        if keep is None:
+            keep = list(range(len(self._handles)))
+        old = getattr(self, "_buf", None)
+        buf = {name: np.zeros(capacity) for name in _VIEWS}
+        lo = np.full(capacity, -np.inf)
+        hi = np.full(capacity, np.inf)
+        qdlim = np.full(capacity, np.inf)
+        owner = np.zeros(capacity, dtype=np.intp)
+
+        offsets = [0]
+        for slot, i in enumerate(keep):
+            a, b = self._offsets[i], self._offsets[i + 1]
+            c, d = offsets[-1], offsets[-1] + (b - a)
+            for name in _VIEWS:
+                buf[name][c:d] = old[name][a:b]
+            lo[c:d] = self._lo[a:b]
+            hi[c:d] = self._hi[a:b]
+            qdlim[c:d] = self._qdlim[a:b]
+            owner[c:d] = slot
+            offsets.append(d)
+
+        handles = [self._handles[i] for i in keep]
+        self._ids = [self._ids[i] for i in keep]
+        self._bound_qlim = [self._bound_qlim[i] for i in keep]
+        self._counts = [self._counts[i] for i in keep]
+        self._buf, self._lo, self._hi, self._qdlim, self._owner = (
+            buf,
+            lo,
+            hi,
+            qdlim,
+            owner,
+        )
+        self._offsets = np.array(offsets, dtype=np.intp)
+        self._m = offsets[-1]
+        self._handles = handles
+        self._slots = {self._key(handle): i for i, handle in enumerate(handles)}
+        for name in _VIEWS:
+            self._bound[name] = [
+                buf[name][offsets[i] : offsets[i + 1]] for i in range(len(handles))
+            ]
+            for handle, view in zip(handles, self._bound[name]):
+                setattr(handle, name, view)
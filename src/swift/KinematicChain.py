@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+"""
+A compact kinematic description Swift can evaluate part poses from in
+the phys extension, without a Python fk in the loop.
+"""
+
+from typing import TYPE_CHECKING
+
+import numpy as np
+from numpy.typing import NDArray
+from spatialgeometry.geom.Shape import ArrayLike
+
+if TYPE_CHECKING:
+    import roboticstoolbox as rtb
+
+
+def _axis_rotations(axis: NDArray, theta: NDArray) -> NDArray:
+    # (k, 3, 3) rotations by each of theta about the unit axis, Rodrigues'
+    # formula -- the same one phys.cpp's _axis_rotation() evaluates
+    K = np.array(
+        [
+            [0.0, -axis[2], axis[1]],
+            [axis[2], 0.0, -axis[0]],
+            [-axis[1], axis[0], 0.0],
+        ]
+    )
+    s, c = np.sin(theta)[:, None, None], np.cos(theta)[:, None, None]
+    return np.eye(3) + s * K + (1.0 - c) * (K @ K)
+
+
+def _chain_fk_py(
+    pre: NDArray,
+    links: NDArray,
+    axes: NDArray,
+    part_links: NDArray,
+    offsets: NDArray,
+    Q: NDArray,
+    bases: NDArray,
+    out: NDArray,
+) -> None:
+    # phys.chain_fk()'s fallback: each link's frame is its parent's (or
+    # the base's) times its fixed transform, times its joint's motion;
+    # each part is its link's frame times its offset. One pass over the
+    # links, each vectorised across every instance in Q.
+    W = np.empty((len(pre), len(Q), 4, 4))
+    for i, (parent, joint, prismatic) in enumerate(links):
+        M = (bases if parent < 0 else W[parent]) @ pre[i]
+        if joint >= 0:
+            if prismatic:
+                M[:, :3, 3] += (M[:, :3, :3] @ axes[i]) * Q[:, joint, None]
+            else:
+                M[:, :3, :3] = M[:, :3, :3] @ _axis_rotations(axes[i], Q[:, joint])
+        W[i] = M
+    out[:] = (W[part_links] @ offsets[:, None]).swapaxes(0, 1)
+
+
+try:
+    from swift.phys import chain_fk
+except ImportError:
+    chain_fk = _chain_fk_py
+
+
+# rtb ET axis names, as (unit axis, prismatic)
+_ET_AXES = {
+    "Rx": ((1.0, 0.0, 0.0), False),
+    "Ry": ((0.0, 1.0, 0.0), False),
+    "Rz": ((0.0, 0.0, 1.0), False),
+    "tx": ((1.0, 0.0, 0.0), True),
+    "ty": ((0.0, 1.0, 0.0), True),
+    "tz": ((0.0, 0.0, 1.0), True),
+}
+
+
+class KinematicChain:
+    """
+    A kinematic tree as plain arrays -- each link's fixed transform from
+    its parent, its joint's axis and type, and each rendered part's
+    offset from its link -- so part poses come from one
+    ``phys.chain_fk()`` call instead of an interpreted fk.
+
+    Link ``l``'s frame is ``W[parents[l]] @ transforms[l] @ J``, where
+    ``W[-1]`` is :attr:`base` and ``J`` rotates about (or, for a
+    prismatic joint, translates along) ``axes[l]`` by ``q[joints[l]]`` --
+    or is the identity for a fixed link (``joints[l] == -1``). Part ``p``
+    is at ``W[part_links[p]] @ part_offsets[p]``.
+
+    A chain is a plain model, shareable between any number of
+    ``env.add_assembly(chain, parts)`` handles; Swift evaluates every
+    handle of the same chain whose ``q`` has changed in one batched call
+    (see :meth:`fk_many`).
+
+    :param transforms: ``(L, 4, 4)`` fixed transform of each link from
+        its parent's frame, ahead of its joint
+    :param axes: ``(L, 3)`` joint axis of each link, in its own frame --
+        normalised; ignored for a fixed link
+    :param parents: parent link index of each link, -1 for the base,
+        always lower than the link's own -- defaults to a serial chain
+    :param joints: index into ``q`` of each link's joint, -1 for a fixed
+        link -- defaults to numbering the links with a nonzero axis in
+        order, leaving the rest fixed
+    :param prismatic: True for each link whose joint is prismatic,
+        defaults to every joint being revolute
+    :param part_links: link index of each rendered part, defaults to one
+        part per link
+    :param part_offsets: ``(P, 4, 4)`` offset of each part from its
+        link's frame, defaults to the identity
+    :param base: ``(4, 4)`` pose of the chain's base in the world,
+        defaults to the identity
+
+    :raises ValueError: the arrays' shapes disagree, or an index is out
+        of range
+    """
+
+    def __init__(
+        self,
+        transforms: ArrayLike,
+        axes: ArrayLike,
+        parents: ArrayLike | None = None,
+        joints: ArrayLike | None = None,
+        prismatic: ArrayLike | None = None,
+        part_links: ArrayLike | None = None,
+        part_offsets: ArrayLike | None = None,
+        base: ArrayLike | None = None,
+    ) -> None:
+        transforms = np.array(transforms, dtype=float)
+        L = len(transforms)
+        if transforms.shape != (L, 4, 4):
+            raise ValueError(
+                f"transforms must be (L, 4, 4), got shape {transforms.shape}"
+            )
+
+        axes = np.array(axes, dtype=float).reshape(-1, 3) if L else np.zeros((0, 3))
+        if axes.shape != (L, 3):
+            raise ValueError(f"axes must be ({L}, 3), got {len(axes)} rows")
+        norms = np.linalg.norm(axes, axis=1)
+        moving = norms > 0
+        axes[moving] /= norms[moving, None]
+
+        parents = np.arange(-1, L - 1) if parents is None else np.asarray(parents)
+        if joints is None:
+            joints = np.full(L, -1)
+            joints[moving] = np.arange(np.count_nonzero(moving))
+        joints = np.asarray(joints)
+        prismatic = (
+            np.zeros(L, bool)
+            if prismatic is None
+            else np.asarray(prismatic, dtype=bool)
+        )
+        for name, arr in (
+            ("parents", parents),
+            ("joints", joints),
+            ("prismatic", prismatic),
+        ):
+            if arr.shape != (L,):
+                raise ValueError(
+                    f"{name} must have one entry per link ({L}), got shape {arr.shape}"
+                )
+        if np.any((parents < -1) | (parents >= np.arange(L))):
+            raise ValueError(
+                "each link's parent must be -1 (the base) or an earlier link"
+            )
+        if np.any(joints < -1) or not moving[joints >= 0].all():
+            raise ValueError(
+                "each link's joint must be -1 (fixed) or a q index with a nonzero axis"
+            )
+
+        part_links = np.arange(L) if part_links is None else np.asarray(part_links)
+        P = len(part_links)
+        if part_links.shape != (P,) or np.any((part_links < 0) | (part_links >= L)):
+            raise ValueError(
+                f"part_links must be a 1-d array of link indices below {L}"
+            )
+        if part_offsets is None:
+            part_offsets = np.tile(np.eye(4), (P, 1, 1))
+        part_offsets = np.array(part_offsets, dtype=float)
+        if part_offsets.shape != (P, 4, 4):
+            raise ValueError(
+                f"part_offsets must be ({P}, 4, 4), got shape {part_offsets.shape}"
+            )
+
+        self._pre = transforms
+        self._axes = axes
+        # parent, joint, prismatic -- the (L, 3) intp table chain_fk() reads
+        self._links = np.ascontiguousarray(
+            np.stack([parents, joints, prismatic], axis=1).reshape(L, 3), dtype=np.intp
+        )
+        self._part_links = np.ascontiguousarray(part_links, dtype=np.intp)
+        self._offsets = part_offsets
+        #: number of joints -- the length of the ``q`` this chain takes
+        self.n = int(joints.max()) + 1 if L and joints.max() >= 0 else 0
+        self.base = np.eye(4) if base is None else np.array(base, dtype=float)
+
+    @property
+    def nlinks(self) -> int:
+        return len(self._pre)
+
+    @property
+    def nparts(self) -> int:
+        return len(self._part_links)
+
+    @property
+    def base(self) -> NDArray:
+        """``(4, 4)`` world pose of the chain's base"""
+        return self._base
+
+    @base.setter
+    def base(self, T: ArrayLike) -> None:
+        T = np.array(T, dtype=float)
+        if T.shape != (4, 4):
+            raise ValueError(f"base must be (4, 4), got shape {T.shape}")
+        self._base = T
+
+    def __call__(self, q: ArrayLike, base: ArrayLike | None = None) -> NDArray:
+        """
+        ``(P, 4, 4)`` world pose of every part at ``q`` -- usable as any
+        ``fk`` callable.
+
+        :param base: base pose to evaluate from, defaults to :attr:`base`
+        """
+        return self.fk_many(np.reshape(q, (1, -1)), None if base is None else [base])[0]
+
+    def fk_many(self, Q: ArrayLike, bases: ArrayLike | None = None) -> NDArray:
+        """
+        ``(k, P, 4, 4)`` part poses of ``k`` instances of this chain at
+        once, one row of ``Q`` each.
+
+        :param Q: ``(k, n)`` joint configurations
+        :param bases: ``(k, 4, 4)`` base pose of each instance, defaults
+            to :attr:`base` for all of them
+        :raises ValueError: ``Q`` isn't ``(k, n)`` or ``bases`` ``(k, 4, 4)``
+        """
+        Q = np.ascontiguousarray(Q, dtype=float)
+        if Q.ndim != 2 or Q.shape[1] != self.n:
+            raise ValueError(
+                f"expected (k, {self.n}) joint configurations, got shape {Q.shape}"
+            )
+        k = len(Q)
+        if bases is None:
+            bases = np.broadcast_to(self._base, (k, 4, 4))
+        bases = np.ascontiguousarray(bases, dtype=float)
+        if bases.shape != (k, 4, 4):
+            raise ValueError(
+                f"expected ({k}, 4, 4) base poses, got shape {bases.shape}"
+            )
+        out = np.empty((k, self.nparts, 4, 4))
+        chain_fk(
+            self._pre,
+            self._links,
+            self._axes,
+            self._part_links,
+            self._offsets,
+            Q,
+            bases,
+            out,
+        )
+        return out
+
+    @classmethod
+    def from_robot(
+        cls, robot: "rtb.Robot", robot_alpha: float = 1.0, collision_alpha: float = 0.0
+    ) -> "KinematicChain":
+        """
+        The chain of an ``rtb.Robot``'s links, with a part per geometry
+        in the same order as ``robot.fkine_geometry()``.
+
+        Its ``q`` is the robot's own joints followed by each gripper's, in
+        ``robot.grippers`` order; its :attr:`base` is the robot's base at
+        the time of the call.
+
+        :param robot_alpha: include visual geometry if > 0
+        :param collision_alpha: include collision geometry if > 0
+        :raises ValueError: a link's joint isn't the last of its ETS, or a
+            link's parent isn't one of the robot's or its grippers' links
+        """
+        grippers = list(robot.grippers)
+        links = list(robot.links) + [link for g in grippers for link in g.links]
+        # Each gripper's joints are numbered after the robot's own
+        q_offset = {id(link): 0 for link in robot.links}
+        n = robot.n
+        for g in grippers:
+            for link in g.links:
+                q_offset[id(link)] = n
+            n += len(g.q)
+
+        # Parents ahead of children
+        index: dict[int, int] = {}
+        order = []
+        while len(order) < len(links):
+            placed = len(order)
+            for link in links:
+                parent = link.parent
+                if id(link) not in index and (parent is None or id(parent) in index):
+                    index[id(link)] = len(order)
+                    order.append(link)
+            if len(order) == placed:
+                raise ValueError(
+                    f"{robot.name}: link parents outside the robot and its grippers"
+                )
+
+        L = len(order)
+        pre = np.tile(np.eye(4), (L, 1, 1))
+        axes = np.zeros((L, 3))
+        parents, joints, prismatic = np.full(L, -1), np.full(L, -1), np.zeros(L, bool)
+        for i, link in enumerate(order):
+            if link.parent is not None:
+                parents[i] = index[id(link.parent)]
+            # rtb keeps a link's joint, if any, at the end of its ETS --
+            # everything ahead of it is the fixed transform
+            for et in link.ets:
+                if joints[i] >= 0:
+                    raise ValueError(
+                        f"{robot.name}: link {link.name}'s joint isn't the last "
+                        "of its ETS"
+                    )
+                if not et.isjoint:
+                    pre[i] = pre[i] @ et.A()
+                    continue
+                # ET.kind replaced ET.axis in roboticstoolbox 1.4
+                axis, prismatic[i] = _ET_AXES[getattr(et, "kind", None) or et.axis]
+                axes[i] = np.negative(axis) if et.isflip else axis
+                jindex = link.jindex if link.jindex is not None else et.jindex
+                joints[i] = q_offset[id(link)] + jindex
+
+        part_links, part_offsets = [], []
+        for link in links:
+            i = index[id(link)]
+            geoms = (list(link.geometry) if robot_alpha > 0 else []) + (
+                list(link.collision) if collision_alpha > 0 else []
+            )
+            for geom in geoms:
+                part_links.append(i)
+                part_offsets.append(np.array(geom._T))
+
+        return cls(
+            pre,
+            axes,
+            parents,
+            joints,
+            prismatic,
+            part_links=part_links,
+            part_offsets=np.array(part_offsets).reshape(-1, 4, 4),
+            base=np.array(robot._T),
+        )
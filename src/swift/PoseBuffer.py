@@ -0,0 +1,77 @@
+#!/usr/bin/env python
+"""
+Double-buffered hand-off of pose snapshots from the stepping thread to
+Swift's render thread.
+"""
+
+from threading import Lock
+from typing import NamedTuple
+
+from numpy.typing import NDArray
+
+
+class PoseSnapshot(NamedTuple):
+    """One published frame -- see :meth:`Swift._frame_poses`."""
+
+    #: sim time the poses were taken at
+    t: float
+    #: ``(id, first part, part count)`` per object, ordered by id
+    runs: list[tuple[int, int, int]]
+    #: the runs' stacked ``(n, 7)`` t + xyzw q rows
+    poses: NDArray
+
+
+class PoseBuffer:
+    """
+    Two slots for pose snapshots: :meth:`publish` fills the back one,
+    :meth:`take` swaps it to the front and hands it over.
+
+    The publisher never waits on the reader -- a snapshot that hasn't been
+    taken by the time the next one is published is simply overwritten
+    and counted in :attr:`dropped`, so however slowly the reader drains
+    the buffer it only ever sees the latest state, never a backlog of
+    stale ones. Only the slot swap itself happens under the lock; the
+    reader owns the front snapshot outright until its next :meth:`take`.
+    """
+
+    def __init__(self) -> None:
+        self._slots: list[PoseSnapshot | None] = [None, None]
+        self._back = 0
+        self._fresh = False
+        self._lock = Lock()
+        #: snapshots overwritten before they were taken
+        self.dropped = 0
+
+    def publish(
+        self, t: float, runs: list[tuple[int, int, int]], poses: NDArray
+    ) -> None:
+        """
+        Make this the snapshot the next :meth:`take` returns, replacing
+        any not yet taken. ``poses`` is handed over, not copied -- the
+        caller mustn't write to it afterwards.
+        """
+        with self._lock:
+            if self._fresh:
+                self.dropped += 1
+            self._slots[self._back] = PoseSnapshot(t, runs, poses)
+            self._fresh = True
+
+    def take(self) -> PoseSnapshot | None:
+        """
+        The latest snapshot published since the last call, or None if
+        there hasn't been one.
+        """
+        with self._lock:
+            if not self._fresh:
+                return None
+            front = self._back
+            self._back ^= 1
+            self._slots[self._back] = None
+            self._fresh = False
+            return self._slots[front]
+
+    def clear(self) -> None:
+        """Forget both snapshots, e.g. when the render thread stops."""
+        with self._lock:
+            self._slots = [None, None]
+            self._fresh = False
@@ -0,0 +1,357 @@
+#!/usr/bin/env python
+"""
+Structure-of-arrays pose storage for the plain shapes in a Swift scene.
+"""
+
+import numpy as np
+from numpy.typing import NDArray
+from spatialgeometry import Shape
+
+
+class ShapeStore:
+    """
+    The poses and twists of many shapes, held in contiguous arrays so one
+    ``phys.step_shapes()`` call can integrate them all.
+
+    Every stored shape's ``T``, world transform, world quaternion and
+    ``v`` are views into the store's buffers -- spatialgeometry's
+    ``SceneNode`` only ever writes into those arrays in place, and its C
+    scene node is rebuilt to point at the new memory, so ``shape.T``,
+    ``shape.update()`` and ``shape.v[:] = ...`` keep working unchanged.
+    Reassigning ``shape.v`` replaces the view with a new array; the store
+    picks the new value up and rebinds the view at the next
+    :meth:`sync_v`.
+
+    Only scene-graph roots can be stored (see :meth:`eligible`): a C
+    scene node holds raw pointers to its parent's and children's nodes,
+    so a linked node can't be rebuilt without leaving the others
+    dangling. A stored shape that gains a parent or a child afterwards
+    is handed back by :meth:`evict_linked`, still viewing the buffer it
+    was last bound to -- the store moves everyone else to fresh buffers
+    rather than ever reuse that memory. :meth:`add` and :meth:`remove`
+    may move shapes, so raise RuntimeError until that has been done.
+
+    The store also keeps the pose last sent to the browser for each
+    shape, so both halves of a step only touch the shapes that need it:
+    :meth:`moving` for the ones with a non-zero twist to integrate,
+    :meth:`frame_poses` for the ones whose world pose has changed since
+    -- stepped, or ``T`` assigned -- found by comparing whole arrays
+    rather than by asking each shape.
+
+    Each 4x4 is stored column-major -- ``buffers()[1][i]`` is the
+    transpose of shape ``i``'s ``T`` -- matching the F-ordered arrays
+    spatialgeometry allocates for every node.
+    """
+
+    def __init__(self, capacity: int = 64) -> None:
+        self._n = 0
+        self._shapes: list[Shape] = []
+        # id(shape) -> slot; the store holds a reference to every shape,
+        # so an id can't be reused while it's a key here
+        self._slots: dict[int, int] = {}
+        # The v view each shape was last bound to, by slot -- compared by
+        # identity against shape._v in sync_v(). Holding them here also
+        # keeps their ids from being recycled for a replacement array.
+        self._bound_v: list[NDArray] = []
+        self._allocate(max(capacity, 1))
+
+    def __len__(self) -> int:
+        return self._n
+
+    def __contains__(self, shape: object) -> bool:
+        return self._key(shape) in self._slots
+
+    @staticmethod
+    def eligible(shape: object) -> bool:
+        """
+        Whether ``shape`` can be stored: a Shape with no scene-graph
+        parent or children.
+        """
+        return (
+            isinstance(shape, Shape)
+            and shape.scene_parent is None
+            and not shape.scene_children
+        )
+
+    @property
+    def capacity(self) -> int:
+        return len(self._v)
+
+    @property
+    def shapes(self) -> list[Shape]:
+        """The stored shapes, in slot order"""
+        return list(self._shapes)
+
+    @property
+    def ids(self) -> list[int]:
+        """Each stored shape's Swift object id, in slot order"""
+        return self._ids[: self._n].tolist()
+
+    @property
+    def T(self) -> NDArray:
+        """(n, 4, 4) view of every stored shape's ``T``, in slot order"""
+        return self._T[: self._n].transpose(0, 2, 1)
+
+    @property
+    def v(self) -> NDArray:
+        """(n, 6) view of every stored shape's twist, in slot order"""
+        return self._v[: self._n]
+
+    def buffers(self) -> tuple[NDArray, NDArray, NDArray, NDArray]:
+        """
+        The C-contiguous ``(v, T, wT, wq)`` arrays ``phys.step_shapes()``
+        takes -- (n, 6), (n, 4, 4) column-major, (n, 4, 4) column-major
+        and (n, 4).
+        """
+        n = self._n
+        return self._v[:n], self._T[:n], self._wT[:n], self._wq[:n]
+
+    def slots(self, shapes: list[Shape]) -> NDArray:
+        """
+        Each shape's slot, or -1 for one that isn't stored.
+        """
+        get = self._slots.get
+        return np.array([get(self._key(shape), -1) for shape in shapes], dtype=np.intp)
+
+    def set_poses(self, slots: NDArray, T: NDArray, q: NDArray) -> None:
+        """
+        Set the shapes in ``slots`` to these poses -- each one's ``T``,
+        and so (a root's) world transform, plus its world quaternion.
+
+        :param T: (k, 4, 4) transforms, indexed the usual way round
+        :param q: their (k, 4) xyzw quaternions
+        """
+        T = T.transpose(0, 2, 1)
+        self._T[slots] = T
+        self._wT[slots] = T
+        self._wq[slots] = q
+
+    def moving(self) -> NDArray:
+        """
+        Slots of the shapes with a non-zero twist, ascending -- the rows
+        ``phys.step_shapes()`` needs to integrate. A shape joins (or
+        leaves) as soon as its ``v`` is written.
+        """
+        return np.flatnonzero(self._v[: self._n].any(axis=1))
+
+    def frame_poses(self, tolerance: float | None) -> tuple[list[int], NDArray]:
+        """
+        The stored shapes whose world pose moved further than
+        ``tolerance`` since it was last returned from here, ordered by id
+        -- each one's id, plus their stacked ``(k, 7)`` t + xyzw q rows.
+        A newly added shape is always included once.
+
+        :param tolerance: None returns every shape and records nothing,
+            see ``Swift.launch(pose_tolerance=)``
+        """
+        n = self._n
+        poses = np.empty((n, 7))
+        # row 3 of a column-major 4x4 is the translation column
+        poses[:, :3] = self._wT[:n, 3, :3]
+        poses[:, 3:] = self._wq[:n]
+
+        if tolerance is None:
+            slots = np.arange(n)
+        else:
+            sent = self._sent[:n]
+            # NaN rows (never sent) compare False either way round, so
+            # ask for "within tolerance" and negate
+            moved = ~(np.abs(poses - sent).max(axis=1) <= tolerance)
+            slots = np.flatnonzero(moved)
+            sent[slots] = poses[slots]
+
+        slots = slots[np.argsort(self._ids[slots], kind="stable")]
+        return self._ids[slots].tolist(), poses[slots]
+
+    def add(self, shape: Shape, id: int) -> None:
+        """
+        Move ``shape``'s pose and twist into the store.
+
+        :param shape: an :meth:`eligible` shape, not already stored
+        :param id: its Swift object id
+        :raises ValueError: ``shape`` can't be stored, or already is
+        :raises RuntimeError: growing the buffers would move a shape
+            :meth:`evict_linked` hasn't dropped yet
+        """
+        if shape in self:
+            raise ValueError(f"{shape!r} is already in this ShapeStore")
+        if not self.eligible(shape):
+            raise ValueError(
+                f"{shape!r} can't be stored -- only plain shapes with no "
+                "scene-graph parent or children can be"
+            )
+        if self._n == self.capacity:
+            self._check_unlinked(self._shapes)
+            self._allocate(2 * self.capacity)
+
+        i = self._n
+        self._copy_in(i, shape)
+        self._sent[i] = np.nan
+        self._n += 1
+        self._shapes.append(shape)
+        self._ids[i] = id
+        self._bound_v.append(self._v[i])
+        self._slots[self._key(shape)] = i
+        self._bind(i, shape)
+
+    def remove(self, shape: Shape) -> bool:
+        """
+        Give ``shape`` its own arrays back and drop it from the store.
+
+        :return: whether ``shape`` was stored
+        :raises RuntimeError: ``shape``, or the last stored shape (which
+            takes its slot), is linked and :meth:`evict_linked` hasn't
+            dropped it yet
+        """
+        i = self._slots.get(self._key(shape))
+        if i is None:
+            return False
+
+        last = self._n - 1
+        moved = self._shapes[last]
+        self._check_unlinked([shape, moved])
+
+        self._release(shape)
+        del self._slots[self._key(shape)]
+        if i != last:
+            self._T[i] = self._T[last]
+            self._wT[i] = self._wT[last]
+            self._wq[i] = self._wq[last]
+            self._sent[i] = self._sent[last]
+            self._v[i] = moved._v
+            self._shapes[i] = moved
+            self._ids[i] = self._ids[last]
+            self._bound_v[i] = self._v[i]
+            self._slots[self._key(moved)] = i
+            self._bind(i, moved)
+        self._shapes.pop()
+        self._bound_v.pop()
+        self._n -= 1
+        return True
+
+    def evict_linked(self) -> list[tuple[int, Shape]]:
+        """
+        Drop every stored shape that has gained a scene-graph parent or
+        child since it was added -- ``phys.step_shapes()`` treats every
+        shape as a root.
+
+        :return: ``(id, shape)`` for each one dropped, in slot order
+        """
+        shapes = self._shapes
+        if all(s._scene_parent is None and not s._scene_children for s in shapes):
+            return []
+
+        linked = [self._linked(shape) for shape in shapes]
+        evicted = [(int(self._ids[i]), shapes[i]) for i in range(self._n) if linked[i]]
+        self._rebuild([i for i in range(self._n) if not linked[i]])
+        return evicted
+
+    def changed(self) -> list[tuple[int, Shape]]:
+        """
+        ``(id, shape)`` for every stored shape flagged ``_changed`` (a
+        colour, scale, opacity... setter ran) -- flags are left set.
+        """
+        return [(i, s) for i, s in zip(self.ids, self._shapes) if s._changed]
+
+    def with_coal(self, slots: NDArray | None = None) -> list[Shape]:
+        """
+        The stored collision shapes whose Coal collision object has been
+        created -- the ones whose world transform must also be pushed to
+        it after stepping (``CollisionShape._update_coal()``).
+
+        :param slots: only consider these slots, e.g. :meth:`moving`'s
+        """
+        shapes = self._shapes
+        if slots is not None:
+            shapes = [shapes[i] for i in slots.tolist()]
+        return [s for s in shapes if getattr(s, "co", None) is not None]
+
+    def sync_v(self) -> None:
+        """
+        Copy in the twist of any shape whose ``v`` was reassigned (rather
+        than written into) since the last call, and rebind its view.
+        """
+        shapes, bound = self._shapes, self._bound_v
+        if all(s._v is b for s, b in zip(shapes, bound)):
+            return
+        for i, shape in enumerate(shapes):
+            if shape._v is not bound[i]:
+                self._v[i] = shape._v
+                shape._v = bound[i]
+
+    @staticmethod
+    def _key(shape: Shape) -> int:
+        return id(shape)
+
+    @staticmethod
+    def _linked(shape: Shape) -> bool:
+        return shape.scene_parent is not None or bool(shape.scene_children)
+
+    def _check_unlinked(self, shapes: list[Shape]) -> None:
+        # Moving a linked shape would leave its relatives' C nodes
+        # pointing at the node it replaced
+        if any(self._linked(shape) for shape in shapes):
+            raise RuntimeError(
+                "a stored shape has gained a scene-graph parent or child -- "
+                "call ShapeStore.evict_linked() before adding or removing"
+            )
+
+    def _allocate(self, capacity: int, keep: list[int] | None = None) -> None:
+        # New buffers holding the given slots (every slot by default),
+        # packed from 0, each shape rebound to its new place
+        if keep is None:
+            keep = list(range(self._n))
+        old = getattr(self, "_T", None)
+        T = np.zeros((capacity, 4, 4))
+        wT = np.zeros((capacity, 4, 4))
+        wq = np.zeros((capacity, 4))
+        v = np.zeros((capacity, 6))
+        sent = np.full((capacity, 7), np.nan)
+        ids = np.zeros(capacity, dtype=np.intp)
+        if old is not None and keep:
+            ids[: len(keep)] = self._ids[keep]
+            T[: len(keep)] = self._T[keep]
+            wT[: len(keep)] = self._wT[keep]
+            wq[: len(keep)] = self._wq[keep]
+            v[: len(keep)] = self._v[keep]
+            sent[: len(keep)] = self._sent[keep]
+        self._T, self._wT, self._wq, self._v, self._sent = T, wT, wq, v, sent
+        self._ids = ids
+
+        shapes = [self._shapes[i] for i in keep]
+        self._n = len(keep)
+        self._shapes = shapes
+        self._bound_v = [v[i] for i in range(self._n)]
+        self._slots = {self._key(shape): i for i, shape in enumerate(shapes)}
+        for i, shape in enumerate(shapes):
+            self._bind(i, shape)
+
+    def _rebuild(self, keep: list[int]) -> None:
+        # Same capacity, fresh memory -- anything still viewing the old
+        # buffers (a linked shape) keeps it to itself
+        self._allocate(self.capacity, keep)
+
+    def _copy_in(self, i: int, shape: Shape) -> None:
+        self._T[i] = shape._SceneNode__T.T
+        self._wT[i] = shape._SceneNode__wT.T
+        self._wq[i] = shape._SceneNode__wq
+        self._v[i] = shape._v
+
+    def _bind(self, i: int, shape: Shape) -> None:
+        # Point the shape, and its C scene node, at slot i. Replacing
+        # _SceneNode__scene frees the old node, which nothing else
+        # references -- the shape is a root with no children.
+        shape._SceneNode__T = self._T[i].T
+        shape._SceneNode__wT = self._wT[i].T
+        shape._SceneNode__wq = self._wq[i]
+        shape._v = self._bound_v[i]
+        shape._SceneNode__scene = shape._SceneNode__init_c()
+
+    @staticmethod
+    def _release(shape: Shape) -> None:
+        # Private copies of everything _bind() replaced
+        shape._SceneNode__T = shape._SceneNode__T.copy(order="F")
+        shape._SceneNode__wT = shape._SceneNode__wT.copy(order="F")
+        shape._SceneNode__wq = shape._SceneNode__wq.copy()
+        shape._v = shape._v.copy()
+        shape._SceneNode__scene = shape._SceneNode__init_c()
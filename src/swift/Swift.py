@@ -3,21 +3,35 @@
 @author Jesse Haviland
 """
 
+import builtins
 import os
 from typing import TYPE_CHECKING, Any, Callable, Literal
 import numpy as np
 from numpy.typing import NDArray
-import spatialmath as sm
 from spatialmath import SE3
 from spatialgeometry import Shape
 from spatialgeometry.geom.Shape import ArrayLike
 import time
 from queue import Queue, Empty
-from threading import Event
+from threading import Event, RLock, Thread
+from concurrent.futures import Future, TimeoutError as _FutureTimeout
 import json
-from swift import start_servers, SwiftElement, Button, Select
-from swift.Handle import AssemblyHandle
+from swift import (
+    start_servers,
+    LoopChannel,
+    MountTracker,
+    ReplyRouter,
+    SwiftElement,
+    Button,
+    Select,
+)
+from swift.SwiftRoute import _COMPRESSION_THRESHOLD
+from swift.Handle import AssemblyHandle, InstanceHandle, _prime_chains
+from swift.KinematicChain import KinematicChain
 from swift.Light import Light
+from swift.ShapeStore import ShapeStore
+from swift.JointStore import JointStore, _joint_limits
+from swift.PoseBuffer import PoseBuffer
 
 if TYPE_CHECKING:
     # Aliased to avoid shadowing the module-level `rtb` global below,
@@ -27,9 +41,97 @@ if TYPE_CHECKING:
     import roboticstoolbox as _rtb_types
 
 
-def _se3_to_wire(T: SE3) -> dict[str, list[float]]:
-    """Matches spatialgeometry Shape.fk_dict()'s wire format: t + xyzw q."""
-    return {"t": T.t.tolist(), "q": sm.base.r2q(T.R, order="xyzs").tolist()}
+# Frame kind tags -- the first uint32 of every binary websocket message, so
+# frames.js's decodeFrame() knows what it's looking at without a JSON
+# [code, data] envelope around it: a lockstep "shape_poses" frame, or a
+# streamed "shape_frame" (see launch(max_inflight=)), which also carries
+# its sequence number.
+_FRAME_SHAPE_POSES = 1
+_FRAME_SHAPE_FRAME = 2
+
+
+def _pack_pose_frame(
+    kind: int, runs: list[tuple[int, int, int]], poses: NDArray, tag: int
+) -> bytes:
+    """
+    Packs a ``shape_poses``/``shape_frame`` update into
+    launch(binary_poses=True)'s binary frame layout (all little-endian --
+    see frames.js's decodeFrame()):
+
+    .. code-block:: text
+
+        uint32  kind            _FRAME_SHAPE_POSES or _FRAME_SHAPE_FRAME
+        uint32  n_runs
+        uint32  tag             request id / streamed frame sequence number
+        uint32  run[n_runs][3]  (object id, first part, part count)
+        float32 pose[sum(part count)][7]   tx ty tz qx qy qz qw
+
+    Each run poses ``part count`` consecutive parts of one object, starting
+    at ``first part``; ``poses`` holds every run's rows back to back, in run
+    order. float32 is deliberate -- three.js stores positions/quaternions
+    as float32 on the GPU anyway, so float64 would only double the payload.
+
+    :param kind: ``_FRAME_SHAPE_POSES`` (lockstep, replied to) or
+        ``_FRAME_SHAPE_FRAME`` (streamed, see launch(max_inflight=))
+    :param runs: one ``(id, first, count)`` triple per run
+    :param poses: ``(sum(count), 7)`` translation + xyzw quaternion rows
+    :param tag: the request id the browser's reply must carry (see
+        SwiftRoute.py's ReplyRouter) for ``_FRAME_SHAPE_POSES``, the frame's
+        sequence number for ``_FRAME_SHAPE_FRAME``
+    """
+    header = np.array([kind, len(runs), tag], dtype="<u4")
+    table = np.array(runs, dtype="<u4").reshape(-1, 3)
+    body = np.ascontiguousarray(poses, dtype="<f4")
+    return header.tobytes() + table.tobytes() + body.tobytes()
+
+
+def _check_filename(shape: Shape) -> None:
+    """
+    :raises ValueError: ``shape`` is a mesh with a relative ``filename``
+    """
+    filename = getattr(shape, "filename", None)
+    if isinstance(filename, str) and not os.path.isabs(filename):
+        raise ValueError(
+            f"{type(shape).__name__}(filename={filename!r}) is a "
+            "relative path, but Swift serves mesh files from an "
+            "absolute path on disk -- pass an absolute path, e.g. "
+            f"str(Path(__file__).parent / {filename!r})"
+        )
+
+
+def _pack_pose_json(
+    runs: list[tuple[int, int, int]], poses: NDArray
+) -> list[list[Any]]:
+    """
+    The JSON ``shape_poses`` payload for the same ``runs``/``poses``
+    _pack_pose_frame() takes: one ``[id, [{"t", "q"}, ...]]`` entry per
+    run, with a trailing ``first`` part index only when a run doesn't
+    start at part 0 (see shapes.js's SwiftObject.setPoses()).
+    """
+    msg = []
+    offset = 0
+    for i, first, count in runs:
+        rows = poses[offset : offset + count]
+        offset += count
+        entry: list[Any] = [
+            i,
+            [{"t": row[:3].tolist(), "q": row[3:].tolist()} for row in rows],
+        ]
+        if first:
+            entry.append(first)
+        msg.append(entry)
+    return msg
+
+
+def _mask_runs(mask: NDArray) -> list[tuple[int, int]]:
+    """``(first, count)`` for each stretch of consecutive True in ``mask``."""
+    idx = np.flatnonzero(mask)
+    if len(idx) == 0:
+        return []
+    breaks = np.flatnonzero(np.diff(idx) != 1) + 1
+    starts = np.concatenate(([0], breaks))
+    ends = np.concatenate((breaks, [len(idx)]))
+    return [(int(idx[a]), int(b - a)) for a, b in zip(starts, ends)]
 
 
 def _step_v_py(n: int, valid: bool, dt: float, q: NDArray, qd: NDArray, qlim: NDArray) -> None:
@@ -38,37 +140,264 @@ def _step_v_py(n: int, valid: bool, dt: float, q: NDArray, qd: NDArray, qlim: ND
         np.clip(q, qlim[0], qlim[1], out=q)
 
 
+def _check_substeps(substeps: int) -> None:
+    if substeps < 1:
+        raise ValueError(f"substeps must be at least 1, got {substeps}")
+
+
+def _step_joints_py(
+    dt: float,
+    q: NDArray,
+    qd: NDArray,
+    lo: NDArray,
+    hi: NDArray,
+    idx: NDArray | None = None,
+    substeps: int = 1,
+) -> None:
+    # phys.step_joints()'s fallback: _step_v_py() over a whole JointStore,
+    # or just its idx joints, clamping by the same comparisons as
+    # phys.step_v() -- so a NaN limit never clamps
+    _check_substeps(substeps)
+    if idx is not None:
+        stepped = q[idx]
+        _step_joints_py(dt, stepped, qd[idx], lo[idx], hi[idx], None, substeps)
+        q[idx] = stepped
+        return
+    h = dt / substeps
+    for _ in range(substeps):
+        q += qd * h
+        np.copyto(q, hi, where=q > hi)
+        np.copyto(q, lo, where=q < lo)
+
+
+def _step_joints_a_py(
+    dt: float,
+    q: NDArray,
+    qd: NDArray,
+    qdd: NDArray,
+    lo: NDArray,
+    hi: NDArray,
+    qdlim: NDArray,
+    idx: NDArray | None = None,
+    substeps: int = 1,
+) -> None:
+    # phys.step_joints_a()'s fallback: qdd into qd, clamped to +-qdlim,
+    # then qd into q, clamped to [lo, hi] -- zeroing the velocity that
+    # would carry a clamped joint further into its limit
+    _check_substeps(substeps)
+    if idx is not None:
+        stepped = q[idx], qd[idx]
+        _step_joints_a_py(
+            dt, *stepped, qdd[idx], lo[idx], hi[idx], qdlim[idx], None, substeps
+        )
+        q[idx], qd[idx] = stepped
+        return
+    h = dt / substeps
+    for _ in range(substeps):
+        qd += qdd * h
+        np.copyto(qd, qdlim, where=qd > qdlim)
+        np.copyto(qd, -qdlim, where=qd < -qdlim)
+        q += qd * h
+        high, low = q > hi, q < lo
+        np.copyto(q, hi, where=high)
+        np.copyto(q, lo, where=low)
+        qd[(high & (qd > 0)) | (low & (qd < 0))] = 0.0
+
+
 def _step_shape_py(dt: float, v: NDArray, base: NDArray, sT: NDArray, sq: NDArray) -> None:
+    # phys.step_shape()'s fallback: integrate base by v, then write the
+    # world transform and xyzw quaternion of a scene-graph root
+    _step_shapes_py(dt, v[None], base.T[None], sT.T[None], sq[None])
+
+
+def _r2q_py(R: NDArray, q: NDArray) -> None:
+    # xyzw quaternions of a stack of rotation matrices, by the same
+    # branch-on-trace algorithm as SceneNode.update() (spatialgeometry's
+    # scene_nb.cpp) and phys.cpp's _r2q_cm()
+    r = R
+    tr = r[:, 0, 0] + r[:, 1, 1] + r[:, 2, 2]
+    cases = [
+        tr > 0,
+        (r[:, 0, 0] > r[:, 1, 1]) & (r[:, 0, 0] > r[:, 2, 2]),
+        r[:, 1, 1] > r[:, 2, 2],
+    ]
+    case = np.select(cases, [0, 1, 2], 3)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        S = 2.0 * np.sqrt(
+            np.choose(
+                case,
+                [
+                    tr + 1.0,
+                    1.0 + r[:, 0, 0] - r[:, 1, 1] - r[:, 2, 2],
+                    1.0 + r[:, 1, 1] - r[:, 0, 0] - r[:, 2, 2],
+                    1.0 + r[:, 2, 2] - r[:, 0, 0] - r[:, 1, 1],
+                ],
+            )
+        )
+        d21, d02, d10 = (
+            r[:, 2, 1] - r[:, 1, 2],
+            r[:, 0, 2] - r[:, 2, 0],
+            r[:, 1, 0] - r[:, 0, 1],
+        )
+        s01, s02, s12 = (
+            r[:, 0, 1] + r[:, 1, 0],
+            r[:, 0, 2] + r[:, 2, 0],
+            r[:, 1, 2] + r[:, 2, 1],
+        )
+        quarter = 0.25 * S
+        q[:, 0] = np.choose(case, [d21 / S, quarter, s01 / S, s02 / S])
+        q[:, 1] = np.choose(case, [d02 / S, s01 / S, quarter, s12 / S])
+        q[:, 2] = np.choose(case, [d10 / S, s02 / S, s12 / S, quarter])
+        q[:, 3] = np.choose(case, [quarter, d21 / S, d02 / S, d10 / S])
+
+
+def _q2r_py(q: NDArray) -> NDArray:
+    # Rotation matrices of a stack of xyzw quaternions, normalised first
+    q = q / np.linalg.norm(q, axis=1, keepdims=True)
+    x, y, z, w = q.T
+    R = np.empty((len(q), 3, 3))
+    R[:, 0, 0] = 1 - 2 * (y * y + z * z)
+    R[:, 0, 1] = 2 * (x * y - z * w)
+    R[:, 0, 2] = 2 * (x * z + y * w)
+    R[:, 1, 0] = 2 * (x * y + z * w)
+    R[:, 1, 1] = 1 - 2 * (x * x + z * z)
+    R[:, 1, 2] = 2 * (y * z - x * w)
+    R[:, 2, 0] = 2 * (x * z - y * w)
+    R[:, 2, 1] = 2 * (y * z + x * w)
+    R[:, 2, 2] = 1 - 2 * (x * x + y * y)
+    return R
+
+
+def _group_poses(
+    poses: ArrayLike, n: int, source: str | None = None
+) -> tuple[NDArray, NDArray]:
+    """
+    A group callback's return value (or add_instances()'s poses) as
+    ``(n, 4, 4)`` transforms plus their ``(n, 4)`` xyzw quaternions,
+    whichever of the two it gave.
+
+    :param source: the error message's lead-in, defaults to the group
+        callback's
+    :raises ValueError: it isn't an ``(n, 4, 4)`` or ``(n, 7)`` array
+    """
+    poses = np.asarray(poses, dtype=float)
+    if poses.shape == (n, 4, 4):
+        return poses, _poses_to_rows(poses)[:, 3:]
+    if poses.shape == (n, 7):
+        T = np.zeros((n, 4, 4))
+        T[:, :3, :3] = _q2r_py(poses[:, 3:])
+        T[:, :3, 3] = poses[:, :3]
+        T[:, 3, 3] = 1.0
+        q = poses[:, 3:] / np.linalg.norm(poses[:, 3:], axis=1, keepdims=True)
+        return T, q
+    if source is None:
+        source = f"a group callback over {n} shapes must return"
+    raise ValueError(
+        f"{source} an ({n}, 4, 4) or ({n}, 7) array, got shape {poses.shape}"
+    )
+
+
+def _poses_to_rows_py(T: NDArray, rows: NDArray) -> None:
+    # phys.poses_to_rows()'s fallback: (n, 4, 4) transforms into (n, 7)
+    # t + xyzw q rows
+    rows[:, :3] = T[:, :3, 3]
+    _r2q_py(T[:, :3, :3], rows[:, 3:])
+
+
+def _poses_to_rows(T: ArrayLike) -> NDArray:
+    """
+    A stack of ``(n, 4, 4)`` transforms as the ``(n, 7)`` t + xyzw q rows
+    every pose frame is encoded from, in one phys.poses_to_rows() pass.
+
+    :raises ValueError: ``T`` isn't an ``(n, 4, 4)`` array
+    """
+    T = np.ascontiguousarray(T, dtype=float)
+    if T.ndim != 3 or T.shape[1:] != (4, 4):
+        raise ValueError(f"expected an (n, 4, 4) array of poses, got shape {T.shape}")
+    rows = np.empty((len(T), 7))
+    poses_to_rows(T, rows)
+    return rows
+
+
+def _part_rows(poses: "list[SE3] | NDArray") -> NDArray:
+    """
+    An assembly's part_poses() as ``(n, 7)`` rows -- an fk returning an
+    ``(n, 4, 4)`` stack skips even stacking its SE3s.
+    """
+    if isinstance(poses, np.ndarray):
+        return _poses_to_rows(poses)
+    # A list of SE3 -- stacked, then encoded the same way
+    return _poses_to_rows([T.A for T in poses]) if poses else np.empty((0, 7))
+
+
+def _step_shapes_py(
+    dt: float,
+    v: NDArray,
+    T: NDArray,
+    wT: NDArray,
+    wq: NDArray,
+    idx: NDArray | None = None,
+    substeps: int = 1,
+) -> None:
+    # _step_shape_py() over a whole ShapeStore at once, or just its idx
+    # rows. T/wT hold each 4x4 column-major, as phys.step_shapes() takes
+    # them -- transposing gives views indexed the usual way round.
+    _check_substeps(substeps)
+    if idx is not None:
+        rows = T[idx], wT[idx], wq[idx]
+        _step_shapes_py(dt, v[idx], *rows, None, substeps)
+        T[idx], wT[idx], wq[idx] = rows
+        return
+
+    base = T.transpose(0, 2, 1)
+    for _ in range(substeps):
+        _step_poses_py(dt / substeps, v, base)
+    wT[:] = T
+    _r2q_py(base[:, :3, :3], wq)
+
+
+def _step_poses_py(dt: float, v: NDArray, base: NDArray) -> None:
+    # Integrate a stack of 4x4 poses, each by its own twist, in place
     eps = 2.220446049250313e-16
     dv = v * dt
-    theta = np.linalg.norm(dv[3:6])
-    R = np.eye(3)
-    if theta > 10 * eps:
-        axis = dv[3:6] / theta
-        sk = np.array(
-            [
-                [0, -axis[2], axis[1]],
-                [axis[2], 0, -axis[0]],
-                [-axis[1], axis[0], 0],
-            ]
-        )
-        R += np.sin(theta) * sk + (1.0 - np.cos(theta)) * (sk @ sk)
-    base[:3, :3] = R @ base[:3, :3]
-    o = base[:3, 1].copy()
-    a = base[:3, 2].copy()
+    theta = np.linalg.norm(dv[:, 3:6], axis=1)
+    R = np.broadcast_to(np.eye(3), (len(v), 3, 3)).copy()
+    turning = theta > 10 * eps
+    if turning.any():
+        axis = dv[turning, 3:6] / theta[turning, None]
+        sk = np.zeros((len(axis), 3, 3))
+        sk[:, 0, 1], sk[:, 0, 2] = -axis[:, 2], axis[:, 1]
+        sk[:, 1, 0], sk[:, 1, 2] = axis[:, 2], -axis[:, 0]
+        sk[:, 2, 0], sk[:, 2, 1] = -axis[:, 1], axis[:, 0]
+        th = theta[turning, None, None]
+        R[turning] += np.sin(th) * sk + (1.0 - np.cos(th)) * (sk @ sk)
+    base[:, :3, :3] = R @ base[:, :3, :3]
+    o = base[:, :3, 1].copy()
+    a = base[:, :3, 2].copy()
     n = np.cross(o, a)
     o = np.cross(a, n)
-    base[:3, 0] = n / np.linalg.norm(n)
-    base[:3, 1] = o / np.linalg.norm(o)
-    base[:3, 2] = a / np.linalg.norm(a)
-    base[:3, 3] += dv[:3]
+    base[:, :3, 0] = n / np.linalg.norm(n, axis=1, keepdims=True)
+    base[:, :3, 1] = o / np.linalg.norm(o, axis=1, keepdims=True)
+    base[:, :3, 2] = a / np.linalg.norm(a, axis=1, keepdims=True)
+    base[:, :3, 3] += dv[:, :3]
 
 
 try:
-    from swift.phys import step_v, step_shape
+    from swift.phys import (
+        step_v,
+        step_shape,
+        step_shapes,
+        step_joints,
+        step_joints_a,
+        poses_to_rows,
+    )
 except ImportError:
+    poses_to_rows = _poses_to_rows_py
     step_v = _step_v_py
+    step_joints = _step_joints_py
+    step_joints_a = _step_joints_a_py
     step_shape = _step_shape_py
+    step_shapes = _step_shapes_py
 
 
 # Options for the built-in realtime-speed control -- None means uncapped
@@ -77,9 +406,9 @@ _REALTIME_SPEED_LABELS = ["Max", "1x", "0.5x", "0.25x"]
 _REALTIME_SPEEDS = [None, 1.0, 0.5, 0.25]
 
 # How long to wait for a reply to a message that expects one. The browser
-# always replies synchronously -- even "shape_mounted" polls report
-# load-in-progress rather than blocking on the load itself (see
-# shapes.js:SwiftObject) -- so a hang past this means the tab has gone away
+# always replies synchronously -- asset loading, which can legitimately
+# take a while, is reported separately by a pushed "mounted" event (see
+# _wait_mounted()) -- so a hang past this means the tab has gone away
 # (closed, crashed, or dropped into a different window/profile mid-drag,
 # see bugs.md) rather than being legitimately busy.
 _REPLY_TIMEOUT = 15
@@ -93,6 +422,25 @@ _DISCONNECT_POLL_INTERVAL = 0.05
 rtb: Any = None
 
 
+def _reply_timeout(code: str, elapsed: float) -> TimeoutError:
+    return TimeoutError(
+        "Swift browser tab stopped responding (no "
+        f"reply to '{code}' after {elapsed:.1f}s) -- "
+        "it may have been closed, crashed, or dropped "
+        "into a different window/profile mid-drag. "
+        "Call env.close() then env.launch() again to "
+        "reconnect."
+    )
+
+
+def _mount_disconnected(id: int) -> TimeoutError:
+    return TimeoutError(
+        f"Swift browser tab disconnected while object {id} "
+        "was loading. Call env.close() then env.launch() "
+        "again to reconnect."
+    )
+
+
 def _import_rtb() -> None:  # pragma nocover
     import importlib
 
@@ -129,8 +477,23 @@ class Swift:
     """
 
     def __init__(self, _dev: bool = False) -> None:
-        self.outq: Queue = Queue()
+        # Drained by SwiftSocket's event loop without a worker thread --
+        # see LoopChannel.
+        self.outq: LoopChannel = LoopChannel()
         self.inq: Queue = Queue()
+        # Unsolicited browser events (streamed frame acknowledgements) --
+        # see SwiftSocket.consumer() and _process_frame_acks().
+        self.evq: Queue = Queue()
+        # Request id -> reply future for every message awaiting an answer
+        # -- see _request()/_await_reply().
+        self._replies = ReplyRouter()
+        # Object id -> future completed by the browser's pushed "mounted"
+        # event -- see _wait_mounted()/mounted().
+        self._mounts = MountTracker()
+        # Held while an object/element id is reserved and its message
+        # queued, so concurrent add*() calls from different threads get
+        # ids in the same order the browser receives them.
+        self._lock = RLock()
 
         self._dev = _dev
 
@@ -153,16 +516,48 @@ class Swift:
         # than being deleted, so every other object's index stays stable.
         self.swift_objects: list[Shape | AssemblyHandle | None] = []
 
+        # What step() actually iterates. Shapes that are scene-graph
+        # roots live in _shape_store, whose contiguous pose/twist arrays
+        # phys.step_shapes() integrates in one call; everything else
+        # (assemblies, linked or callback-driven shapes) is stepped one
+        # by one from _loose, keyed by swift_objects index. Robots' handles
+        # stay in _loose too, but their joints also live in _joint_store,
+        # which phys.step_joints() integrates in one call -- only their
+        # callbacks still run one by one.
+        self._shape_store = ShapeStore()
+        self._joint_store = JointStore()
+        self._loose: dict[int, Shape | AssemblyHandle] = {}
+
         # Debug/display names, keyed by the same id as swift_objects --
         # not stored on the objects themselves (Shape isn't swift's to
         # extend). Set via the name= kwarg on any add_*() method.
         self.swift_names: dict[int, str] = {}
 
+        # The reverse lookups, kept in step with swift_objects/swift_names
+        # by _place()/_register()/_forget() so finding an object's id --
+        # every changed shape, every step -- and remove()/env["name"]
+        # never scan the scene. Each maps to the live ids in the order
+        # they were added (the same object or name can be used twice),
+        # the first being the one a lookup finds. Objects are keyed by
+        # id() -- swift_objects holds a reference to each, so the id
+        # can't be reused while it's here -- and a robot's handle is
+        # also reachable from the robot itself, as remove(robot) allows.
+        self._object_ids: dict[int, list[int]] = {}
+        self._name_ids: dict[str, list[int]] = {}
+
         # Per-step pose callbacks for plain shapes, keyed by swift_objects
         # index -- see add_shape(..., callback=...). AssemblyHandle carries
         # its own .callback directly since it's swift's own class.
         self.shape_callbacks: dict[int, Callable[[float, dict[str, object]], SE3]] = {}
 
+        # Per-step pose callbacks for whole groups of shapes -- see
+        # add_shapes(..., callback=...). Each is the callback plus its
+        # shapes' ids, in the order its returned rows are in; a removed
+        # shape's id becomes -1 and its row is ignored from then on.
+        self.group_callbacks: list[
+            tuple[Callable[[float, dict[str, object]], NDArray], NDArray]
+        ] = []
+
         # Current value of every named UI element with a .value, kept
         # current by each element pushing into this dict on change (see
         # SwiftElement._notify_value_changed()) rather than being
@@ -201,6 +596,46 @@ class Swift:
         # applies even if this process was killed outright rather than
         # exiting through hold().
         self._browser_timeout: float | None = 5
+        # Set by launch(binary_poses=) -- see _draw_all(). Off by default:
+        # the JSON shape_poses payload is what every other tool reading
+        # this protocol (and every test in tests/test_protocol.py) expects.
+        self._binary_poses = False
+        # Set by launch(pose_tolerance=) -- see _frame_poses(). None sends
+        # every part's pose every frame; otherwise only parts that moved
+        # further than this since the pose last actually sent for them.
+        self._pose_tolerance: float | None = 0.0
+        # The last pose sent to the browser for every part, keyed by
+        # swift_objects index -- an (n_parts, 7) t + xyzw q array each,
+        # updated in place as parts are resent. Dropped on remove().
+        self._sent_poses: dict[int, NDArray] = {}
+        # Set by launch(max_inflight=) -- see _stream_frame(). None renders
+        # in lockstep: every frame waits for the browser's reply.
+        self._max_inflight: int | None = None
+        # Sequence number of the last streamed frame sent, and of the
+        # last one the browser acknowledged -- their difference is the
+        # number of frames currently in flight.
+        self._frame_seq = 0
+        self._frame_acked = 0
+        # Set by launch(render_thread=) -- see _render_loop(). step()
+        # publishes each frame's poses into _snapshots, and the thread
+        # (None until launched) draws whichever is latest at each tick.
+        self._render_threaded = False
+        self._render_thread: Thread | None = None
+        self._render_stop = Event()
+        self._snapshots = PoseBuffer()
+        # "shape_update" replies step() leaves for the render thread to
+        # collect, so a changed shape never holds up the step.
+        self._render_replies: Queue = Queue()
+        # UI events from the render thread's frames, applied by the next
+        # step() -- element callbacks never run on the render thread.
+        self._render_events: Queue = Queue()
+        # The render thread's own pose_tolerance state: the run layout of
+        # the last snapshot it drew, and every row's pose as last sent.
+        self._drawn: tuple[list[tuple[int, int, int]], NDArray] | None = None
+        # Set by launch(compression=, compression_threshold=) -- see
+        # SwiftRoute.py's ThresholdDeflate.
+        self._compression = True
+        self._compression_threshold = _COMPRESSION_THRESHOLD
         # Set by launch(browser="notebook") -- see close()'s clear_cell=.
         self._notebook_display_handle: Any = None
         # Set by SwiftSocket the instant a disconnect is detected server-
@@ -263,10 +698,10 @@ class Swift:
             already removed, or an out-of-range id)
         """
         if isinstance(key, str):
-            for i, name in self.swift_names.items():
-                if name == key and self.swift_objects[i] is not None:
-                    return self.swift_objects[i]
-            raise KeyError(f"no object named {key!r}")
+            ids = self._name_ids.get(key)
+            if not ids:
+                raise KeyError(f"no object named {key!r}")
+            return self.swift_objects[ids[0]]
 
         try:
             obj = self.swift_objects[key]
@@ -316,6 +751,12 @@ class Swift:
         lights: list[Light] | None = None,
         timeout: float | None = 1,
         browser_timeout: float | None = 5,
+        binary_poses: bool = False,
+        pose_tolerance: float | None = 0.0,
+        max_inflight: int | None = None,
+        compression: bool = True,
+        compression_threshold: int = _COMPRESSION_THRESHOLD,
+        render_thread: bool = False,
         **kwargs: Any,
     ) -> None:
         """
@@ -424,10 +865,147 @@ class Swift:
             user-opened tab (the common case) ``window.close()`` is a
             silent no-op and the tab is left showing a "Disconnected"
             banner instead.
+        :param binary_poses: send each rendered frame's poses as one packed
+            binary websocket message (an index table plus a float32
+            translation/quaternion buffer) instead of nested JSON -- much
+            cheaper to encode and decode for scenes with many parts. The
+            browser side handles either; defaults to False (JSON). See
+            :doc:`internals` for the frame layout.
+        :param pose_tolerance: only resend a part's pose once it has moved
+            further than this from the pose last sent for it -- measured as
+            the largest absolute change in any translation (metres) or
+            quaternion component. The browser keeps every part not
+            included in a frame exactly where it was, so static scenery
+            costs nothing per frame after its first. ``0.0`` (default)
+            resends any change at all; ``None`` disables the cache and
+            resends every pose every frame.
+        :param max_inflight: stream rendered frames instead of waiting for
+            the browser to answer each one: :meth:`step` sends its pose
+            frame and returns straight away, up to this many frames may be
+            awaiting the browser's acknowledgement at once, and a frame
+            that would exceed that is dropped (the next one carries the
+            latest poses anyway). UI events come back with each
+            acknowledgement and are applied at the start of the next
+            :meth:`step`, rather than within the step that sent the frame.
+            ``None`` (default) renders in lockstep, as before.
+        :param compression: offer the browser permessage-deflate
+            compression on the websocket, defaults to True. Large
+            payloads -- robot part lists, long :class:`~spatialgeometry.Polyline`
+            point lists, pose frames for big scenes -- typically shrink
+            several times over; see ``benchmarks/bench_compression.py``.
+        :param compression_threshold: only compress messages of at least
+            this many bytes, defaults to 1024 -- small, latency-sensitive
+            control messages (sim time, UI updates, replies) go out as-is.
+            ``0`` compresses everything.
+        :param render_thread: draw from a thread of Swift's own instead
+            of inside :meth:`step`: each step only advances the scene and
+            publishes a snapshot of its poses (at most ``rate`` times a
+            second, like a lockstep frame), and the thread sends the
+            latest snapshot ``rate`` times a second and waits for the
+            browser's reply. Its UI events are queued and applied at the
+            start of the next :meth:`step`, so element callbacks still
+            run on the stepping thread, before that step's own
+            callbacks -- never alongside them. A snapshot superseded
+            before the thread gets to it is dropped, never queued, and
+            the caller's step rate no longer depends on the browser's.
+            Defaults to False. Can't be combined with ``max_inflight``.
+
+        """
+        self._configure(
+            realtime,
+            headless,
+            rate,
+            browser,
+            axes,
+            ground_opacity,
+            ground_pattern,
+            ground_pattern_width,
+            lights,
+            timeout,
+            browser_timeout,
+            binary_poses,
+            pose_tolerance,
+            max_inflight,
+            compression,
+            compression_threshold,
+            render_thread,
+        )
 
+        if not self.headless:
+            self._begin_session()
+            (
+                self.socket_thread,
+                self.socket,
+                self.server_thread,
+                self.server,
+                self._notebook_display_handle,
+            ) = start_servers(
+                self.outq,
+                self.inq,
+                self._servers_running,
+                self._disconnected,
+                browser=browser,
+                evq=self.evq,
+                replies=self._replies,
+                mounts=self._mounts,
+                compression_threshold=(
+                    self._compression_threshold if self._compression else None
+                ),
+            )
+
+            # The realtime, render and pause buttons -- added after the
+            # browser has connected, since sending them any earlier would
+            # block waiting for a reply from a client that isn't there yet.
+            self._add_controls()
+            self._send_scene_settings()
+            self._start_render_thread()
+
+    def _configure(
+        self,
+        realtime: bool | float = False,
+        headless: bool | None = None,
+        rate: int = 60,
+        browser: str | None = None,
+        axes: bool = True,
+        ground_opacity: float = 1.0,
+        ground_pattern: bool | str = False,
+        ground_pattern_width: float = 1.0,
+        lights: list[Light] | None = None,
+        timeout: float | None = 1,
+        browser_timeout: float | None = 5,
+        binary_poses: bool = False,
+        pose_tolerance: float | None = 0.0,
+        max_inflight: int | None = None,
+        compression: bool = True,
+        compression_threshold: int = _COMPRESSION_THRESHOLD,
+        render_thread: bool = False,
+        **kwargs: Any,
+    ) -> None:
+        """
+        Validate and apply :meth:`launch`'s arguments -- everything it does
+        short of actually connecting, shared with AsyncSwift.launch().
         """
+        if max_inflight is not None and max_inflight < 1:
+            raise ValueError(
+                f"max_inflight must be at least 1 (or None), got {max_inflight!r}"
+            )
+        if render_thread and max_inflight is not None:
+            raise ValueError("render_thread and max_inflight can't be combined")
+        if compression_threshold < 0:
+            raise ValueError(
+                "compression_threshold must be at least 0, "
+                f"got {compression_threshold!r}"
+            )
 
         self.browser = browser
+        self._binary_poses = binary_poses
+        self._pose_tolerance = pose_tolerance
+        self._max_inflight = max_inflight
+        self._render_threaded = render_thread
+        self._compression = compression
+        self._compression_threshold = compression_threshold
+        self._frame_seq = 0
+        self._frame_acked = 0
         self.rate = rate
         self._hold_timeout = timeout
         self._browser_timeout = browser_timeout
@@ -459,45 +1037,48 @@ class Swift:
         # headless mode too, not just for rendering.
         self.last_time = time.time()
 
-        if not self.headless:
-            # A flag for our threads to monitor for when to quit
-            self._run_thread = True
-            self._disconnected.clear()
-            self.socket_thread, self.socket, self.server_thread, self.server, self._notebook_display_handle = start_servers(
-                self.outq,
-                self.inq,
-                self._servers_running,
-                self._disconnected,
-                browser=browser,
-            )
-
-            # The realtime, render and pause buttons -- added after the
-            # browser has connected, since sending them any earlier would
-            # block waiting for a reply from a client that isn't there yet.
-            self._add_controls()
-
-            if not self.axes:
-                self._send_socket("axes", False, expected=False)
+    def _begin_session(self) -> None:
+        """
+        Re-arm per-connection state before (re)connecting to a browser.
+        """
+        # A flag for our threads to monitor for when to quit
+        self._run_thread = True
+        self._disconnected.clear()
+        # Any acknowledgement still queued belongs to a previous
+        # session's frame numbering.
+        while not self.evq.empty():
+            self.evq.get_nowait()
+        # Likewise any mount state -- ids restart from 0.
+        self._mounts.clear()
+
+    def _send_scene_settings(self) -> None:
+        """
+        Send every launch() scene setting that differs from the browser's
+        own defaults -- none of these expect a reply.
+        """
+        if not self.axes:
+            self._send_socket("axes", False, expected=False)
 
-            if self.ground_opacity != 1.0:
-                self._send_socket("ground_opacity", self.ground_opacity, expected=False)
+        if self.ground_opacity != 1.0:
+            self._send_socket("ground_opacity", self.ground_opacity, expected=False)
 
-            if self.ground_pattern:
-                self._send_socket(
-                    "ground_pattern",
-                    {"pattern": self.ground_pattern, "width": self.ground_pattern_width},
-                    expected=False,
-                )
+        if self.ground_pattern:
+            self._send_socket(
+                "ground_pattern",
+                {"pattern": self.ground_pattern, "width": self.ground_pattern_width},
+                expected=False,
+            )
 
-            if self.lights is not None:
-                self.set_lights(self.lights)
+        if self.lights is not None:
+            self.set_lights(self.lights)
 
-            self._send_socket("browser_timeout", self._browser_timeout, expected=False)
+        self._send_socket("browser_timeout", self._browser_timeout, expected=False)
 
     def _servers_running(self) -> bool:
         return self._run_thread
 
     def _stop_threads(self) -> None:
+        self._stop_render_thread()
         self._run_thread = False
         if not self.headless:
             # Setting _run_thread above only ends serve()'s per-connection
@@ -519,13 +1100,17 @@ class Swift:
             self.server.stop()
             self.server_thread.join(1)
 
-    def step(self, dt: float = 0.05, render: bool = True) -> None:
+    def step(self, dt: float = 0.05, render: bool = True, substeps: int = 1) -> None:
         """
         Update the graphical scene
 
         :param dt: time step in seconds, defaults to 0.05
         :param render: render the change in Swift. If True, this updates the
             pose of the simulated robots and objects in Swift.
+        :param substeps: integrate shape twists and joint velocities/
+            accelerations this many times, ``dt / substeps`` each, inside
+            the ``phys`` kernels -- callbacks, pacing and the render still
+            happen once, for the whole ``dt``. Defaults to 1
 
         ``env.step(args)`` triggers an update of the 3D scene in the Swift
         window referenced by ``env``.
@@ -547,92 +1132,37 @@ class Swift:
         """
 
         try:
-            # Sim time is incremented first -- callbacks registered via
-            # add_shape()/add_assembly()/add_robot()'s callback= see the
-            # *new* t for this step, not the one before it.
-            self.sim_time += dt
-            t = self.sim_time
-            values = self.values
-
-            # Update local pose of objects. A registered callback(t, values)
-            # -- returning an SE3 for a shape, or a q vector for an
-            # assembly/robot -- takes over entirely for that object;
-            # otherwise fall back to the existing velocity-integration/
-            # shape.v path.
-            for i, obj in enumerate(self.swift_objects):
-                if isinstance(obj, Shape):
-                    cb = self.shape_callbacks.get(i)
-                    if cb is not None:
-                        obj.T = cb(t, values)
-                        self._send_shape_update_if_changed(obj)
-                    else:
-                        self._step_shape(obj, dt)
-                elif isinstance(obj, AssemblyHandle):
-                    if obj.callback is not None:
-                        obj.q = np.asarray(obj.callback(t, values), dtype=float)
-                    else:
-                        self._step_assembly(obj, dt)
-
-            # Update world transform of shapes (assemblies/robots render via
-            # AssemblyHandle.part_poses(), a pure function of handle.q --
-            # no scene-graph propagation needed, see jhavl/swift#85)
-            for obj in self.swift_objects:
-                if isinstance(obj, Shape):
-                    obj.update()
+            pending = self._advance(dt, substeps)
+            if self._render_thread is not None:
+                # Collected by the render thread's next tick instead
+                for item in pending:
+                    self._render_replies.put(item)
+            else:
+                for code, reply in pending:
+                    self._await_reply(code, reply)
 
             if self.realtime_speed:
                 # Delay progress if we're running too quickly for the
-                # target speed -- 0.5x should take twice as long (wall
-                # clock) per dt of simulated time as 1x, 0.25x four times
-                # as long, etc. Applies in headless mode too -- realtime
-                # pacing and rendering are independent concerns; only the
-                # rendering itself needs a live browser tab to skip. This
-                # sleep is also where most of a realtime-paced script's
-                # wall-clock time between step() calls actually goes --
-                # which is why ^C is caught around this whole method, not
-                # just here: it's overwhelmingly likely to land inside
-                # this call, not a caller's own sleep (if it even has one).
-                time_taken = time.time() - self.last_time
-                diff = (dt * self._skipped) / self.realtime_speed - time_taken
-                self._skipped = 1
-
-                if diff > 0:
-                    time.sleep(diff)
-
+                # target speed -- see _pace(). This sleep is also where
+                # most of a realtime-paced script's wall-clock time
+                # between step() calls actually goes -- which is why ^C
+                # is caught around this whole method, not just here: it's
+                # overwhelmingly likely to land inside this call, not a
+                # caller's own sleep (if it even has one).
+                delay = self._pace(dt)
+                if delay > 0:
+                    time.sleep(delay)
                 self.last_time = time.time()
 
-            if not self.headless:
-
-                if render and self.rendering:
-
-                    if not self.realtime_speed and (time.time() - self._laststep) < self._period:
-                        # Only render at 60 FPS
-                        self._skipped += 1
-                        return
-
-                    self._laststep = time.time()
-
-                    self._step_elements()
-
-                    events = self._draw_all()
-                    # print(events)
-
+            if self._render_thread is not None:
+                # Drawing is the render thread's -- just hand it this
+                # step's poses.
+                self._publish(render)
+            else:
+                reply = self._render(render)
+                if reply is not None:
                     # Process GUI events
-                    self.process_events(events)
-
-                elif not self.rendering:
-                    if (time.time() - self._laststep) < self._notrenderperiod:
-                        return
-                    self._laststep = time.time()
-                    events = json.loads(self._send_socket("shape_poses", [], True))
-                    self.process_events(events)
-
-                # print(events)
-                # else:
-                #     for i in range(len(self.robots)):
-                #         self.robots[i]['ob'].fkine_all(self.robots[i]['ob'].q)
-
-                self._send_socket("sim_time", self.sim_time, expected=False)
+                    self.process_events(self._await_reply("shape_poses", reply))
         except KeyboardInterrupt:
             # ^C is the normal, expected way to end an interactive session
             # here, not an error -- exit quietly rather than a traceback,
@@ -644,6 +1174,319 @@ class Swift:
             self.close()
             raise SystemExit
 
+    def _advance(self, dt: float, substeps: int = 1) -> list[tuple[str, "Future[Any]"]]:
+        """
+        The simulation half of :meth:`step`: advance sim time by ``dt`` and
+        every object's pose with it, integrating in ``substeps`` steps of
+        ``dt / substeps``. Never waits on the browser.
+
+        :return: ``(code, reply)`` for every message this queued that
+            expects a reply (changed shapes' "shape_update") -- the caller
+            waits on them, blocking or awaiting as suits it
+        """
+        # Sim time is incremented first -- callbacks registered via
+        # add_shape()/add_assembly()/add_robot()'s callback= see the
+        # *new* t for this step, not the one before it.
+        _check_substeps(substeps)
+        self.sim_time += dt
+        t = self.sim_time
+        values = self.values
+        pending = []
+
+        if self._max_inflight is not None and not self.headless:
+            # UI events from frames streamed by earlier steps -- applied
+            # before this step's callbacks, so they see the new values.
+            self._process_frame_acks()
+        elif self._render_thread is not None:
+            # Likewise for the render thread's frames
+            self._process_render_events()
+
+        # Stored shapes first: one batched integration of just the ones
+        # with a non-zero twist, which also writes their world transforms
+        # -- everything update() would do for a scene-graph root. A static
+        # shape's pose only changes when its T is assigned, and that
+        # setter writes the world transform itself. _changed flags still
+        # become "shape_update" messages here, as _step_shape() does for
+        # the rest.
+        store = self._shape_store
+        with self._lock:
+            self._evict_linked()
+            for i in self.shape_callbacks.keys() - self._loose.keys():
+                self._unstore(i)
+            for i, shape in store.changed():
+                pending.append(("shape_update", self._send_shape_update(i, shape)))
+            store.sync_v()
+            moving = store.moving()
+            if len(moving):
+                step_shapes(dt, *store.buffers(), moving, substeps)
+                for shape in store.with_coal(moving):
+                    shape._update_coal()
+
+            # Then every velocity-controlled robot, in one batched
+            # integration of the joints of those with a non-zero qd, and
+            # every acceleration-controlled one in another -- sync() first
+            # brings in anything written to robot.q/qd or reassigned to
+            # handle.q/qd/qdd since the last step.
+            joints = self._joint_store
+            joints.sync()
+            active = joints.active("v")
+            if len(active):
+                step_joints(dt, *joints.buffers(), joints.joints(active), substeps)
+            accelerating = joints.active("a")
+            if len(accelerating):
+                step_joints_a(
+                    dt, *joints.accel_buffers(), joints.joints(accelerating), substeps
+                )
+            for handle in joints.legacy(np.concatenate((active, accelerating))):
+                handle._push_legacy()
+            loose = list(self._loose.items())
+
+        # Update local pose of the other objects. A registered
+        # callback(t, values) -- returning an SE3 for a shape, or a q
+        # vector for an assembly/robot -- takes over entirely for that
+        # object; otherwise fall back to the existing velocity-
+        # integration/shape.v path.
+        for i, obj in loose:
+            if isinstance(obj, Shape):
+                cb = self.shape_callbacks.get(i)
+                if cb is not None:
+                    obj.T = cb(t, values)
+                    reply = self._send_shape_update_if_changed(obj)
+                else:
+                    reply = self._step_shape(obj, dt, substeps)
+                if reply is not None:
+                    pending.append(("shape_update", reply))
+            elif isinstance(obj, AssemblyHandle):
+                if obj.callback is not None:
+                    obj.q = np.asarray(obj.callback(t, values), dtype=float)
+                elif obj not in joints:
+                    self._step_assembly(obj, dt, substeps)
+            elif isinstance(obj, InstanceHandle) and obj.callback is not None:
+                obj.poses = _group_poses(obj.callback(t, values), obj.count)[0]
+
+        # Group callbacks last, so their poses win over any twist --
+        # written straight into the stored shapes' arrays, no SE3 built.
+        for callback, ids in list(self.group_callbacks):
+            self._pose_group(ids, callback(t, values))
+
+        # Update world transform of shapes in a scene graph. A root has
+        # already had its own written -- by step_shape(), or by the
+        # shape.T setter for a callback -- and assemblies/robots render
+        # via AssemblyHandle.part_poses(), a pure function of handle.q --
+        # no scene-graph propagation needed, see jhavl/swift#85
+        for _, obj in loose:
+            if isinstance(obj, Shape) and (
+                obj.scene_parent is not None or obj.scene_children
+            ):
+                obj.update()
+                if obj.collision:
+                    obj._update_coal()
+
+        return pending
+
+    def _pose_group(self, ids: NDArray, poses: ArrayLike) -> None:
+        """
+        Apply one group callback's return value: every stored shape's rows
+        at once, through ShapeStore.set_poses(), any other one (a linked
+        shape) through its T setter. Rows of removed shapes are skipped.
+        """
+        T, q = _group_poses(poses, len(ids))
+        live = ids >= 0
+        if not live.all():
+            ids, T, q = ids[live], T[live], q[live]
+
+        with self._lock:
+            store = self._shape_store
+            shapes = [self.swift_objects[i] for i in ids.tolist()]
+            slots = store.slots(shapes)
+            stored = slots >= 0
+            store.set_poses(slots[stored], T[stored], q[stored])
+            for shape in store.with_coal(slots[stored]):
+                shape._update_coal()
+        if not stored.all():
+            for k in np.flatnonzero(~stored).tolist():
+                shapes[k].T = T[k]
+
+    def _pace(self, dt: float) -> float:
+        """
+        realtime_speed's pacing: how long to wait before this step's
+        ``dt`` of sim time may be shown -- 0.5x should take twice as long
+        (wall clock) per dt of simulated time as 1x, 0.25x four times as
+        long, etc. Applies in headless mode too -- realtime pacing and
+        rendering are independent concerns; only the rendering itself
+        needs a live browser tab to skip. The caller resets
+        ``last_time`` once it has waited.
+
+        :return: seconds to wait, <= 0 if already running late
+        """
+        time_taken = time.time() - self.last_time
+        diff = (dt * self._skipped) / self.realtime_speed - time_taken
+        self._skipped = 1
+        return diff
+
+    def _render(self, render: bool) -> "Future[Any] | None":
+        """
+        The drawing half of :meth:`step`: queue this step's frame, UI
+        element updates and sim time for the browser -- skipped when
+        headless or above the frame rate.
+
+        :return: the lockstep frame's reply (its UI events, for
+            :meth:`process_events`) if one is expected, else None
+        """
+        if self.headless:
+            return None
+
+        reply = None
+        if render and self.rendering:
+
+            if (
+                not self.realtime_speed
+                and (time.time() - self._laststep) < self._period
+            ):
+                # Only render at 60 FPS
+                self._skipped += 1
+                return None
+
+            self._laststep = time.time()
+
+            self._step_elements()
+
+            if self._max_inflight is not None:
+                self._stream_frame()
+            else:
+                reply = self._request_frame()
+
+        elif not self.rendering:
+            if (time.time() - self._laststep) < self._notrenderperiod:
+                return None
+            self._laststep = time.time()
+            reply = self._request("shape_poses", [])
+
+        self._send_socket("sim_time", self.sim_time, expected=False)
+        return reply
+
+    def _publish(self, render: bool) -> None:
+        """
+        launch(render_thread=)'s replacement for _render(): snapshot every
+        object's pose for the render thread, replacing any snapshot it
+        hasn't drawn yet. At most once a frame period, like _render() --
+        the thread can't draw them any faster, so a step in between
+        skips the fk and encoding altogether.
+        """
+        if not render or (time.time() - self._laststep) < self._period:
+            return
+        self._laststep = time.time()
+        runs, poses = self._frame_poses(full=True)
+        self._snapshots.publish(self.sim_time, runs, poses)
+
+    def _start_render_thread(self) -> None:
+        if not self._render_threaded or self.headless:
+            return
+        self._drawn = None
+        self._snapshots.clear()
+        self._render_replies = Queue()
+        self._render_events = Queue()
+        self._render_stop.clear()
+        self._render_thread = Thread(
+            target=self._render_loop, name="swift-render", daemon=True
+        )
+        self._render_thread.start()
+
+    def _stop_render_thread(self) -> None:
+        thread = self._render_thread
+        if thread is None:
+            return
+        self._render_thread = None
+        self._render_stop.set()
+        # The thread may be mid-frame, waiting on the browser's reply --
+        # at most _REPLY_TIMEOUT, and less once the socket has gone.
+        thread.join(1)
+        self._snapshots.clear()
+
+    def _render_loop(self) -> None:
+        """
+        The render thread: ``rate`` times a second, draw the latest
+        snapshot step() has published -- if there's a new one -- and
+        apply the UI events its reply carries. A tick that overruns
+        (the browser was slow to answer) isn't made up for: the next one
+        is a full period later, and draws whatever is latest by then.
+        """
+        deadline = time.monotonic()
+        while True:
+            deadline = max(deadline + self._period, time.monotonic())
+            if self._render_stop.wait(deadline - time.monotonic()):
+                return
+            try:
+                self._render_tick()
+            except TimeoutError:
+                # The browser went away mid-frame -- hold()/run() report
+                # it; there's nothing left to draw to.
+                return
+
+    def _render_tick(self) -> None:
+        self._step_elements()
+
+        # Replies to the "shape_update"s step() sent since the last tick
+        while True:
+            try:
+                code, reply = self._render_replies.get_nowait()
+            except Empty:
+                break
+            self._await_reply(code, reply)
+
+        snapshot = self._snapshots.take()
+        if snapshot is None:
+            return
+        if self.rendering:
+            reply = self._request_poses(
+                *self._changed_poses(snapshot.runs, snapshot.poses)
+            )
+        else:
+            reply = self._request("shape_poses", [])
+        self._send_socket("sim_time", snapshot.t, expected=False)
+        self._render_events.put(self._await_reply("shape_poses", reply))
+
+    def _process_render_events(self) -> None:
+        """
+        Applies the UI events of every frame the render thread has drawn
+        since the last call -- on the stepping thread, between steps, so
+        element callbacks never race the caller's own.
+        """
+        while True:
+            try:
+                events = self._render_events.get_nowait()
+            except Empty:
+                return
+            self.process_events(events)
+
+    def _changed_poses(
+        self, runs: list[tuple[int, int, int]], poses: NDArray
+    ) -> tuple[list[tuple[int, int, int]], NDArray]:
+        """
+        The render thread's pose_tolerance: cut a full snapshot down to the
+        parts that moved further than it since they were last sent, as
+        _frame_poses() does for a lockstep frame. Compared as one array
+        against the last drawn snapshot's -- unless an object has been
+        added or removed in between, when everything is sent again.
+        """
+        tolerance = self._pose_tolerance
+        drawn = self._drawn
+        if tolerance is None or drawn is None or drawn[0] != runs:
+            self._drawn = (runs, poses.copy())
+            return runs, poses
+
+        sent = drawn[1]
+        moved = ~(np.abs(poses - sent).max(axis=1) <= tolerance)
+        sent[moved] = poses[moved]
+
+        changed = []
+        start = 0
+        for i, first, count in runs:
+            for at, n in _mask_runs(moved[start : start + count]):
+                changed.append((i, first + at, n))
+            start += count
+        return changed, poses[moved]
+
     def reset(self) -> None:
         """
         Reset the graphical scene
@@ -667,22 +1510,32 @@ class Swift:
         """
 
         prior_speed = self.realtime_speed
-        prior_axes = self.axes
-        prior_timeout = self._hold_timeout
-        prior_browser_timeout = self._browser_timeout
+        settings = self._relaunch_settings()
 
+        self._stop_render_thread()
         self._send_socket("close", "0", False)
         self._stop_threads()
         self._init()
-        self.launch(
+        self.launch(**settings)
+        self.realtime_speed = prior_speed
+
+    def _relaunch_settings(self) -> dict[str, Any]:
+        # The launch() arguments restart() carries over -- realtime_speed
+        # is restored separately, after relaunching.
+        return dict(
             headless=self.headless,
             rate=self.rate,
             browser=self.browser,
-            axes=prior_axes,
-            timeout=prior_timeout,
-            browser_timeout=prior_browser_timeout,
+            axes=self.axes,
+            timeout=self._hold_timeout,
+            browser_timeout=self._browser_timeout,
+            binary_poses=self._binary_poses,
+            pose_tolerance=self._pose_tolerance,
+            max_inflight=self._max_inflight,
+            compression=self._compression,
+            compression_threshold=self._compression_threshold,
+            render_thread=self._render_threaded,
         )
-        self.realtime_speed = prior_speed
 
     def close(self, clear_cell: bool = False) -> None:
         """
@@ -698,9 +1551,12 @@ class Swift:
             cell was never displayed (e.g. still headless).
         """
 
+        self._stop_render_thread()
         self._send_socket("close", "0", False)
         self._stop_threads()
+        self._clear_cell(clear_cell)
 
+    def _clear_cell(self, clear_cell: bool) -> None:
         if clear_cell and self._notebook_display_handle is not None:
             # Lazy import -- IPython is optional, only actually needed if
             # a notebook display handle was ever created in the first
@@ -765,6 +1621,7 @@ class Swift:
         shape: Shape,
         callback: Callable[[float, dict[str, object]], SE3] | None = None,
         name: str | None = None,
+        wait: bool = True,
     ) -> int:
         """
         Add a single shape to the graphical scene
@@ -774,34 +1631,96 @@ class Swift:
             SE3``, called each ``env.step()`` instead of the default
             velocity/``shape.v``-driven update -- see :meth:`step`
         :param name: optional debug/display name, see :meth:`show`
+        :param wait: block until the browser has loaded the shape, defaults
+            to True. If False, return as soon as it exists in the scene --
+            :meth:`mounted` then reports when loading finishes
         :return: the shape's object id within the visualizer
 
         ``id = env.add_shape(shape)`` adds ``shape`` to the graphical
         environment and returns its id.
         """
-        filename = getattr(shape, "filename", None)
-        if isinstance(filename, str) and not os.path.isabs(filename):
+        (id,) = self._add_objects([shape], self._prepare_shapes([shape]), wait)
+        self._register(id, name, callback)
+        return id
+
+    def add_shapes(
+        self,
+        shapes: list[Shape],
+        names: list[str | None] | None = None,
+        wait: bool = True,
+        callback: Callable[[float, dict[str, object]], NDArray] | None = None,
+    ) -> list[int]:
+        """
+        Add many shapes to the graphical scene at once
+
+        :param shapes: the shapes to add
+        :param names: optional debug/display name per shape (``None``
+            entries for unnamed ones), see :meth:`show`
+        :param wait: block until the browser has loaded every shape,
+            defaults to True -- see :meth:`add_shape`
+        :param callback: optional per-step pose callback for the whole
+            group, ``(t, values) -> poses``, called once each
+            ``env.step()`` -- ``poses`` is an ``(N, 4, 4)`` array of
+            transforms or an ``(N, 7)`` array of t + xyzw q rows, one per
+            shape in ``shapes`` order. Its rows are written straight into
+            the shapes' poses, without building an ``SE3`` per shape, and
+            take over from each shape's ``v``
+        :return: each shape's object id, in the same order
+
+        Equivalent to calling :meth:`add_shape` on each shape, but every
+        part list goes to the browser in one message and every mount is
+        waited for together -- one round trip for the lot instead of at
+        least two per shape, which is what makes populating a scene with
+        thousands of markers take seconds rather than minutes.
+
+        ``ids = env.add_shapes(markers)`` adds every shape in ``markers``
+        and returns their ids.
+        """
+        if names is not None and len(names) != len(shapes):
             raise ValueError(
-                f"{type(shape).__name__}(filename={filename!r}) is a "
-                "relative path, but Swift serves mesh files from an "
-                "absolute path on disk -- pass an absolute path, e.g. "
-                f"str(Path(__file__).parent / {filename!r})"
+                f"names has {len(names)} entries but there are {len(shapes)} shapes"
             )
-        shape.update()
-        shape._added_to_swift = True
-        if not self.headless:
-            id = int(self._send_socket("shape", [shape.to_dict()]))
-            self._wait_mounted(id, 1)
+        ids = self._add_objects(list(shapes), self._prepare_shapes(shapes), wait)
 
-        else:
-            id = len(self.swift_objects)
+        for id, name in zip(ids, names or []):
+            self._register(id, name)
+        self._register_group(ids, callback)
+        return ids
 
-        self.swift_objects.append(shape)
+    def _prepare_shapes(self, shapes: list[Shape]) -> list[list[dict[str, Any]]] | None:
+        """
+        Validate and mark ``shapes`` as added, before any id is reserved.
+
+        :return: each shape's one-element part list, or None when headless
+        """
+        for shape in shapes:
+            _check_filename(shape)
+        for shape in shapes:
+            shape.update()
+            shape._added_to_swift = True
+        return None if self.headless else [[shape.to_dict()] for shape in shapes]
+
+    def _register(
+        self,
+        id: int,
+        name: str | None,
+        callback: Callable[[float, dict[str, object]], SE3] | None = None,
+    ) -> None:
+        # An added object's optional name/shape callback, keyed by its id.
         if name is not None:
-            self.swift_names[int(id)] = name
+            self.swift_names[id] = name
+            self._name_ids.setdefault(name, []).append(id)
         if callback is not None:
-            self.shape_callbacks[int(id)] = callback
-        return int(id)
+            self.shape_callbacks[id] = callback
+
+    def _register_group(
+        self,
+        ids: list[int],
+        callback: Callable[[float, dict[str, object]], NDArray] | None,
+    ) -> None:
+        # add_shapes()'s optional group callback, over ids in row order
+        if callback is not None:
+            self.group_callbacks.append((callback, np.array(ids, dtype=np.intp)))
 
     def add_ui(self, element: SwiftElement, name: str | None = None) -> SwiftElement:
         """
@@ -819,6 +1738,19 @@ class Swift:
         if element._added_to_swift:
             raise ValueError("This element has already been added to Swift")
 
+        reply = self._queue_element(element, name)
+        if reply is not None:
+            self._await_reply("element", reply)
+        return element
+
+    def _queue_element(
+        self, element: SwiftElement, name: str | None
+    ) -> "Future[Any] | None":
+        """
+        add_ui()'s first half: give ``element`` its id and queue it.
+
+        :return: the browser's pending reply, or None when headless
+        """
         element._added_to_swift = True
         element.name = name
 
@@ -826,69 +1758,97 @@ class Swift:
             element._on_change = lambda v, name=name: self.values.__setitem__(name, v)
             self.values[name] = element.value
 
-        id = self.elementid
-        self.elementid += 1
-        self.elements[str(id)] = element
-        element._id = id
-
-        if not self.headless:
-            self._send_socket("element", element.to_dict())
-        return element
+        with self._lock:
+            id = self.elementid
+            self.elementid += 1
+            self.elements[str(id)] = element
+            element._id = id
+            if not self.headless:
+                return self._request("element", element.to_dict())
+        return None
 
     def add_assembly(
         self,
-        fk: Callable[[ArrayLike], list[SE3]],
+        fk: Callable[[ArrayLike], list[SE3] | NDArray] | KinematicChain,
         parts: list[Shape],
         q0: ArrayLike | None = None,
         callback: Callable[[float, dict[str, object]], ArrayLike] | None = None,
         readonly: bool = False,
         name: str | None = None,
+        wait: bool = True,
     ) -> AssemblyHandle:
         """
         Add an assembly of parts driven by a pure forward-kinematics function
 
         :param fk: pure function mapping this assembly's current ``q`` to
             one world-frame :class:`~spatialmath.SE3` pose per entry in
-            ``parts``, in the same order
+            ``parts``, in the same order -- or to an ``(N, 4, 4)`` array
+            of them, which each frame converts for the browser as one
+            array operation instead of one spatialmath call per part --
+            or a :class:`~swift.KinematicChain.KinematicChain`, evaluated
+            in the phys extension with no Python fk at all
         :param parts: the shapes making up this assembly, in the order
             ``fk`` returns poses for
-        :param q0: initial configuration, defaults to an empty array (set
-            ``handle.q`` before the first :meth:`step` if ``fk`` needs
-            one)
+        :param q0: initial configuration, defaults to a KinematicChain's
+            zero configuration, or an empty array (set ``handle.q``
+            before the first :meth:`step` if ``fk`` needs one)
         :param callback: optional per-step callback ``(t, values) -> q``,
             called each ``env.step()`` to compute the new ``q`` directly
             -- see :meth:`step`
         :param readonly: if True, swift will not advance this assembly's
             ``q`` itself, defaults to False
         :param name: optional debug/display name, see :meth:`show`
+        :param wait: block until the browser has loaded every part,
+            defaults to True -- see :meth:`add_shape`
         :return: a handle owning this assembly's live joint state
 
         ``handle = env.add_assembly(fk, parts)`` adds ``parts`` to the
         graphical environment as one unit, positioned each step by
         ``fk(handle.q)``.
+
+        Every handle of the same KinematicChain whose ``q`` has changed
+        is posed by one batched ``phys.chain_fk()`` call per frame, so a
+        fleet of identical robots costs one C call rather than one
+        Python fk per robot.
+
+        :raises ValueError: ``fk`` is a KinematicChain with a different
+            number of parts than ``parts``
         """
+        handle, part_dicts = self._assembly_handle(
+            fk, parts, q0, callback, readonly, name
+        )
+        (handle.id,) = self._add_objects([handle], part_dicts, wait)
+        self._register(handle.id, name)
+
+        return handle
+
+    def _assembly_handle(
+        self,
+        fk: Callable[[ArrayLike], list[SE3] | NDArray] | KinematicChain,
+        parts: list[Shape],
+        q0: ArrayLike | None,
+        callback: Callable[[float, dict[str, object]], ArrayLike] | None,
+        readonly: bool,
+        name: str | None,
+    ) -> tuple[AssemblyHandle, list[list[dict[str, Any]]] | None]:
+        # add_assembly()'s handle, plus its part list (None when headless)
+        if isinstance(fk, KinematicChain):
+            if fk.nparts != len(parts):
+                raise ValueError(
+                    f"the KinematicChain poses {fk.nparts} parts, "
+                    f"but {len(parts)} were given"
+                )
+            if q0 is None:
+                q0 = np.zeros(fk.n)
         for part in parts:
             part.update()
             part._added_to_swift = True
 
-        if not self.headless:
-            parts_dict = [p.to_dict() for p in parts]
-            id = int(self._send_socket("shape", parts_dict))
-            self._wait_mounted(id, len(parts_dict))
-
-        else:
-            id = len(self.swift_objects)
-
         handle = AssemblyHandle(
             fk, np.zeros(0) if q0 is None else q0, readonly=readonly,
             name=name, callback=callback,
         )
-        handle.id = int(id)
-        self.swift_objects.append(handle)
-        if name is not None:
-            self.swift_names[int(id)] = name
-
-        return handle
+        return handle, None if self.headless else [[p.to_dict() for p in parts]]
 
     def add_robot(
         self,
@@ -898,6 +1858,9 @@ class Swift:
         readonly: bool = False,
         callback: Callable[[float, dict[str, object]], ArrayLike] | None = None,
         name: str | None = None,
+        wait: bool = True,
+        native_fk: bool = False,
+        legacy: bool = False,
     ) -> AssemblyHandle:
         """
         Add an ``rtb.Robot`` to the graphical scene
@@ -913,6 +1876,19 @@ class Swift:
         :param callback: optional per-step callback ``(t, values) -> q``,
             see :meth:`add_assembly`
         :param name: optional debug/display name, see :meth:`show`
+        :param wait: block until the browser has loaded every link's
+            meshes, defaults to True -- see :meth:`add_shape`
+        :param native_fk: pose the robot's parts from a
+            :meth:`KinematicChain.from_robot
+            <swift.KinematicChain.KinematicChain.from_robot>` chain in the
+            phys extension, rather than ``robot.fkine_geometry()`` --
+            ``handle.part_poses()`` is then an ``(N, 4, 4)`` array,
+            defaults to False
+        :param legacy: check the robot's own ``q``/``qd`` for the
+            deprecated direct-mutation style by value every step, so
+            in-place writes (``robot.q[0] = ...``) are picked up too --
+            otherwise only reassigning them is, at the cost of three
+            identity checks, defaults to False
         :return: a handle owning this robot instance's live joint state
 
         ``handle = env.add_robot(robot)`` adds ``robot`` to the graphical
@@ -921,32 +1897,187 @@ class Swift:
         (mutating ``robot.q``/``robot.qd`` directly still works, but is
         deprecated, see :class:`~swift.Handle.AssemblyHandle`).
         """
+        handle, robob = self._robot_handle(
+            robot,
+            robot_alpha,
+            collision_alpha,
+            readonly,
+            callback,
+            name,
+            native_fk,
+            legacy,
+        )
+        (handle.id,) = self._add_objects([handle], robob, wait)
+        self._register(handle.id, name)
+
+        return handle
+
+    def _robot_handle(
+        self,
+        robot: "_rtb_types.Robot",
+        robot_alpha: float,
+        collision_alpha: float,
+        readonly: bool,
+        callback: Callable[[float, dict[str, object]], ArrayLike] | None,
+        name: str | None,
+        native_fk: bool = False,
+        legacy: bool = False,
+    ) -> tuple[AssemblyHandle, list[list[dict[str, Any]]] | None]:
+        # add_robot()'s handle, plus its part list (None when headless)
         robot._update_link_tf()
         robot.update()
         robot._qlim = robot.qlim
 
-        if not self.headless:
-            robob = robot._to_dict(
-                robot_alpha=robot_alpha, collision_alpha=collision_alpha
-            )
-            id = int(self._send_socket("shape", robob))
-            self._wait_mounted(id, len(robob))
-
+        if native_fk:
+            # Posed from the robot's own base and grippers by the handle,
+            # see AssemblyHandle._chain_input()
+            fk = KinematicChain.from_robot(robot, robot_alpha, collision_alpha)
         else:
-            id = len(self.swift_objects)
+
+            def fk(q):
+                return robot.fkine_geometry(q, robot_alpha, collision_alpha)
 
         handle = AssemblyHandle(
-            lambda q: robot.fkine_geometry(q, robot_alpha, collision_alpha),
-            robot.q, robot=robot, readonly=readonly, name=name, callback=callback,
+            fk,
+            robot.q,
+            robot=robot,
+            readonly=readonly,
+            name=name,
+            callback=callback,
+            legacy=legacy,
         )
-        handle.id = int(id)
-        self.swift_objects.append(handle)
-        if name is not None:
-            self.swift_names[int(id)] = name
+        robob = None
+        if not self.headless:
+            robob = [
+                robot._to_dict(robot_alpha=robot_alpha, collision_alpha=collision_alpha)
+            ]
+        return handle, robob
+
+    def add_instances(
+        self,
+        shape: "Shape | list[Shape] | _rtb_types.Robot",
+        poses: ArrayLike,
+        q: ArrayLike | None = None,
+        chain: KinematicChain | None = None,
+        callback: Callable[[float, dict[str, object]], NDArray] | None = None,
+        robot_alpha: float = 1.0,
+        collision_alpha: float = 0.0,
+        name: str | None = None,
+        wait: bool = True,
+    ) -> InstanceHandle:
+        """
+        Add many copies of the same shape or robot model to the graphical scene
+
+        :param shape: the model to copy -- a shape, a list of shapes kept
+            rigidly together (each at its current pose, taken as relative
+            to its copy's frame), or an ``rtb.Robot``
+        :param poses: world pose of each copy, an ``(N, 4, 4)`` array of
+            transforms or an ``(N, 7)`` array of t + xyzw q rows
+        :param q: ``(N, n)`` configuration of each copy of a robot or
+            ``chain``, defaults to the robot's current ``q`` (followed by
+            its grippers') or zeros
+        :param chain: a :class:`~swift.KinematicChain.KinematicChain`
+            posing a list of shapes from each copy's ``q`` instead, its
+            base replaced by the copy's pose
+        :param callback: optional per-step callback ``(t, values) ->
+            poses``, called each ``env.step()`` to set every copy's pose
+            at once, in either form ``poses`` accepts
+        :param robot_alpha: for a robot, its visual opacity, defaults to 1.0
+        :param collision_alpha: for a robot, its collision geometry's
+            opacity, defaults to 0.0
+        :param name: optional debug/display name, see :meth:`show`
+        :param wait: block until the browser has loaded every part,
+            defaults to True -- see :meth:`add_shape`
+        :return: a handle holding every copy's pose (and configuration)
+
+        ``handle = env.add_instances(shape, poses)`` adds ``len(poses)``
+        copies of ``shape`` as one object. The browser loads each part's
+        geometry once and draws every copy of it with a single
+        ``THREE.InstancedMesh``, and a frame carries all the copies' poses
+        as one run of rows -- so a thousand identical markers or a
+        fleet of identical robots costs one draw call per part rather
+        than per copy. Move them through ``handle.poses`` (and
+        ``handle.q``); the copies can't be removed one at a time, only
+        all together with :meth:`remove`.
+
+        Parts rendered as lines or points (``Axes``, an ``Arrow`` or
+        ``Polyline`` of radius 0, a point cloud) can't be instanced -- the
+        browser fails to mount them, see :meth:`mounted`.
+
+        :raises ValueError: ``poses`` isn't ``(N, 4, 4)`` or ``(N, 7)``,
+            ``chain`` doesn't pose as many parts as there are shapes, or
+            ``q`` isn't ``(N, n)``
+        """
+        handle, payload = self._instance_handle(
+            shape, poses, q, chain, callback, robot_alpha, collision_alpha, name
+        )
+        (handle.id,) = self._add_objects([handle], payload, wait, code="instances")
+        self._register(handle.id, name)
 
         return handle
 
-    def remove(self, id: "int | AssemblyHandle | Shape | _rtb_types.ERobot") -> None:
+    def _instance_handle(
+        self,
+        shape: "Shape | list[Shape] | _rtb_types.Robot",
+        poses: ArrayLike,
+        q: ArrayLike | None,
+        chain: KinematicChain | None,
+        callback: Callable[[float, dict[str, object]], NDArray] | None,
+        robot_alpha: float,
+        collision_alpha: float,
+        name: str | None,
+    ) -> tuple[InstanceHandle, list[dict[str, Any]] | None]:
+        # add_instances()'s handle, plus its "instances" message (None
+        # when headless)
+        poses = np.asarray(poses, dtype=float)
+        T, _ = _group_poses(poses, len(poses), "add_instances()'s poses must be")
+        robot = None
+        if isinstance(shape, rtb.Robot):
+            robot = shape
+            robot._update_link_tf()
+            robot.update()
+            chain = KinematicChain.from_robot(robot, robot_alpha, collision_alpha)
+            if q is None:
+                q = np.tile(
+                    np.concatenate([robot.q, *(g.q for g in robot.grippers)]),
+                    (len(T), 1),
+                )
+            parts = None
+        else:
+            parts = [shape] if isinstance(shape, Shape) else list(shape)
+            for part in parts:
+                _check_filename(part)
+                part.update()
+                part._added_to_swift = True
+            if chain is not None and chain.nparts != len(parts):
+                raise ValueError(
+                    f"the KinematicChain poses {chain.nparts} parts, "
+                    f"but {len(parts)} were given"
+                )
+            if chain is None and q is not None:
+                raise ValueError("q= needs a robot or a chain= to pose")
+
+        model = chain if chain is not None else np.array([part._wT for part in parts])
+        handle = InstanceHandle(
+            model, T, q=q, robot=robot, name=name, callback=callback
+        )
+        if self.headless:
+            return handle, None
+
+        if robot is not None:
+            part_dicts = robot._to_dict(
+                robot_alpha=robot_alpha, collision_alpha=collision_alpha
+            )
+        else:
+            part_dicts = [part.to_dict() for part in parts]
+        rows = handle.part_rows(_poses_to_rows)
+        return handle, [
+            {"parts": part_dicts, "count": handle.count, "poses": rows.tolist()}
+        ]
+
+    def remove(
+        self, id: "int | AssemblyHandle | InstanceHandle | Shape | _rtb_types.ERobot"
+    ) -> None:
         """
         Remove a robot/shape from the graphical scene
 
@@ -957,38 +2088,62 @@ class Swift:
             or the instance of the object
         """
 
-        # ob to remove
-        idd = None
-        code = None
+        idd = self._forget(id)
 
-        if isinstance(id, AssemblyHandle):
-            idd = id.id
-            code = "remove"
-            self.swift_objects[idd] = None
-        elif isinstance(id, rtb.ERobot) or isinstance(id, Shape):
+        if not self.headless:
+            self._send_socket("remove", idd)
 
-            for i in range(len(self.swift_objects)):
-                obj = self.swift_objects[i]
-                if obj is None:
-                    continue
-                if obj is id or (isinstance(obj, AssemblyHandle) and obj.robot is id):
-                    idd = i
-                    code = "remove"
-                    self.swift_objects[idd] = None
-                    break
-        else:
+    def _forget(
+        self, id: "int | AssemblyHandle | InstanceHandle | Shape | _rtb_types.ERobot"
+    ) -> int:
+        """
+        remove()'s bookkeeping: free the object's slot and cached state.
+
+        :return: the object's id
+        """
+
+        if isinstance(id, (AssemblyHandle, InstanceHandle)):
+            idd = id.id
+        elif isinstance(id, (int, np.integer)):
             # Number corresponding to swift_objects index
-            idd = id
-            code = "remove"
-            self.swift_objects[idd] = None
+            idd = int(id)
+        else:
+            ids = self._object_ids.get(builtins.id(id))
+            idd = ids[0] if ids else None
 
         if idd is None:
             raise ValueError(
                 "the id argument does not correspond with a robot or shape in Swift"
             )
 
-        if not self.headless:
-            self._send_socket(code, idd)
+        with self._lock:
+            removed = self.swift_objects[idd]
+            self.swift_objects[idd] = None
+            if removed is not None:
+                for key in self._object_keys(removed):
+                    self._unindex(self._object_ids, key, idd)
+            if idd in self.swift_names:
+                self._unindex(self._name_ids, self.swift_names[idd], idd)
+            # A stored shape is given its own arrays back -- unless it has
+            # been linked since the last step, in which case it already
+            # has them to itself once evicted.
+            if self._loose.pop(idd, None) is None and removed is not None:
+                self._evict_linked()
+                if self._loose.pop(idd, None) is None:
+                    self._shape_store.remove(removed)
+            # ...and a robot's handle its own q/qd
+            if isinstance(removed, AssemblyHandle):
+                self._joint_store.remove(removed)
+            groups = []
+            for callback, ids in self.group_callbacks:
+                ids[ids == idd] = -1
+                if (ids >= 0).any():
+                    groups.append((callback, ids))
+            self.group_callbacks = groups
+
+        self._sent_poses.pop(idd, None)
+        self._mounts.forget(idd)
+        return idd
 
     def hold(self, duration: float | None = None, timeout: float | None = None) -> None:
         """
@@ -1068,7 +2223,13 @@ class Swift:
         expired = timeout is not None and time.time() - disconnected_since > timeout
         return disconnected_since, expired
 
-    def run(self, duration: float | None = None, dt: float = 0.05, timeout: float | None = None) -> None:
+    def run(
+        self,
+        duration: float | None = None,
+        dt: float = 0.05,
+        timeout: float | None = None,
+        substeps: int = 1,
+    ) -> None:
         """
         Repeatedly call :meth:`step` until ``duration`` (sim-time seconds)
         has elapsed, stopping early if the browser disconnects for longer
@@ -1092,6 +2253,9 @@ class Swift:
             ``None`` never gives up on a disconnect (still stops at
             ``duration``, if given).
         :type timeout: float | None
+        :param substeps: integration substeps per :meth:`step`, see its
+            ``substeps=``, defaults to 1
+        :type substeps: int
 
         :seealso: :meth:`step` for a single manual update, if you need
             finer control than a bounded/unbounded loop gives you.
@@ -1105,7 +2269,7 @@ class Swift:
 
         try:
             while duration is None or (self.sim_time - start_time) < duration:
-                self.step(dt)
+                self.step(dt, substeps=substeps)
                 time.sleep(dt)
                 disconnected_since, expired = self._check_disconnected(disconnected_since, timeout)
                 if expired:
@@ -1263,29 +2427,51 @@ class Swift:
         if not self.headless:
             self._send_socket("lights", [light.to_dict() for light in lights], expected=False)
 
-    def _step_assembly(self, handle: AssemblyHandle, dt: float) -> None:
+    def _step_assembly(
+        self, handle: AssemblyHandle, dt: float, substeps: int = 1
+    ) -> None:
 
         handle._sync_legacy()
 
         if handle.readonly or handle.control_mode == "p":
             pass  # pragma: no cover
 
-        elif handle.control_mode == "v":
+        elif handle.robot is None and handle.control_mode in ("v", "a"):
+            raise ValueError(
+                f"control_mode={handle.control_mode!r} needs a robot's "
+                "qlim/joint count to integrate against -- only available on "
+                "a handle from add_robot(), not a bare add_assembly() handle. "
+                "Drive handle.q directly, or use a callback, instead."
+            )
 
-            if handle.robot is None:
-                raise ValueError(
-                    "control_mode='v' needs a robot's qlim/joint count to "
-                    "integrate against -- only available on a handle from "
-                    "add_robot(), not a bare add_assembly() handle. Drive "
-                    "handle.q directly, or use a callback, instead."
-                )
+        elif handle.control_mode == "v":
 
-            robot = handle.robot
-            step_v(robot._n, robot._valid_qlim, dt, handle.q, handle.qd, robot._qlim)
-            handle._push_legacy()
+            if handle.qd.any():
+                robot = handle.robot
+                for _ in range(substeps):
+                    step_v(
+                        robot._n,
+                        robot._valid_qlim,
+                        dt / substeps,
+                        handle.q,
+                        handle.qd,
+                        robot._qlim,
+                    )
+                handle._push_legacy()
 
         elif handle.control_mode == "a":
-            pass
+
+            if handle.qd.any() or handle.qdd.any():
+                step_joints_a(
+                    dt,
+                    handle.q,
+                    handle.qd,
+                    np.ascontiguousarray(handle.qdd, dtype=float),
+                    *_joint_limits(handle.robot),
+                    None,
+                    substeps,
+                )
+                handle._push_legacy()
 
         else:  # pragma: no cover
             # Should be impossible to reach
@@ -1298,30 +2484,45 @@ class Swift:
         # function of handle.q, rather than reading the scene-graph's
         # mutated/cached world transform. See jhavl/swift#85.
 
-    def _send_shape_update_if_changed(self, shape: Shape) -> None:
+    def _send_shape_update_if_changed(self, shape: Shape) -> "Future[Any] | None":
         # A shape's @update-decorated setters (color, opacity, scale, ...)
         # only flip shape._changed -- this is the one place that turns that
         # flag into an actual "shape_update" message. Must run for every
-        # shape every step, callback-driven or not (see step()'s caller in
+        # shape every step, callback-driven or not (see _advance()'s caller in
         # the cb-is-not-None branch) -- it used to only run from within
         # _step_shape(), which callback-driven shapes never reach, so a
         # callback shape's color/scale/opacity changes were silently
         # dropped forever, even though its pose kept updating fine via the
         # callback's own SE3 return value.
         if shape._changed:
-            shape._changed = False
-            id = self.swift_objects.index(shape)
-            self._send_socket("shape_update", [id, shape.to_dict()])
-
-    def _step_shape(self, shape: Shape, dt: float) -> None:
-
-        self._send_shape_update_if_changed(shape)
+            return self._send_shape_update(self._object_ids[id(shape)][0], shape)
+        return None
 
-        step_shape(
-            dt, shape.v, shape._SceneNode__T, shape._SceneNode__wT, shape._SceneNode__wq
-        )
+    def _send_shape_update(self, id: int, shape: Shape) -> "Future[Any]":
+        shape._changed = False
+        return self._request("shape_update", [id, shape.to_dict()])
+
+    def _step_shape(
+        self, shape: Shape, dt: float, substeps: int = 1
+    ) -> "Future[Any] | None":
+
+        reply = self._send_shape_update_if_changed(shape)
+        if not shape.v.any():
+            return reply
+
+        # Also writes the world transform and quaternion, as for a root --
+        # a shape with a parent has them recomputed by update() after
+        for _ in range(substeps):
+            step_shape(
+                dt / substeps,
+                shape.v,
+                shape._SceneNode__T,
+                shape._SceneNode__wT,
+                shape._SceneNode__wq,
+            )
         if shape.collision:
             shape._update_coal()
+        return reply
 
     def _step_elements(self) -> None:
         """
@@ -1329,95 +2530,383 @@ class Swift:
         are any updates, send them through to Swift.
         """
 
-        for element in self.elements:
-            if self.elements[element]._changed:
-                self.elements[element]._changed = False
-                self._send_socket(
-                    "update_element", self.elements[element].to_dict(), False
-                )
+        # A copy -- with launch(render_thread=True) this runs on the render
+        # thread, while add_ui() may be adding to the dict.
+        for element in list(self.elements.values()):
+            if element._changed:
+                element._changed = False
+                self._send_socket("update_element", element.to_dict(), False)
 
     def _draw_all(self) -> Any:
         """
-        Sends the transform of every simulated object in the scene
+        Sends the transform of every simulated object in the scene that
+        moved since it was last sent (see launch()'s pose_tolerance=).
         Recieves bacl a list of events which has occured
         """
 
-        msg = []
+        return self._await_reply("shape_poses", self._request_frame())
+
+    def _request_frame(self) -> "Future[Any]":
+        """
+        Queue _draw_all()'s "shape_poses" frame without waiting for the
+        reply.
+        """
+        return self._request_poses(*self._frame_poses())
 
-        for i in range(len(self.swift_objects)):
-            if self.swift_objects[i] is not None:
-                if isinstance(self.swift_objects[i], Shape):
-                    msg.append([i, [self.swift_objects[i].fk_dict()]])
-                elif isinstance(self.swift_objects[i], AssemblyHandle):
-                    handle = self.swift_objects[i]
-                    handle._sync_legacy()
-                    poses = handle.part_poses()
-                    msg.append([i, [_se3_to_wire(T) for T in poses]])
+    def _request_poses(
+        self, runs: list[tuple[int, int, int]], poses: NDArray
+    ) -> "Future[Any]":
+        """
+        Queue a "shape_poses" frame of these runs, in whichever encoding
+        launch(binary_poses=) chose.
+        """
+        if self._binary_poses:
+            # A binary frame carries its request id in its own header.
+            rid, reply = self._replies.reserve()
+            msg: Any = _pack_pose_frame(_FRAME_SHAPE_POSES, runs, poses, rid)
+            self.outq.put([rid, ["shape_poses", msg]])
+            return reply
+        return self._request("shape_poses", _pack_pose_json(runs, poses))
+
+    def _stream_frame(self) -> None:
+        """
+        launch(max_inflight=)'s replacement for _draw_all(): sends this
+        frame's poses as a fire-and-forget "shape_frame" tagged with the
+        next sequence number, unless max_inflight frames are already
+        awaiting acknowledgement -- then the frame is dropped outright.
+        Nothing is queued up behind a slow browser; _frame_poses() isn't
+        even called for a dropped frame, so its parts' last-sent poses
+        stay as they were and the next frame that does go out resends
+        whatever moved in the meantime.
+        """
+        if self._frame_seq - self._frame_acked >= self._max_inflight:
+            return
+
+        runs, poses = self._frame_poses()
+        self._frame_seq += 1
+        if self._binary_poses:
+            msg: Any = _pack_pose_frame(
+                _FRAME_SHAPE_FRAME, runs, poses, self._frame_seq
+            )
+        else:
+            msg = {"seq": self._frame_seq, "poses": _pack_pose_json(runs, poses)}
+        self._send_socket("shape_frame", msg, expected=False)
 
-        events = self._send_socket("shape_poses", msg, True)
-        return json.loads(events)
+    def _process_frame_acks(self) -> None:
+        """
+        Applies every streamed frame acknowledgement received since the
+        last call -- each ``{"event": "frame", "seq", "changes"}``, where
+        ``changes`` is the same UI change set a lockstep frame's reply
+        carries (see main.js's "shape_frame" handler).
+        """
+        while True:
+            try:
+                event = json.loads(self.evq.get_nowait())
+            except Empty:
+                return
+            if event.get("event") == "frame":
+                self._frame_acked = max(self._frame_acked, event["seq"])
+                self.process_events(event["changes"])
+
+    def _frame_poses(
+        self, full: bool = False
+    ) -> tuple[list[tuple[int, int, int]], NDArray]:
+        """
+        Gathers this frame's poses as ``(id, first part, part count)`` runs
+        plus their stacked ``(n, 7)`` t + xyzw q rows -- the common input to
+        both _pack_pose_json() and _pack_pose_frame(). With a
+        pose_tolerance set, parts within tolerance of what was last sent
+        for them are left out, and an object with only some parts moved
+        contributes one run per consecutive stretch of moved parts.
+
+        :param full: every part of every object, one run each, leaving
+            what was last sent untouched -- a render thread snapshot,
+            filtered later by _changed_poses()
+        """
+        tolerance = None if full else self._pose_tolerance
+        # Stored shapes diff their poses against what was last sent all
+        # at once -- a static one costs a row of one array comparison.
+        # Only loose objects are looked at one by one -- and stored robot
+        # handles have the deprecated robot.q style checked for all at
+        # once, by JointStore.sync().
+        with self._lock:
+            ids, rows = self._shape_store.frame_poses(tolerance)
+            joints = self._joint_store
+            joints.sync()
+            loose = list(self._loose.items())
+
+        handles = [obj for _, obj in loose if isinstance(obj, AssemblyHandle)]
+        for obj in handles:
+            if obj.callback is not None or obj not in joints:
+                obj._sync_legacy()
+        # Handles sharing a KinematicChain are posed in one batch
+        _prime_chains(handles, _poses_to_rows)
+
+        # (id, first part, part count, rows) per run
+        pieces = []
+        for i, obj in loose:
+            if isinstance(obj, Shape):
+                block = np.empty((1, 7))
+                block[0, :3] = obj._wT[:3, 3]
+                block[0, 3:] = obj._wq
+            elif isinstance(obj, AssemblyHandle):
+                # Cached by the handle until its q (or model) changes
+                block = obj.part_rows(_part_rows)
+            elif isinstance(obj, InstanceHandle):
+                # Every copy's parts, one run -- until poses/q change
+                block = obj.part_rows(_poses_to_rows)
+            else:
+                continue
+
+            if tolerance is not None:
+                sent = self._sent_poses.get(i)
+                if sent is not None and sent.shape == block.shape:
+                    moved = np.abs(block - sent).max(axis=1) > tolerance
+                    sent[moved] = block[moved]
+                    for first, count in _mask_runs(moved):
+                        pieces.append((i, first, count, block[first : first + count]))
+                    continue
+                self._sent_poses[i] = block.copy()
+
+            pieces.append((i, 0, len(block), block))
+
+        if not pieces:
+            runs = [(i, 0, 1) for i in ids]
+            return runs, rows
+
+        pieces.extend((i, 0, 1, rows[k : k + 1]) for k, i in enumerate(ids))
+        pieces.sort(key=lambda piece: piece[0])
+        runs = [(i, first, count) for i, first, count, _ in pieces]
+        return runs, np.concatenate([piece[3] for piece in pieces])
 
     def _send_socket(self, code: str, data: Any = None, expected: bool = True) -> Any:
-        msg = [expected, [code, data]]
+        """
+        Send one ``[code, data]`` message to the browser.
 
-        self.outq.put(msg)
+        Safe to call from any thread, concurrently: each message expecting
+        a reply is tagged with its own request id, so callers only ever
+        wait on -- and receive -- the answer to their own request, however
+        the replies interleave (see :class:`~swift.SwiftRoute.ReplyRouter`).
 
-        if expected:
-            # Poll in short slices rather than one blocking
-            # inq.get(timeout=_REPLY_TIMEOUT) -- so a disconnect
-            # SwiftSocket notices mid-wait (see SwiftRoute.py's
-            # expect_message()) ends this well before the full timeout,
-            # instead of _REPLY_TIMEOUT being the only possible bound.
-            start = time.time()
-            while True:
-                try:
-                    return self.inq.get(timeout=_DISCONNECT_POLL_INTERVAL)
-                except Empty:
-                    elapsed = time.time() - start
-                    if self._disconnected.is_set() or elapsed >= _REPLY_TIMEOUT:
-                        raise TimeoutError(
-                            "Swift browser tab stopped responding (no "
-                            f"reply to '{code}' after {elapsed:.1f}s) -- "
-                            "it may have been closed, crashed, or dropped "
-                            "into a different window/profile mid-drag. "
-                            "Call env.close() then env.launch() again to "
-                            "reconnect."
-                        ) from None
-        else:
+        :param expected: wait for and return the browser's (JSON-decoded)
+            reply; if False, return ``"0"`` straight away
+        :raises TimeoutError: no reply within ``_REPLY_TIMEOUT``, or the
+            browser disconnected while waiting
+        """
+        if not expected:
+            self.outq.put([None, [code, data]])
             return "0"
+        return self._await_reply(code, self._request(code, data))
 
-    def _wait_mounted(self, id: int, count: int) -> None:
+    def _request(self, code: str, data: Any = None) -> "Future[Any]":
         """
-        Block until the browser confirms every part of object ``id`` has
-        finished loading (see shapes.js's ``SwiftObject``).
-
-        A "shape_mounted" reply is ``[code, detail]`` (see shapes.js's
-        ``load()``/``SwiftObject``): ``[1, None]`` means loaded, ``[0,
-        None]`` means still loading (poll again), ``[-1, reason]`` means
-        the shape type itself isn't one ``load()`` recognises at all, and
-        ``[-2, reason]`` means a genuine asset load failure (bad path,
-        unsupported/corrupt mesh format). Either failure stops this loop
-        and raises with the browser's own reason instead of polling
-        forever with no way to tell the caller why (bugs.md, Bug 2).
+        Queue ``[code, data]`` under a fresh request id without waiting.
 
-        :param id: the object's id, as returned by the preceding "shape"
-            message
-        :param count: number of parts the object has, for the browser-side
-            log/protocol payload only -- the mounted check itself compares
-            against the part list ``id`` was created with
+        :return: the future the browser's reply will complete -- pass it
+            to :meth:`_await_reply`
         """
+        rid, reply = self._replies.reserve()
+        self.outq.put([rid, [code, data]])
+        return reply
+
+    def _await_reply(self, code: str, reply: "Future[Any]") -> Any:
+        # Poll in short slices rather than one blocking
+        # reply.result(timeout=_REPLY_TIMEOUT) -- so a disconnect
+        # SwiftSocket notices mid-wait (see SwiftRoute.py's consumer())
+        # ends this well before the full timeout, instead of
+        # _REPLY_TIMEOUT being the only possible bound.
+        start = time.time()
         while True:
-            status, detail = json.loads(self._send_socket("shape_mounted", [id, count]))
-            if status == 1:
-                return
-            if status == -1:
-                raise RuntimeError(f"Swift failed to load object {id}: {detail}")
-            if status == -2:
-                raise RuntimeError(
-                    f"Swift failed to load object {id}: {detail} -- check "
-                    "the browser's JavaScript console for the full error"
-                )
-            time.sleep(0.1)
+            try:
+                return reply.result(timeout=_DISCONNECT_POLL_INTERVAL)
+            except _FutureTimeout:
+                elapsed = time.time() - start
+                if self._disconnected.is_set() or elapsed >= _REPLY_TIMEOUT:
+                    reply.cancel()
+                    raise _reply_timeout(code, elapsed) from None
+
+    def _add_objects(
+        self,
+        objs: list[Any],
+        parts: list[Any] | None,
+        wait: bool = True,
+        code: str | None = None,
+    ) -> list[int]:
+        """
+        Give each of ``objs`` the next object id and, unless headless,
+        create them in the browser from ``parts`` -- the one path behind
+        :meth:`add_shape`, :meth:`add_shapes`, :meth:`add_assembly`,
+        :meth:`add_robot` and :meth:`add_instances`.
+
+        A single object goes out as a "shape" message (its part list),
+        several as one "shapes" message (a list of part lists); either
+        way the browser replies with the first new id and numbers the
+        rest consecutively, in the order the messages arrive -- so the
+        ids are reserved and the message queued under ``self._lock``, and
+        concurrent adds from several threads then agree with the browser
+        on who got which id. The slots hold ``None`` (skipped by
+        :meth:`step`, like a removed object) until the browser has
+        created them.
+
+        :param objs: the Shapes/AssemblyHandles to store
+        :param parts: per object, one dict per part (``Shape.to_dict()``),
+            or ``None`` when headless
+        :param wait: also block until every object has loaded, see
+            :meth:`_wait_mounted`
+        :param code: send a single object's ``parts`` entry as this
+            message instead -- e.g. add_instances()'s "instances"
+        :return: the objects' ids, in order
+        """
+        code, ids, reply = self._queue_objects(objs, parts, code)
+        if reply is not None:
+            self._check_first_id(ids, self._await_reply(code, reply))
+            if wait:
+                self._wait_mounted(ids)
+
+        self._place(ids, objs)
+        return ids
+
+    def _place(self, ids: list[int], objs: list[Any]) -> None:
+        """
+        Fill the reserved slots -- and hand each eligible shape's pose to
+        the ShapeStore (see :class:`~swift.ShapeStore.ShapeStore`), the
+        rest to step()'s per-object loop, each robot's joints to the
+        JointStore (see :class:`~swift.JointStore.JointStore`) as well.
+        """
+        store = self._shape_store
+        with self._lock:
+            self._evict_linked()
+            for id, obj in zip(ids, objs):
+                self.swift_objects[id] = obj
+                for key in self._object_keys(obj):
+                    self._object_ids.setdefault(key, []).append(id)
+                if (
+                    store.eligible(obj)
+                    and obj not in store
+                    and id not in self.shape_callbacks
+                ):
+                    store.add(obj, id)
+                    continue
+                self._loose[id] = obj
+                if JointStore.eligible(obj) and obj not in self._joint_store:
+                    self._joint_store.add(obj, id)
+
+    @staticmethod
+    def _object_keys(obj: Any) -> list[int]:
+        # What _object_ids files obj under -- itself, plus its robot for a
+        # robot's handle
+        if isinstance(obj, AssemblyHandle) and obj.robot is not None:
+            return [id(obj), id(obj.robot)]
+        return [id(obj)]
+
+    def _unindex(self, index: dict[Any, list[int]], key: Any, idd: int) -> None:
+        ids = index.get(key)
+        if ids is not None and idd in ids:
+            ids.remove(idd)
+            if not ids:
+                del index[key]
+
+    def _evict_linked(self) -> None:
+        # Stored shapes that have since been attached to (or been given)
+        # a scene-graph parent/child go back to being stepped one by one.
+        # Must run before anything that can move stored shapes.
+        for id, shape in self._shape_store.evict_linked():
+            self._loose[id] = shape
+
+    def _unstore(self, id: int) -> None:
+        # Move a stored shape over to the per-object path -- e.g. once it
+        # has a pose callback.
+        shape = self.swift_objects[id]
+        if shape is not None and self._shape_store.remove(shape):
+            self._loose[id] = shape
+
+    def _queue_objects(
+        self, objs: list[Any], parts: list[Any] | None, code: str | None = None
+    ) -> tuple[str, list[int], "Future[Any] | None"]:
+        """
+        _add_objects()'s first half: reserve the ids and queue the message.
+
+        :return: the message code, the reserved ids, and the browser's
+            pending reply (None when headless, or with nothing to add)
+        """
+        if code is None:
+            code = "shape" if len(objs) == 1 else "shapes"
+        if not objs:
+            return code, [], None
+
+        reply = None
+        with self._lock:
+            first = len(self.swift_objects)
+            self.swift_objects.extend([None] * len(objs))
+            if parts is not None:
+                reply = self._request(code, parts[0] if len(objs) == 1 else parts)
+
+        return code, list(range(first, first + len(objs))), reply
+
+    @staticmethod
+    def _check_first_id(ids: list[int], reply: Any) -> None:
+        browser_first = int(reply)
+        if browser_first != ids[0]:
+            raise RuntimeError(
+                f"Swift object id mismatch: expected {ids[0]}, the browser "
+                f"assigned {browser_first}"
+            )
+
+    def mounted(self, id: "int | AssemblyHandle | InstanceHandle") -> "Future[int]":
+        """
+        Find out when an object has finished loading in the browser
+
+        :param id: an object id, as returned by :meth:`add_shape`, or the
+            handle :meth:`add_assembly`/:meth:`add_robot`/
+            :meth:`add_instances` returned
+        :return: a ``concurrent.futures.Future`` resolving to the object's
+            id once every part has loaded, or raising RuntimeError (with
+            the browser's reason) if one failed to. Already resolved when
+            headless.
+
+        Pairs with ``wait=False`` on the ``add*()`` methods, to keep a
+        script going while heavy mesh assets stream in:
+
+        .. code-block:: python
+
+            robot = env.add_robot(panda, wait=False)
+            ...  # set up the rest of the scene
+            env.mounted(robot).result()  # block only now, if still loading
+        """
+        if isinstance(id, (AssemblyHandle, InstanceHandle)):
+            id = id.id
+        if self.headless:
+            fut: Future[int] = Future()
+            fut.set_result(id)
+            return fut
+        return self._mounts.future(id)
+
+    def _wait_mounted(self, ids: list[int]) -> None:
+        """
+        Block until the browser reports every object in ``ids`` has
+        finished loading (see shapes.js's ``SwiftObject``) -- or raise as
+        soon as one has failed to.
+
+        The browser pushes each object's ``{"event": "mounted"}`` the
+        moment its last part loads, so this wakes straight away rather
+        than on a polling interval (see SwiftRoute.py's MountTracker for
+        the failure codes). There's no overall time limit -- a large mesh
+        can legitimately take a while -- but a disconnect ends the wait
+        within ``_DISCONNECT_POLL_INTERVAL``.
+
+        :raises RuntimeError: an object failed to load, with the
+            browser's own reason (bugs.md, Bug 2)
+        :raises TimeoutError: the browser disconnected while waiting
+        """
+        for id in ids:
+            fut = self._mounts.future(id)
+            while True:
+                try:
+                    fut.result(timeout=_DISCONNECT_POLL_INTERVAL)
+                    break
+                except _FutureTimeout:
+                    if self._disconnected.is_set():
+                        raise _mount_disconnected(id) from None
 
     def _pause_control(self, _: Any) -> None:
         # Button's cb() contract is "argument can be disregarded" -- the
@@ -1435,7 +2924,7 @@ class Swift:
         self._step_elements()
         while self._paused:
             time.sleep(0.1)
-            events = json.loads(self._send_socket("shape_poses", []))
+            events = self._send_socket("shape_poses", [])
             self.process_events(events)
 
     def _time_control(self, index: int) -> None:
@@ -1443,9 +2932,12 @@ class Swift:
         self.realtime_speed = _REALTIME_SPEEDS[int(index)]
 
     def _add_controls(self) -> None:
+        for element in self._control_elements():
+            self.add_ui(element)
+
+    def _control_elements(self) -> list[SwiftElement]:
         self._pause_button = Button(self._pause_control, label="||")
         self._pause_button.builtin = True
-        self.add_ui(self._pause_button)
 
         # self.realtime_speed may be an arbitrary float set directly via
         # launch(realtime=<float>) rather than one of the dropdown presets
@@ -1459,4 +2951,4 @@ class Swift:
             self._time_control, label="Speed", options=_REALTIME_SPEED_LABELS, value=speed_index
         )
         speed_select.builtin = True
-        self.add_ui(speed_select)
+        return [self._pause_button, speed_select]
@@ -8,7 +8,9 @@ from __future__ import annotations
 import swift as sw
 import websockets
 import asyncio
-from threading import Thread, Event
+from collections import deque
+from concurrent.futures import Future
+from threading import Thread, Event, Condition
 import webbrowser as wb
 import json
 import http.server
@@ -21,6 +23,12 @@ import urllib
 from importlib.metadata import version as _installed_version, PackageNotFoundError
 from typing import Any, Callable
 
+from websockets.extensions.permessage_deflate import (
+    PerMessageDeflate,
+    ServerPerMessageDeflateFactory,
+)
+from websockets.frames import CTRL_OPCODES, Frame, Opcode
+
 
 from queue import Queue
 
@@ -43,6 +51,14 @@ except ImportError:
     COLAB = False
 
 
+# Smallest message (encoded bytes) launch(compression=True) compresses by
+# default -- below this, deflate's per-message cost (a sync flush, plus
+# inflating on the browser's side) buys back too few bytes to matter, and
+# it's precisely the small control messages (sim_time, element updates,
+# replies) whose latency counts most.
+_COMPRESSION_THRESHOLD = 1024
+
+
 def _check_js_version(handshake_msg: str) -> None:
     """
     Warn if the connecting browser tab's JS reports a different version
@@ -93,26 +109,18 @@ def _check_js_version(handshake_msg: str) -> None:
 
 
 def start_servers(
-    outq: Queue,
+    outq: LoopChannel,
     inq: Queue,
     stop_servers: Callable[[], bool],
     disconnected: Event,
     open_tab: bool = True,
     browser: str | None = None,
+    evq: Queue | None = None,
+    replies: "ReplyRouter | None" = None,
+    mounts: "MountTracker | None" = None,
+    compression_threshold: int | None = _COMPRESSION_THRESHOLD,
 ) -> tuple[Thread, "SwiftSocket", Thread, "SwiftServer", Any]:
-    # Warn up front, not just after a cold ~60s timeout with no context --
-    # see jhavl/swift#45. Not a hard block: still attempts the connection
-    # regardless, in case Colab's infrastructure has changed, or the user
-    # wants to see it fail themselves.
-    if COLAB:
-        print(
-            "\nHeads up: Colab is not currently a supported environment "
-            "for Swift. Every connection attempt made during testing has "
-            "failed (0/500 in isolated testing of Colab's own "
-            "proxyPort() proxy alone, with no Swift code involved at "
-            "all) -- see https://github.com/jhavl/swift/issues/45 for the "
-            "full write-up. Attempting to connect anyway.\n"
-        )
+    _warn_colab()
 
     # Start our websocket server with a new port
     socket = Thread(
@@ -122,12 +130,109 @@ def start_servers(
             inq,
             stop_servers,
             disconnected,
+            evq,
+            replies,
+            mounts,
+            compression_threshold,
         ),
         daemon=True,
     )
     socket.start()
     socket_port, socket_instance = inq.get()
 
+    server, server_instance = _start_http_server(outq, inq, socket_port, stop_servers)
+
+    notebook_handle = (
+        _open_tab(server_instance.port, socket_port, browser) if open_tab else None
+    )
+
+    try:
+        handshake_msg = inq.get(timeout=_handshake_timeout())
+    except Empty:
+        _report_handshake_failure()
+        raise
+
+    _check_js_version(handshake_msg)
+
+    return socket, socket_instance, server, server_instance, notebook_handle
+
+
+async def start_servers_async(
+    outq: LoopChannel,
+    inq: Queue,
+    stop_servers: Callable[[], bool],
+    disconnected: Event,
+    open_tab: bool = True,
+    browser: str | None = None,
+    evq: Queue | None = None,
+    replies: "ReplyRouter | None" = None,
+    mounts: "MountTracker | None" = None,
+    compression_threshold: int | None = _COMPRESSION_THRESHOLD,
+) -> tuple["SwiftSocket", Thread, "SwiftServer", Any]:
+    """
+    :func:`start_servers` for a caller already running an event loop
+    (see :class:`~swift.AsyncSwift.AsyncSwift`): the websocket server is
+    started on *that* loop instead of a private one on its own thread, so
+    there is no socket thread to return. The HTTP server, which only ever
+    serves static files, still gets its own thread.
+
+    :raises TimeoutError: the browser tab never connected
+    """
+    _warn_colab()
+
+    socket_instance = SwiftSocket(
+        outq,
+        inq,
+        stop_servers,
+        disconnected,
+        evq,
+        replies,
+        mounts,
+        compression_threshold,
+        loop=asyncio.get_running_loop(),
+    )
+    socket_port = await socket_instance.start()
+
+    server, server_instance = _start_http_server(outq, inq, socket_port, stop_servers)
+
+    notebook_handle = (
+        _open_tab(server_instance.port, socket_port, browser) if open_tab else None
+    )
+
+    try:
+        handshake_msg = await asyncio.wait_for(
+            socket_instance.handshake, _handshake_timeout()
+        )
+    except asyncio.TimeoutError:
+        _report_handshake_failure()
+        socket_instance.stop()
+        server_instance.stop()
+        raise
+
+    _check_js_version(handshake_msg)
+
+    return socket_instance, server, server_instance, notebook_handle
+
+
+def _warn_colab() -> None:
+    # Warn up front, not just after a cold ~60s timeout with no context --
+    # see jhavl/swift#45. Not a hard block: still attempts the connection
+    # regardless, in case Colab's infrastructure has changed, or the user
+    # wants to see it fail themselves.
+    if COLAB:
+        print(
+            "\nHeads up: Colab is not currently a supported environment "
+            "for Swift. Every connection attempt made during testing has "
+            "failed (0/500 in isolated testing of Colab's own "
+            "proxyPort() proxy alone, with no Swift code involved at "
+            "all) -- see https://github.com/jhavl/swift/issues/45 for the "
+            "full write-up. Attempting to connect anyway.\n"
+        )
+
+
+def _start_http_server(
+    outq: LoopChannel, inq: Queue, socket_port: int, stop_servers: Callable[[], bool]
+) -> tuple[Thread, "SwiftServer"]:
     # Start a http server
     server = Thread(
         target=SwiftServer,
@@ -141,106 +246,428 @@ def start_servers(
     )
 
     server.start()
-    server_port, server_instance = inq.get()
-
-    # Only set for browser="notebook" -- a DisplayHandle (from
-    # display(..., display_id=True)) letting close() later blank out
-    # specifically the cell that rendered the iframe, regardless of
-    # which cell is executing when close() actually runs. A plain
-    # IPython.display.clear_output() only affects whatever cell is
-    # *currently* executing, which is normally a different, later one.
+    _, server_instance = inq.get()
+    return server, server_instance
+
+
+def _open_tab(server_port: int, socket_port: int, browser: str | None) -> Any:
+    """
+    Point a browser (or notebook iframe) at the running servers.
+
+    :return: only for browser="notebook", a DisplayHandle (from
+        display(..., display_id=True)) letting close() later blank out
+        specifically the cell that rendered the iframe, regardless of
+        which cell is executing when close() actually runs. A plain
+        IPython.display.clear_output() only affects whatever cell is
+        *currently* executing, which is normally a different, later one.
+    """
     notebook_handle = None
 
-    if open_tab:
-        if COLAB:
-            colab_url = eval_js(f"google.colab.kernel.proxyPort({server_port})")
-            url = colab_url + f"?{socket_port}"
+    if COLAB:
+        colab_url = eval_js(f"google.colab.kernel.proxyPort({server_port})")
+        url = colab_url + f"?{socket_port}"
+    else:
+        url = f"http://localhost:{server_port}/?{socket_port}"
+
+    if browser is not None:
+        if browser == "notebook":
+            if not NB:
+                raise ImportError(
+                    "\nCould not open in notebook mode, install ipython with 'pip"
+                    " install ipython'\n"
+                )
+
+            notebook_handle = display(
+                IFrame(
+                    src=url,
+                    width="600",
+                    height="400",
+                ),
+                display_id=True,
+            )
         else:
-            url = f"http://localhost:{server_port}/?{socket_port}"
-
-        if browser is not None:
-            if browser == "notebook":
-                if not NB:
-                    raise ImportError(
-                        "\nCould not open in notebook mode, install ipython with 'pip"
-                        " install ipython'\n"
-                    )
+            try:
+                wb.get(browser).open_new_tab(url)
+            except wb.Error:
+                print("\nCould not open specified browser, using default instead\n")
+                wb.open_new_tab(url)
+    elif COLAB:
+        # wb.open_new_tab() would try to open a browser on the
+        # (headless, remote) Colab VM itself, not the user's actual
+        # browser -- nothing would ever navigate to `url`. A
+        # window.open() triggered via eval_js isn't a direct user
+        # click either, so browsers commonly block it as a popup
+        # (confirmed 2026-07-26 -- silent, no visible error, just
+        # the same handshake timeout below). A clickable link always
+        # bypasses popup blockers since it's a genuine user gesture.
+        display(HTML(f'<a href="{url}" target="_blank">Click here to open Swift</a>'))
+    else:
+        wb.open_new_tab(url)
+
+    return notebook_handle
+
+
+def _handshake_timeout() -> float:
+    # On Colab the tab only opens once the user manually clicks the
+    # displayed link (see _open_tab()) rather than auto-opening -- give
+    # them realistic time to notice and click it.
+    return 60 if COLAB else 10
 
-                notebook_handle = display(
-                    IFrame(
-                        src=url,
-                        width="600",
-                        height="400",
-                    ),
-                    display_id=True,
-                )
+
+def _report_handshake_failure() -> None:
+    if COLAB:
+        print(
+            "\nCould not connect to the Swift simulator. As warned "
+            "above, Colab is not currently a supported environment "
+            "for Swift -- see https://github.com/jhavl/swift/issues/45 "
+            "for the full evidence. We do not have a single confirmed "
+            "successful connection to point to (0/500 in isolated "
+            "testing), so retrying is unlikely to help.\n"
+        )
+    else:
+        print("\nCould not connect to the Swift simulator \n")
+
+
+class LoopChannel:
+    """
+    Thread -> event loop message channel: Swift's outq.
+
+    A plain ``queue.Queue`` only offers a blocking ``.get()``, so the event
+    loop side used to run it on an ``asyncio.to_thread()`` worker --
+    a pool-thread handoff, plus fresh tasks, for every single outbound
+    message, and a sentinel push to unblock the orphaned worker on
+    disconnect. Here the loop side never blocks at all: it takes
+    whatever is queued with :meth:`get_nowait`, and only when nothing is
+    does it await :meth:`ready`, a future that :meth:`put` resolves via
+    ``call_soon_threadsafe`` -- so the loop is woken at most once per
+    idle period, not once per message, and an abandoned wait is just a
+    cancelled future.
+
+    The synchronous :meth:`get` is kept (``queue.Queue`` compatible) for
+    the Python thread side, e.g. tests standing in for the browser.
+    """
+
+    def __init__(self) -> None:
+        self._items: deque[Any] = deque()
+        self._cond = Condition()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._waiter: asyncio.Future[None] | None = None
+
+    def bind(self, loop: asyncio.AbstractEventLoop) -> None:
+        """
+        :param loop: the event loop :meth:`ready` futures belong to --
+            SwiftSocket's, rebound on every (re)launch
+        """
+        with self._cond:
+            self._loop = loop
+            self._waiter = None
+
+    def put(self, item: Any) -> None:
+        with self._cond:
+            self._items.append(item)
+            self._cond.notify()
+            waiter, self._waiter = self._waiter, None
+        if waiter is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(_resolve, waiter)
+
+    def get_nowait(self) -> Any:
+        """
+        :raises queue.Empty: nothing is queued
+        """
+        with self._cond:
+            if not self._items:
+                raise Empty
+            return self._items.popleft()
+
+    def get(self, block: bool = True, timeout: float | None = None) -> Any:
+        """
+        :raises queue.Empty: nothing arrived within ``timeout``
+        """
+        with self._cond:
+            if block and not self._cond.wait_for(lambda: self._items, timeout):
+                raise Empty
+            if not self._items:
+                raise Empty
+            return self._items.popleft()
+
+    def ready(self) -> asyncio.Future[None]:
+        """
+        Must be called from the bound loop.
+
+        :return: a future resolved once something is queued -- already
+            resolved if something is
+        """
+        assert self._loop is not None, "LoopChannel.ready() before bind()"
+        fut = self._loop.create_future()
+        with self._cond:
+            if self._items:
+                fut.set_result(None)
             else:
-                try:
-                    wb.get(browser).open_new_tab(url)
-                except wb.Error:
-                    print("\nCould not open specified browser, using default instead\n")
-                    wb.open_new_tab(url)
-        elif COLAB:
-            # wb.open_new_tab() would try to open a browser on the
-            # (headless, remote) Colab VM itself, not the user's actual
-            # browser -- nothing would ever navigate to `url`. A
-            # window.open() triggered via eval_js isn't a direct user
-            # click either, so browsers commonly block it as a popup
-            # (confirmed 2026-07-26 -- silent, no visible error, just
-            # the same handshake timeout below). A clickable link always
-            # bypasses popup blockers since it's a genuine user gesture.
-            display(HTML(f'<a href="{url}" target="_blank">Click here to open Swift</a>'))
-        else:
-            wb.open_new_tab(url)
+                self._waiter = fut
+        return fut
 
-    # On Colab the tab only opens once the user manually clicks the
-    # displayed link (see the COLAB branch above) rather than
-    # auto-opening -- give them realistic time to notice and click it.
-    handshake_timeout = 60 if COLAB else 10
-    try:
-        handshake_msg = inq.get(timeout=handshake_timeout)
-    except Empty:
-        if COLAB:
-            print(
-                "\nCould not connect to the Swift simulator. As warned "
-                "above, Colab is not currently a supported environment "
-                "for Swift -- see https://github.com/jhavl/swift/issues/45 "
-                "for the full evidence. We do not have a single confirmed "
-                "successful connection to point to (0/500 in isolated "
-                "testing), so retrying is unlikely to help.\n"
+    def qsize(self) -> int:
+        return len(self._items)
+
+
+class ReplyRouter:
+    """
+    Matches browser replies to the requests that asked for them.
+
+    Every message that expects a reply is tagged with a request id
+    (:meth:`reserve`), sent as ``[code, data, id]``, and answered by the
+    browser with ``[id, reply]`` -- which SwiftSocket.consumer() hands to
+    :meth:`resolve`, completing that request's future. Replies no longer
+    have to come back in send order, and several threads can each have a
+    request outstanding at once without ever being handed each other's
+    reply, which a single shared reply queue can't guarantee.
+
+    Thread-safe: ids are reserved from the Python thread(s), resolved from
+    SwiftSocket's event loop.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Condition()
+        self._next_id = 1
+        self._pending: dict[int, Future[Any]] = {}
+
+    def reserve(self) -> tuple[int, Future[Any]]:
+        """
+        :return: a fresh request id, and the future its reply will complete
+        """
+        fut: Future[Any] = Future()
+        with self._lock:
+            rid = self._next_id
+            self._next_id += 1
+            self._pending[rid] = fut
+        # A waiter giving up (Swift._await_reply()'s timeout) cancels its
+        # future -- forget it then, rather than holding it until a reply
+        # that may never come.
+        fut.add_done_callback(lambda f: self._discard(rid) if f.cancelled() else None)
+        return rid, fut
+
+    def _discard(self, rid: int) -> None:
+        with self._lock:
+            self._pending.pop(rid, None)
+
+    def resolve(self, raw: str | bytes) -> bool:
+        """
+        :param raw: one message from the browser
+        :return: whether ``raw`` was the ``[id, reply]`` answer to a
+            pending request (whose future now holds the decoded ``reply``)
+        """
+        if not isinstance(raw, str) or not raw.startswith("["):
+            return False
+        try:
+            rid, reply = json.loads(raw)
+        except ValueError:
+            return False
+        with self._lock:
+            fut = self._pending.pop(rid, None)
+        if fut is None:
+            return False
+        if fut.set_running_or_notify_cancel():
+            fut.set_result(reply)
+        return True
+
+    def __len__(self) -> int:
+        return len(self._pending)
+
+
+class MountTracker:
+    """
+    One future per object id, completed when the browser reports that
+    object has finished loading -- or has failed to.
+
+    shapes.js's SwiftObject pushes ``{"event": "mounted", "id", "status",
+    "detail"}`` the moment its last part loads (or its first part fails),
+    which SwiftSocket.consumer() hands to :meth:`resolve`. A future
+    resolves to the object's id, or raises RuntimeError with the
+    browser's own reason: ``status`` -1 is a shape type shapes.js's
+    ``load()`` doesn't recognise at all, -2 a genuine asset load failure
+    (bad path, unsupported/corrupt mesh format).
+
+    The event can arrive before anyone asks (a primitive mounts while its
+    "shape" reply is still in flight), so :meth:`future` and
+    :meth:`resolve` both create the entry on demand. Thread-safe.
+    """
+
+    def __init__(self) -> None:
+        self._lock = Condition()
+        self._mounts: dict[int, Future[int]] = {}
+
+    def future(self, id: int) -> Future[int]:
+        with self._lock:
+            fut = self._mounts.get(id)
+            if fut is None:
+                fut = self._mounts[id] = Future()
+        return fut
+
+    def resolve(self, event: dict[str, Any]) -> None:
+        """
+        :param event: a decoded ``{"event": "mounted", ...}`` message
+        """
+        id, status, detail = int(event["id"]), event["status"], event.get("detail")
+        fut = self.future(id)
+        if fut.done():
+            return
+        if status == 1:
+            fut.set_result(id)
+        elif status == -2:
+            fut.set_exception(
+                RuntimeError(
+                    f"Swift failed to load object {id}: {detail} -- check "
+                    "the browser's JavaScript console for the full error"
+                )
             )
         else:
-            print("\nCould not connect to the Swift simulator \n")
-        raise
+            fut.set_exception(
+                RuntimeError(f"Swift failed to load object {id}: {detail}")
+            )
 
-    _check_js_version(handshake_msg)
+    def forget(self, id: int) -> None:
+        with self._lock:
+            self._mounts.pop(id, None)
 
-    return socket, socket_instance, server, server_instance, notebook_handle
+    def clear(self) -> None:
+        with self._lock:
+            self._mounts.clear()
+
+
+def _resolve(fut: asyncio.Future[None]) -> None:
+    # Runs on the loop -- the wait may have been cancelled in the meantime
+    # (serve() giving up on a disconnect).
+    if not fut.done():
+        fut.set_result(None)
+
+
+class ThresholdDeflate(PerMessageDeflate):
+    """
+    permessage-deflate, but only for messages of at least ``threshold``
+    bytes.
+
+    RFC 7692 marks each message as compressed or not individually (RSV1
+    on its first frame), so any message may go out uncompressed on a
+    connection that negotiated compression -- the browser inflates only
+    those flagged. Skipped messages never touch the compressor, so its
+    context-takeover window stays in step with the browser's inflater.
+    """
+
+    def __init__(
+        self, *args: Any, threshold: int = _COMPRESSION_THRESHOLD, **kwargs: Any
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.threshold = threshold
+        # Whether the message currently being sent is going out
+        # uncompressed -- its continuation frames must follow suit.
+        self._skipping = False
+
+    def encode(self, frame: Frame) -> Frame:
+        if frame.opcode in CTRL_OPCODES:
+            return frame
+        if frame.opcode is not Opcode.CONT:
+            self._skipping = len(frame.data) < self.threshold
+        if self._skipping:
+            return frame
+        return super().encode(frame)
+
+
+class ThresholdDeflateFactory(ServerPerMessageDeflateFactory):
+    """
+    Negotiates :class:`ThresholdDeflate` -- websockets' own default
+    permessage-deflate settings (12-bit windows, ``memLevel=5``), plus
+    the size threshold.
+
+    :param threshold: smallest message, in encoded bytes, to compress
+    :param level: zlib compression level, 1 (fastest) to 9 (smallest)
+    """
+
+    def __init__(self, threshold: int = _COMPRESSION_THRESHOLD, level: int = 6) -> None:
+        super().__init__(
+            server_max_window_bits=12,
+            client_max_window_bits=12,
+            compress_settings={"memLevel": 5, "level": level},
+        )
+        self.threshold = threshold
+
+    def process_request_params(
+        self, params: Any, accepted_extensions: Any
+    ) -> tuple[list[Any], ThresholdDeflate]:
+        response, ext = super().process_request_params(params, accepted_extensions)
+        return response, ThresholdDeflate(
+            ext.remote_no_context_takeover,
+            ext.local_no_context_takeover,
+            ext.remote_max_window_bits,
+            ext.local_max_window_bits,
+            ext.compress_settings,
+            threshold=self.threshold,
+        )
+
+
+# Most queued messages coalesced into a single websocket send by
+# SwiftSocket._coalesce() -- bounds one payload's size (and so the browser
+# work done per onmessage) if Python queues faster than it can be sent.
+_MAX_BATCH = 256
 
 
 class SwiftSocket:
-    def __init__(self, outq: Queue, inq: Queue, run: Callable[[], bool], disconnected: Event) -> None:
+
+    def __init__(
+        self,
+        outq: LoopChannel,
+        inq: Queue,
+        run: Callable[[], bool],
+        disconnected: Event,
+        evq: Queue | None = None,
+        replies: ReplyRouter | None = None,
+        mounts: MountTracker | None = None,
+        compression_threshold: int | None = _COMPRESSION_THRESHOLD,
+        loop: asyncio.AbstractEventLoop | None = None,
+    ) -> None:
         self.run = run
         self.outq = outq
         self.inq = inq
-        # Set the instant either race below (this loop's send side, or
-        # expect_message()'s reply side) notices the browser is gone --
+        # Unsolicited browser -> Python messages ({"event": ...} JSON, e.g.
+        # a streamed frame's acknowledgement -- see Swift.py's
+        # launch(max_inflight=)), kept apart from inq so they can never be
+        # mistaken for the reply a blocked _send_socket() is waiting on.
+        self.evq: Queue = Queue() if evq is None else evq
+        # Request-id correlated replies (see ReplyRouter) -- anything it
+        # doesn't recognise still lands on inq, as every reply used to.
+        self.replies = replies
+        # Pushed "object finished loading" events (see MountTracker) --
+        # resolved right here on the loop, so a thread blocked in
+        # Swift._wait_mounted() wakes without anything else running.
+        self.mounts = mounts
+        # Messages of at least this many bytes go out deflated, if the
+        # browser negotiates permessage-deflate (every current one does)
+        # -- see ThresholdDeflate. None doesn't offer compression at all.
+        self.compression_threshold = compression_threshold
+        # Set the instant consumer() below notices the browser is gone --
         # lets Swift._send_socket()'s blocked inq.get() bail out well
         # before _REPLY_TIMEOUT, instead of it being the only bound.
         self.disconnected = disconnected
         self.USERS: set[Any] = set()
+
+        if loop is not None:
+            # Embedded in a loop the caller already runs (see
+            # start_servers_async()): nothing to spin up here -- the
+            # caller awaits start() itself, and the first browser
+            # message completes `handshake` rather than landing on inq,
+            # where nothing on that loop could block waiting for it.
+            self._embedded = True
+            self.loop = loop
+            self.handshake: asyncio.Future[Any] | None = loop.create_future()
+            self.outq.bind(loop)
+            return
+
+        self._embedded = False
+        self.handshake = None
         self.loop = asyncio.new_event_loop()
         asyncio.set_event_loop(self.loop)
+        self.outq.bind(self.loop)
 
-        started = False
-
-        port = 53000
-        while not started and port < 62000:
-            try:
-                self.loop.run_until_complete(self._start_server(port))
-                started = True
-            except OSError:
-                port += 1
+        port = self.loop.run_until_complete(self.start())
 
         # self, not just the port, so the calling thread can actually stop
         # this event loop later (see stop()) -- start_servers() previously
@@ -249,63 +676,90 @@ class SwiftSocket:
         self.inq.put((port, self))
         self.loop.run_forever()
 
+    async def start(self) -> int:
+        """
+        Bind the websocket server to the first free port from 53000 up.
+
+        :return: the port bound
+        """
+        port = 53000
+        while port < 62000:
+            try:
+                await self._start_server(port)
+                break
+            except OSError:
+                port += 1
+        return port
+
     async def _start_server(self, port: int) -> None:
         # websockets>=11 requires serve() to be created from a running loop.
-        self._server = await websockets.serve(self.serve, "localhost", port)
+        if self.compression_threshold is None:
+            options: dict[str, Any] = {"compression": None}
+        else:
+            options = {
+                "extensions": [ThresholdDeflateFactory(self.compression_threshold)]
+            }
+        self._server = await websockets.serve(self.serve, "localhost", port, **options)
 
     def stop(self) -> None:
+        if self._embedded:
+            # The loop is the caller's, not ours to stop -- closing the
+            # server drops the browser's connection, which ends serve().
+            self._server.close()
+            return
         # call_soon_threadsafe -- run_forever() is executing on a
         # different thread than whichever one calls stop().
         self.loop.call_soon_threadsafe(self.loop.stop)
 
+    async def wait_closed(self) -> None:
+        # For the embedded case -- after stop(), until the server (and
+        # every connection handler) has actually wound down.
+        await self._server.wait_closed()
+
     async def register(self, websocket: Any) -> None:
         self.USERS.add(websocket)
 
     async def serve(self, websocket: Any, path: str | None = None) -> None:
         # Initial connection handshake
         await self.register(websocket)
+        consumer_task = None
         try:
             recieved = await websocket.recv()
-            self.inq.put(recieved)
+            if self.handshake is not None and not self.handshake.done():
+                self.handshake.set_result(recieved)
+            else:
+                self.inq.put(recieved)
+
+            # From here on, consumer() is the only thing reading from the
+            # websocket -- replies and unsolicited events alike -- while
+            # this loop only ever sends.
+            consumer_task = asyncio.ensure_future(self.consumer(websocket))
 
-            # Now onto send, recieve cycle
             while self.run():
-                # producer() can wait a long time (nothing queued during a
-                # plain hold() with nothing actively step()-ing) -- racing
-                # it against wait_closed() means a disconnect gets noticed
-                # even while idle, instead of only the next time this code
-                # actively tries to send/recv (which, during an idle
-                # hold(), might be never). Without this, USERS never gets
-                # cleaned up for an idle connection, which silently
-                # defeats hold()'s own disconnect-timeout polling.
-                producer_task = asyncio.ensure_future(self.producer())
-                closed_task = asyncio.ensure_future(websocket.wait_closed())
-                done, _ = await asyncio.wait(
-                    [producer_task, closed_task], return_when=asyncio.FIRST_COMPLETED
-                )
-                if closed_task in done:
-                    producer_task.cancel()
-                    # Cancelling the *await* doesn't stop the underlying
-                    # blocking self.outq.get() call already running on its
-                    # own worker thread (queue.Queue has no cancellation
-                    # hook) -- left alone, that thread sits blocked
-                    # forever, and since asyncio.to_thread()'s workers are
-                    # deliberately non-daemon (stdlib default, to avoid
-                    # silently abandoning work), it would keep the whole
-                    # process alive indefinitely even after this script
-                    # has otherwise finished. A throwaway value unblocks
-                    # it the same way a real message would; nothing is
-                    # left to consume the result, so its value doesn't
-                    # matter.
-                    self.outq.put((False, ("__disconnect_sentinel__", None)))
-                    self.disconnected.set()
-                    raise websockets.exceptions.ConnectionClosed(None, None)
-                closed_task.cancel()
-                message = producer_task.result()
-                expected = message[0]
-                msg = message[1]
-                await websocket.send(json.dumps(msg))
-                await self.expect_message(websocket, expected)
+                try:
+                    message = self.outq.get_nowait()
+                except Empty:
+                    # Nothing queued -- possibly for a long time, during a
+                    # plain hold() with nothing actively step()-ing.
+                    # Racing the channel's ready() future against
+                    # consumer(), which only ever returns once the
+                    # connection has closed, means a disconnect gets
+                    # noticed even while idle, instead of only the next
+                    # time this code actively tries to send (which, during
+                    # an idle hold(), might be never). Without this, USERS
+                    # never gets cleaned up for an idle connection, which
+                    # silently defeats hold()'s own disconnect-timeout
+                    # polling.
+                    ready = self.outq.ready()
+                    done, _ = await asyncio.wait(
+                        [ready, consumer_task], return_when=asyncio.FIRST_COMPLETED
+                    )
+                    if consumer_task in done:
+                        ready.cancel()
+                        raise websockets.exceptions.ConnectionClosed(None, None)
+                    continue
+                for payload in self._coalesce(message):
+                    await websocket.send(payload)
         except websockets.exceptions.ConnectionClosed:
             # Browser tab closed (or connection otherwise dropped) mid-run
             # -- not an error, just the end of this session. websockets
@@ -313,46 +767,100 @@ class SwiftSocket:
             # full traceback and all.
             pass
         finally:
+            if consumer_task is not None:
+                consumer_task.cancel()
             self.USERS.discard(websocket)
         return
 
-    async def expect_message(self, websocket: Any, expected: bool) -> None:
-        if not expected:
-            return
-
-        # Race against wait_closed() the same way serve()'s send side
-        # does above -- otherwise a disconnect while waiting for the
-        # browser's reply (the common case during an active step() loop,
-        # where the server spends nearly all its time right here) isn't
-        # noticed until Swift._send_socket()'s own _REPLY_TIMEOUT
-        # fallback gives up, up to _REPLY_TIMEOUT seconds later instead
-        # of near-instantly. See jhavl/swift#125.
-        recv_task = asyncio.ensure_future(websocket.recv())
-        closed_task = asyncio.ensure_future(websocket.wait_closed())
-        done, _ = await asyncio.wait(
-            [recv_task, closed_task], return_when=asyncio.FIRST_COMPLETED
-        )
-        if closed_task in done:
-            recv_task.cancel()
-            self.disconnected.set()
-            raise websockets.exceptions.ConnectionClosed(None, None)
-        closed_task.cancel()
-        recieved = recv_task.result()
-        self.inq.put(recieved)
-
-    async def producer(self) -> Any:
-        # self.outq.get() is a genuine blocking call (a plain thread-safe
-        # queue.Queue, shared with the synchronous Python-thread side --
-        # can't just swap in asyncio.Queue without breaking that side's
-        # ordinary .put()/.get()). Awaiting it directly here would block
-        # this whole event-loop thread for however long nothing's queued
-        # -- which is most of the time during a plain hold() with nothing
-        # actively step()-ing -- starving the loop of any chance to notice
-        # the underlying connection closed. asyncio.to_thread() runs the
-        # blocking .get() on a worker thread and genuinely suspends this
-        # coroutine while waiting, so the event loop stays free to detect
-        # a closed connection (and cancel this await) in the meantime.
-        return await asyncio.to_thread(self.outq.get)
+    def _coalesce(self, message: Any) -> list[str | bytes]:
+        """
+        Turn ``message`` plus everything else already waiting on outq into
+        as few websocket payloads as possible.
+
+        A single step() queues several small fire-and-forget messages
+        ("sim_time", "update_element", maybe "camera_pose"/"lights") ahead
+        of its pose frame; sent one by one, each costs its own send
+        syscall, event-loop iteration and browser onmessage wakeup. Here,
+        every JSON message already queued (up to _MAX_BATCH) goes out as
+        one ``["batch", [[code, data], ...]]`` envelope instead, which
+        comms.js unpacks and dispatches in order -- a lone message keeps
+        its plain ``[code, data]`` form. Only what is queued *right now*
+        is taken (get_nowait), so this never waits for more to arrive.
+
+        A pre-packed binary frame (bytes data -- see Swift.py's
+        _pack_pose_frame()) can't go inside a JSON envelope: it goes out
+        as its own binary message, its leading kind tag standing in for
+        the envelope's code (and its header already carrying any request
+        id), after flushing whatever was batched ahead of it so ordering
+        is preserved.
+
+        :param message: the ``[request id or None, [code, data]]`` item
+            serve() just took off outq
+        :return: the payloads to send, in order
+        """
+        payloads: list[str | bytes] = []
+        batch: list[Any] = []
+
+        def flush() -> None:
+            if len(batch) == 1:
+                payloads.append(json.dumps(batch[0]))
+            elif batch:
+                payloads.append(json.dumps(["batch", batch]))
+            batch.clear()
+
+        taken = 0
+        while True:
+            rid, msg = message
+            if isinstance(msg[1], bytes):
+                flush()
+                payloads.append(msg[1])
+            else:
+                # [code, data, id] when a reply is expected (see
+                # ReplyRouter); an id-less item -- None, or a bare
+                # expected flag -- goes out as plain [code, data].
+                batch.append(
+                    msg if rid is None or isinstance(rid, bool) else [*msg, rid]
+                )
+            taken += 1
+            if taken >= _MAX_BATCH:
+                break
+            try:
+                message = self.outq.get_nowait()
+            except Empty:
+                break
+        flush()
+        return payloads
+
+    async def consumer(self, websocket: Any) -> None:
+        # Reads everything the browser sends, for as long as the
+        # connection lasts, routing each message by shape: {"event": ...}
+        # JSON (main.js sends these unprompted) to evq -- or, for a mount
+        # notification, to its object's future (see MountTracker) -- an
+        # [id, reply] answer to its waiting request's future (see
+        # ReplyRouter), and anything else to inq. A reply is always a JSON
+        # array, never an object keyed "event", so the prefix checks are
+        # unambiguous.
+        #
+        # Leaving the loop at all (rather than being cancelled by serve()
+        # on shutdown) means the connection is gone: set disconnected
+        # here, the instant it's noticed, rather than leaving a blocked
+        # _send_socket() to find out via its own _REPLY_TIMEOUT fallback
+        # -- a disconnect while waiting for a reply is the common case
+        # during an active step() loop. See jhavl/swift#125.
+        try:
+            async for recieved in websocket:
+                if isinstance(recieved, str) and recieved.startswith('{"event"'):
+                    # Cheap substring test first -- streamed frame acks
+                    # arrive every frame and are decoded later anyway.
+                    if self.mounts is not None and '"mounted"' in recieved[:24]:
+                        self.mounts.resolve(json.loads(recieved))
+                    else:
+                        self.evq.put(recieved)
+                elif self.replies is None or not self.replies.resolve(recieved):
+                    self.inq.put(recieved)
+        except websockets.exceptions.ConnectionClosed:
+            pass
+        self.disconnected.set()
 
 
 class SwiftServer:
@@ -464,6 +972,7 @@ class SwiftServer:
                 with socketserver.ThreadingTCPServer(("", server_port), Handler) as httpd:
                     httpd.daemon_threads = True
                     self.httpd = httpd
+                    self.port = server_port
                     self.inq.put((server_port, self))
                     connected = True
 
@@ -1,6 +1,14 @@
 from importlib.metadata import PackageNotFoundError, version
 
-from swift.SwiftRoute import SwiftServer, SwiftSocket, start_servers
+from swift.SwiftRoute import (
+    LoopChannel,
+    MountTracker,
+    ReplyRouter,
+    SwiftServer,
+    SwiftSocket,
+    start_servers,
+    start_servers_async,
+)
 from swift.Elements import (
     SwiftElement,
     Slider,
@@ -11,7 +19,12 @@ from swift.Elements import (
     Label,
 )
 from swift.Swift import Swift
-from swift.Handle import AssemblyHandle
+from swift.AsyncSwift import AsyncSwift
+from swift.Handle import AssemblyHandle, InstanceHandle
+from swift.KinematicChain import KinematicChain
+from swift.ShapeStore import ShapeStore
+from swift.JointStore import JointStore
+from swift.PoseBuffer import PoseBuffer
 from swift.Light import (
     Light,
     AmbientLight,
@@ -31,9 +44,14 @@ except PackageNotFoundError:
 __all__ = [
     "__version__",
     "Swift",
+    "AsyncSwift",
     "SwiftServer",
     "SwiftSocket",
+    "LoopChannel",
+    "ReplyRouter",
+    "MountTracker",
     "start_servers",
+    "start_servers_async",
     "SwiftElement",
     "Slider",
     "Select",
@@ -42,6 +60,11 @@ __all__ = [
     "Button",
     "Label",
     "AssemblyHandle",
+    "InstanceHandle",
+    "KinematicChain",
+    "ShapeStore",
+    "JointStore",
+    "PoseBuffer",
     "Light",
     "AmbientLight",
     "HemisphereLight",
@@ -24,6 +24,26 @@ static PyMethodDef physMethods[] = {
      (PyCFunction)step_shape,
      METH_VARARGS,
      "Link"},
+    {"step_shapes",
+     (PyCFunction)step_shapes,
+     METH_VARARGS,
+     "Link"},
+    {"step_joints",
+     (PyCFunction)step_joints,
+     METH_VARARGS,
+     "Link"},
+    {"step_joints_a",
+     (PyCFunction)step_joints_a,
+     METH_VARARGS,
+     "Link"},
+    {"poses_to_rows",
+     (PyCFunction)poses_to_rows,
+     METH_VARARGS,
+     "Link"},
+    {"chain_fk",
+     (PyCFunction)chain_fk,
+     METH_VARARGS,
+     "Link"},
     {NULL, NULL, 0, NULL} /* Sentinel */
 };
 
@@ -87,12 +107,12 @@ extern "C"
 
     static PyObject *step_shape(PyObject *self, PyObject *args)
     {
-        const double eps = 2.220446049250313e-16;
+        // Integrate one shape's local pose base (column-major 4x4, i.e.
+        // spatialgeometry's F-ordered SceneNode._T) by its twist v over
+        // dt, then -- treating the shape as a scene-graph root -- write
+        // its world transform sT and xyzw quaternion sq in place.
         double dt;
         PyArrayObject *py_v, *py_base, *py_sT, *py_sq;
-        npy_float64 *v_np, *base_np, *sT_np, *sq_np, *R_np, *sk_np, *temp_np, *temp2_np, *dv_np;
-        npy_float64 *n_np, *o_np, *a_np;
-        double theta, n_norm, o_norm, a_norm;
 
         if (!PyArg_ParseTuple(
                 args, "dO!O!O!O!",
@@ -103,189 +123,635 @@ extern "C"
                 &PyArray_Type, &py_sq))
             return NULL;
 
-        base_np = (npy_float64 *)PyArray_DATA(py_base);
-        sT_np = (npy_float64 *)PyArray_DATA(py_sT);
+        _step_root(
+            dt,
+            (npy_float64 *)PyArray_DATA(py_v),
+            (npy_float64 *)PyArray_DATA(py_base),
+            (npy_float64 *)PyArray_DATA(py_sT),
+            (npy_float64 *)PyArray_DATA(py_sq));
 
-        R_np = (npy_float64 *)PyMem_RawCalloc(9, sizeof(npy_float64));
-        sk_np = (npy_float64 *)PyMem_RawCalloc(9, sizeof(npy_float64));
-        temp_np = (npy_float64 *)PyMem_RawCalloc(9, sizeof(npy_float64));
-        temp2_np = (npy_float64 *)PyMem_RawCalloc(9, sizeof(npy_float64));
+        Py_RETURN_NONE;
+    }
 
-        v_np = (npy_float64 *)PyArray_DATA(py_v);
-        dv_np = (npy_float64 *)PyMem_RawCalloc(6, sizeof(npy_float64));
+    static PyObject *step_shapes(PyObject *self, PyObject *args)
+    {
+        // Batched step_shape() over a ShapeStore's buffers: v is (n, 6),
+        // T and wT are (n, 4, 4) holding each shape's matrix column-major
+        // (the memory layout of the F-ordered 4x4 spatialgeometry gives
+        // every SceneNode), wq is (n, 4). idx, if given (and not None), is
+        // an intp array of the rows to step -- the rest are left untouched.
+        // substeps splits dt into that many integrations of dt / substeps.
+        double dt;
+        PyArrayObject *py_v, *py_T, *py_wT, *py_wq;
+        PyObject *py_idx = NULL;
+        int substeps = 1;
+        npy_float64 *v, *T, *wT, *wq;
+        npy_intp *idx = NULL;
+        npy_intp n, m;
 
-        n_np = (npy_float64 *)PyMem_RawCalloc(3, sizeof(npy_float64));
-        o_np = (npy_float64 *)PyMem_RawCalloc(3, sizeof(npy_float64));
-        a_np = (npy_float64 *)PyMem_RawCalloc(3, sizeof(npy_float64));
+        if (!PyArg_ParseTuple(
+                args, "dO!O!O!O!|Oi",
+                &dt,
+                &PyArray_Type, &py_v,
+                &PyArray_Type, &py_T,
+                &PyArray_Type, &py_wT,
+                &PyArray_Type, &py_wq,
+                &py_idx,
+                &substeps))
+            return NULL;
 
-        sq_np = (npy_float64 *)PyArray_DATA(py_sq);
+        n = PyArray_NDIM(py_v) == 2 ? PyArray_DIM(py_v, 0) : -1;
 
-        MapMatrix4dc base(base_np);
-        MapMatrix4dc sT(sT_np);
+        if (n < 0 ||
+            PyArray_SIZE(py_v) != 6 * n ||
+            PyArray_SIZE(py_T) != 16 * n ||
+            PyArray_SIZE(py_wT) != 16 * n ||
+            PyArray_SIZE(py_wq) != 4 * n)
+        {
+            PyErr_SetString(PyExc_ValueError, "step_shapes expects v (n, 6), T (n, 4, 4), wT (n, 4, 4) and wq (n, 4)");
+            return NULL;
+        }
 
-        MapMatrix3dc R(R_np);
-        MapMatrix3dc sk(sk_np);
-        MapMatrix3dc temp(temp_np);
-        MapMatrix3dc temp2(temp2_np);
+        if (!PyArray_ISCARRAY(py_v) || PyArray_TYPE(py_v) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY(py_T) || PyArray_TYPE(py_T) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY(py_wT) || PyArray_TYPE(py_wT) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY(py_wq) || PyArray_TYPE(py_wq) != NPY_FLOAT64)
+        {
+            PyErr_SetString(PyExc_ValueError, "step_shapes expects C-contiguous, writeable float64 arrays");
+            return NULL;
+        }
 
-        MapVector6 v(v_np);
-        MapVector6 dv(dv_np);
+        if (!_step_args("step_shapes", "shapes", py_idx, substeps, n, &idx, &m))
+            return NULL;
 
-        MapVector3 n(n_np);
-        MapVector3 o(o_np);
-        MapVector3 a(a_np);
+        v = (npy_float64 *)PyArray_DATA(py_v);
+        T = (npy_float64 *)PyArray_DATA(py_T);
+        wT = (npy_float64 *)PyArray_DATA(py_wT);
+        wq = (npy_float64 *)PyArray_DATA(py_wq);
 
-        MapVector4 sq(sq_np);
+        Py_BEGIN_ALLOW_THREADS
 
-        // R = Eigen::Matrix3d::Identity();
-        _eye3(R_np);
+        for (npy_intp j = 0; j < m; j++)
+        {
+            npy_intp i = idx == NULL ? j : idx[j];
+            for (int k = 1; k < substeps; k++)
+                _step_pose(dt / substeps, v + 6 * i, T + 16 * i);
+            _step_root(dt / substeps, v + 6 * i, T + 16 * i, wT + 16 * i, wq + 4 * i);
+        }
 
-        // Find the stepped velocity
-        dv(0) = v(0) * dt;
-        dv(1) = v(1) * dt;
-        dv(2) = v(2) * dt;
-        dv(3) = v(3) * dt;
-        dv(4) = v(4) * dt;
-        dv(5) = v(5) * dt;
+        Py_END_ALLOW_THREADS
 
-        // theta = _norm(dv_np + 3);
-        theta = dv.tail(3).norm();
-        // std::cout << "theta: " << theta << std::endl;
+        Py_RETURN_NONE;
+    }
 
-        // Convert rotational vel to unit vector
-        dv(3) = dv(3) / theta;
-        dv(4) = dv(4) / theta;
-        dv(5) = dv(5) / theta;
+    static PyObject *step_joints(PyObject *self, PyObject *args)
+    {
+        // Batched step_v() over a JointStore's buffers: q, qd, lo and hi
+        // are (n,), every robot's joints laid end to end, with lo/hi the
+        // -inf/inf for a robot without valid joint limits. idx and
+        // substeps as step_shapes().
+        double dt, h;
+        PyArrayObject *py_q, *py_qd, *py_lo, *py_hi;
+        PyObject *py_idx = NULL;
+        int substeps = 1;
+        npy_float64 *q, *qd, *lo, *hi;
+        npy_intp *idx = NULL;
+        npy_intp n, m;
+
+        if (!PyArg_ParseTuple(
+                args, "dO!O!O!O!|Oi",
+                &dt,
+                &PyArray_Type, &py_q,
+                &PyArray_Type, &py_qd,
+                &PyArray_Type, &py_lo,
+                &PyArray_Type, &py_hi,
+                &py_idx,
+                &substeps))
+            return NULL;
 
-        // std::cout << "dv: " << dv << std::endl;
+        n = PyArray_NDIM(py_q) == 1 ? PyArray_DIM(py_q, 0) : -1;
 
-        if (theta > (10 * eps))
+        if (n < 0 ||
+            PyArray_SIZE(py_qd) != n ||
+            PyArray_SIZE(py_lo) != n ||
+            PyArray_SIZE(py_hi) != n)
         {
-            // std::cout << "HALLPPLPL " << std::endl;
-            skew(dv.tail(3), sk);
+            PyErr_SetString(PyExc_ValueError, "step_joints expects q, qd, lo and hi all (n,)");
+            return NULL;
+        }
+
+        if (!PyArray_ISCARRAY(py_q) || PyArray_TYPE(py_q) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_qd) || PyArray_TYPE(py_qd) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_lo) || PyArray_TYPE(py_lo) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_hi) || PyArray_TYPE(py_hi) != NPY_FLOAT64)
+        {
+            PyErr_SetString(PyExc_ValueError, "step_joints expects C-contiguous float64 arrays, q writeable");
+            return NULL;
+        }
+
+        if (!_step_args("step_joints", "joints", py_idx, substeps, n, &idx, &m))
+            return NULL;
+
+        q = (npy_float64 *)PyArray_DATA(py_q);
+        qd = (npy_float64 *)PyArray_DATA(py_qd);
+        lo = (npy_float64 *)PyArray_DATA(py_lo);
+        hi = (npy_float64 *)PyArray_DATA(py_hi);
+        h = dt / substeps;
+
+        Py_BEGIN_ALLOW_THREADS
+
+        for (npy_intp j = 0; j < m; j++)
+        {
+            npy_intp i = idx == NULL ? j : idx[j];
+            // Same comparisons as step_v(), so a NaN limit never clamps
+            for (int k = 0; k < substeps; k++)
+            {
+                q[i] += qd[i] * h;
 
-            // std::cout << "sk: \n"
-            //   << sk << std::endl;
+                if (q[i] > hi[i])
+                {
+                    q[i] = hi[i];
+                }
+                else if (q[i] < lo[i])
+                {
+                    q[i] = lo[i];
+                }
+            }
+        }
 
-            // temp = sin(theta) * sk
-            // _dot9(sin(theta), sk_np, temp_np);
-            temp = sk * sin(theta);
+        Py_END_ALLOW_THREADS
 
-            // R = R + temp
-            // _add9_inplace(temp_np, R_np);
-            R = R + temp;
+        Py_RETURN_NONE;
+    }
 
-            // temp = (1.0 - np.cos(theta)) * sk
-            // _dot9(1.0 - cos(theta), sk_np, temp_np);
-            temp = sk * (1.0 - cos(theta));
+    static PyObject *step_joints_a(PyObject *self, PyObject *args)
+    {
+        // step_joints() for acceleration control: qdd is integrated into
+        // qd, clamped to +-qdlim, then qd into q, clamped to [lo, hi] --
+        // a joint that hits a position limit also has the velocity
+        // carrying it further into the limit zeroed. Every array is (n,),
+        // with inf for an unlimited joint; idx and substeps as
+        // step_shapes().
+        double dt, h;
+        PyArrayObject *py_q, *py_qd, *py_qdd, *py_lo, *py_hi, *py_qdlim;
+        PyObject *py_idx = NULL;
+        int substeps = 1;
+        npy_float64 *q, *qd, *qdd, *lo, *hi, *qdlim;
+        npy_intp *idx = NULL;
+        npy_intp n, m;
 
-            // temp2 = temp @ sk
-            // _mult3(temp, sk, temp2);
-            temp2 = temp * sk;
+        if (!PyArg_ParseTuple(
+                args, "dO!O!O!O!O!O!|Oi",
+                &dt,
+                &PyArray_Type, &py_q,
+                &PyArray_Type, &py_qd,
+                &PyArray_Type, &py_qdd,
+                &PyArray_Type, &py_lo,
+                &PyArray_Type, &py_hi,
+                &PyArray_Type, &py_qdlim,
+                &py_idx,
+                &substeps))
+            return NULL;
 
-            // R = R + temp2
-            // _add9_inplace(temp2_np, R_np);
-            R = R + temp2;
+        n = PyArray_NDIM(py_q) == 1 ? PyArray_DIM(py_q, 0) : -1;
 
-            // std::cout << "R: \n"
-            //   << R << std::endl;
+        if (n < 0 ||
+            PyArray_SIZE(py_qd) != n ||
+            PyArray_SIZE(py_qdd) != n ||
+            PyArray_SIZE(py_lo) != n ||
+            PyArray_SIZE(py_hi) != n ||
+            PyArray_SIZE(py_qdlim) != n)
+        {
+            PyErr_SetString(PyExc_ValueError, "step_joints_a expects q, qd, qdd, lo, hi and qdlim all (n,)");
+            return NULL;
         }
 
-        // copy base.R into temp
-        // temp = base.block<3, 3>(0, 0);
-        temp(0, 0) = base(0, 0);
-        temp(0, 1) = base(0, 1);
-        temp(0, 2) = base(0, 2);
-        temp(1, 0) = base(1, 0);
-        temp(1, 1) = base(1, 1);
-        temp(1, 2) = base(1, 2);
-        temp(2, 0) = base(2, 0);
-        temp(2, 1) = base(2, 1);
-        temp(2, 2) = base(2, 2);
-
-        // temp2 = R @ temp
-        temp2 = R * temp;
-        // std::cout << thetatemp2 << std::endl;
-        // _mult3(R, temp, temp2);
-
-        // copy temp2 into base.R
-        // base.block<3, 3>(0, 0) = temp2;
-        base(0, 0) = temp2(0, 0);
-        base(0, 1) = temp2(0, 1);
-        base(0, 2) = temp2(0, 2);
-        base(1, 0) = temp2(1, 0);
-        base(1, 1) = temp2(1, 1);
-        base(1, 2) = temp2(1, 2);
-        base(2, 0) = temp2(2, 0);
-        base(2, 1) = temp2(2, 1);
-        base(2, 2) = temp2(2, 2);
-
-        // std::cout << "base: " << base << std::endl;
+        if (!PyArray_ISCARRAY(py_q) || PyArray_TYPE(py_q) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY(py_qd) || PyArray_TYPE(py_qd) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_qdd) || PyArray_TYPE(py_qdd) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_lo) || PyArray_TYPE(py_lo) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_hi) || PyArray_TYPE(py_hi) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_qdlim) || PyArray_TYPE(py_qdlim) != NPY_FLOAT64)
+        {
+            PyErr_SetString(PyExc_ValueError, "step_joints_a expects C-contiguous float64 arrays, q and qd writeable");
+            return NULL;
+        }
 
-        // normalise rotation
-        o(0) = base(0, 1);
-        o(1) = base(1, 1);
-        o(2) = base(2, 1);
+        if (!_step_args("step_joints_a", "joints", py_idx, substeps, n, &idx, &m))
+            return NULL;
 
-        a(0) = base(0, 2);
-        a(1) = base(1, 2);
-        a(2) = base(2, 2);
+        q = (npy_float64 *)PyArray_DATA(py_q);
+        qd = (npy_float64 *)PyArray_DATA(py_qd);
+        qdd = (npy_float64 *)PyArray_DATA(py_qdd);
+        lo = (npy_float64 *)PyArray_DATA(py_lo);
+        hi = (npy_float64 *)PyArray_DATA(py_hi);
+        qdlim = (npy_float64 *)PyArray_DATA(py_qdlim);
+        h = dt / substeps;
 
-        // _cross(o, a, n);
-        n = o.cross(a);
-        // std::cout << "n: " << n << std::endl;
+        Py_BEGIN_ALLOW_THREADS
 
-        // _cross(a, n, o);
-        o = a.cross(n);
-        // std::cout << "o: " << o << std::endl;
+        for (npy_intp j = 0; j < m; j++)
+        {
+            npy_intp i = idx == NULL ? j : idx[j];
 
-        // n_norm = _norm(n_np);
-        // o_norm = _norm(o_np);
-        // a_norm = _norm(a_np);
+            for (int k = 0; k < substeps; k++)
+            {
+                qd[i] += qdd[i] * h;
 
-        n_norm = n.norm();
-        o_norm = o.norm();
-        a_norm = a.norm();
+                if (qd[i] > qdlim[i])
+                {
+                    qd[i] = qdlim[i];
+                }
+                else if (qd[i] < -qdlim[i])
+                {
+                    qd[i] = -qdlim[i];
+                }
 
-        base(0, 0) = n(0) / n_norm;
-        base(0, 1) = o(0) / o_norm;
-        base(0, 2) = a(0) / a_norm;
-        base(1, 0) = n(1) / n_norm;
-        base(1, 1) = o(1) / o_norm;
-        base(1, 2) = a(1) / a_norm;
-        base(2, 0) = n(2) / n_norm;
-        base(2, 1) = o(2) / o_norm;
-        base(2, 2) = a(2) / a_norm;
+                q[i] += qd[i] * h;
 
-        // std::cout << "base: \n"
-        //   << base << std::endl;
+                if (q[i] > hi[i])
+                {
+                    q[i] = hi[i];
+                    if (qd[i] > 0)
+                        qd[i] = 0;
+                }
+                else if (q[i] < lo[i])
+                {
+                    q[i] = lo[i];
+                    if (qd[i] < 0)
+                        qd[i] = 0;
+                }
+            }
+        }
 
-        // Step translation
-        base(0, 3) += dv(0);
-        base(1, 3) += dv(1);
-        base(2, 3) += dv(2);
-
-        // base[3] = 0.0;
-        // base[7] = 0.0;
-        // base[11] = 0.0;
-
-        // // Set other attributes
-        // _copy4(base, sT);
-        // sT = base;
-        // _r2q(base, sq);
-
-        free(R_np);
-        free(sk_np);
-        free(temp_np);
-        free(temp2_np);
-        free(dv_np);
-        free(n_np);
-        free(o_np);
-        free(a_np);
+        Py_END_ALLOW_THREADS
 
         Py_RETURN_NONE;
     }
 
+    static PyObject *poses_to_rows(PyObject *self, PyObject *args)
+    {
+        // Swift's pose encoding: T is an (n, 4, 4) stack of ordinary
+        // (row-major) transforms, rows the (n, 7) translation + xyzw
+        // quaternion it is written into -- one pass over the stack
+        // instead of a spatialmath r2q() call per pose.
+        PyArrayObject *py_T, *py_rows;
+        npy_float64 *T, *rows;
+        npy_intp n;
+
+        if (!PyArg_ParseTuple(
+                args, "O!O!",
+                &PyArray_Type, &py_T,
+                &PyArray_Type, &py_rows))
+            return NULL;
+
+        n = PyArray_NDIM(py_rows) == 2 ? PyArray_DIM(py_rows, 0) : -1;
+
+        if (n < 0 ||
+            PyArray_SIZE(py_T) != 16 * n ||
+            PyArray_SIZE(py_rows) != 7 * n)
+        {
+            PyErr_SetString(PyExc_ValueError, "poses_to_rows expects T (n, 4, 4) and rows (n, 7)");
+            return NULL;
+        }
+
+        if (!PyArray_ISCARRAY_RO(py_T) || PyArray_TYPE(py_T) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY(py_rows) || PyArray_TYPE(py_rows) != NPY_FLOAT64)
+        {
+            PyErr_SetString(PyExc_ValueError, "poses_to_rows expects C-contiguous float64 arrays, rows writeable");
+            return NULL;
+        }
+
+        T = (npy_float64 *)PyArray_DATA(py_T);
+        rows = (npy_float64 *)PyArray_DATA(py_rows);
+
+        Py_BEGIN_ALLOW_THREADS
+
+        for (npy_intp i = 0; i < n; i++)
+            _pose_row(T + 16 * i, rows + 7 * i);
+
+        Py_END_ALLOW_THREADS
+
+        Py_RETURN_NONE;
+    }
+
+    static PyObject *chain_fk(PyObject *self, PyObject *args)
+    {
+        // KinematicChain's part poses for k instances: pre the (L, 4, 4)
+        // fixed transform of each link, links its (L, 3) intp parent
+        // (-1 the base), joint (-1 fixed) and prismatic flag, axes its
+        // (L, 3) unit joint axis, part_links/offsets the (P,) link and
+        // (P, 4, 4) offset of each part. Each row of Q (k, n) is posed
+        // from the matching bases (k, 4, 4) into out (k, P, 4, 4). All
+        // transforms are ordinary row-major ones.
+        PyArrayObject *py_pre, *py_links, *py_axes, *py_part_links, *py_offsets;
+        PyArrayObject *py_Q, *py_bases, *py_out;
+        npy_float64 *pre, *axes, *offsets, *Q, *bases, *out, *W;
+        npy_intp *links, *part_links;
+        npy_intp L, P, k, n;
+
+        if (!PyArg_ParseTuple(
+                args, "O!O!O!O!O!O!O!O!",
+                &PyArray_Type, &py_pre,
+                &PyArray_Type, &py_links,
+                &PyArray_Type, &py_axes,
+                &PyArray_Type, &py_part_links,
+                &PyArray_Type, &py_offsets,
+                &PyArray_Type, &py_Q,
+                &PyArray_Type, &py_bases,
+                &PyArray_Type, &py_out))
+            return NULL;
+
+        L = PyArray_NDIM(py_pre) == 3 ? PyArray_DIM(py_pre, 0) : -1;
+        P = PyArray_NDIM(py_part_links) == 1 ? PyArray_DIM(py_part_links, 0) : -1;
+        k = PyArray_NDIM(py_Q) == 2 ? PyArray_DIM(py_Q, 0) : -1;
+        n = PyArray_NDIM(py_Q) == 2 ? PyArray_DIM(py_Q, 1) : -1;
+
+        if (L < 0 || P < 0 || k < 0 ||
+            PyArray_SIZE(py_pre) != 16 * L ||
+            PyArray_SIZE(py_links) != 3 * L ||
+            PyArray_SIZE(py_axes) != 3 * L ||
+            PyArray_SIZE(py_offsets) != 16 * P ||
+            PyArray_SIZE(py_bases) != 16 * k ||
+            PyArray_SIZE(py_out) != 16 * k * P)
+        {
+            PyErr_SetString(PyExc_ValueError,
+                            "chain_fk expects pre (L, 4, 4), links (L, 3), axes (L, 3), part_links (P,), "
+                            "offsets (P, 4, 4), Q (k, n), bases (k, 4, 4) and out (k, P, 4, 4)");
+            return NULL;
+        }
+
+        if (!PyArray_ISCARRAY_RO(py_pre) || PyArray_TYPE(py_pre) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_links) || PyArray_TYPE(py_links) != NPY_INTP ||
+            !PyArray_ISCARRAY_RO(py_axes) || PyArray_TYPE(py_axes) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_part_links) || PyArray_TYPE(py_part_links) != NPY_INTP ||
+            !PyArray_ISCARRAY_RO(py_offsets) || PyArray_TYPE(py_offsets) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_Q) || PyArray_TYPE(py_Q) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY_RO(py_bases) || PyArray_TYPE(py_bases) != NPY_FLOAT64 ||
+            !PyArray_ISCARRAY(py_out) || PyArray_TYPE(py_out) != NPY_FLOAT64)
+        {
+            PyErr_SetString(PyExc_ValueError,
+                            "chain_fk expects C-contiguous float64 arrays, intp links and part_links, out writeable");
+            return NULL;
+        }
+
+        links = (npy_intp *)PyArray_DATA(py_links);
+        part_links = (npy_intp *)PyArray_DATA(py_part_links);
+
+        // Checked once here so the loops below can index freely
+        for (npy_intp l = 0; l < L; l++)
+        {
+            if (links[3 * l] < -1 || links[3 * l] >= l || links[3 * l + 1] < -1 || links[3 * l + 1] >= n)
+            {
+                PyErr_SetString(PyExc_ValueError, "chain_fk: a link's parent or joint index is out of range");
+                return NULL;
+            }
+        }
+        for (npy_intp p = 0; p < P; p++)
+        {
+            if (part_links[p] < 0 || part_links[p] >= L)
+            {
+                PyErr_SetString(PyExc_ValueError, "chain_fk: a part's link index is out of range");
+                return NULL;
+            }
+        }
+
+        pre = (npy_float64 *)PyArray_DATA(py_pre);
+        axes = (npy_float64 *)PyArray_DATA(py_axes);
+        offsets = (npy_float64 *)PyArray_DATA(py_offsets);
+        Q = (npy_float64 *)PyArray_DATA(py_Q);
+        bases = (npy_float64 *)PyArray_DATA(py_bases);
+        out = (npy_float64 *)PyArray_DATA(py_out);
+
+        // Each link's world frame, reused across instances
+        W = (npy_float64 *)PyMem_RawMalloc(sizeof(npy_float64) * 16 * (L > 0 ? L : 1));
+        if (W == NULL)
+            return PyErr_NoMemory();
+
+        Py_BEGIN_ALLOW_THREADS
+
+        for (npy_intp b = 0; b < k; b++)
+        {
+            npy_float64 *q = Q + n * b;
+
+            for (npy_intp l = 0; l < L; l++)
+            {
+                npy_intp parent = links[3 * l], joint = links[3 * l + 1];
+                npy_float64 *M = W + 16 * l;
+
+                _mult_se3(parent < 0 ? bases + 16 * b : W + 16 * parent, pre + 16 * l, M);
+
+                if (joint < 0)
+                    continue;
+
+                npy_float64 *a = axes + 3 * l;
+                if (links[3 * l + 2])
+                {
+                    // Prismatic: along the axis, in the link's frame
+                    for (int r = 0; r < 3; r++)
+                        M[4 * r + 3] += q[joint] * (M[4 * r] * a[0] + M[4 * r + 1] * a[1] + M[4 * r + 2] * a[2]);
+                }
+                else
+                {
+                    npy_float64 R[9], Mr[9];
+                    _axis_rotation(a, q[joint], R);
+                    for (int r = 0; r < 3; r++)
+                        for (int c = 0; c < 3; c++)
+                            Mr[3 * r + c] = M[4 * r] * R[c] + M[4 * r + 1] * R[3 + c] + M[4 * r + 2] * R[6 + c];
+                    for (int r = 0; r < 3; r++)
+                        for (int c = 0; c < 3; c++)
+                            M[4 * r + c] = Mr[3 * r + c];
+                }
+            }
+
+            for (npy_intp p = 0; p < P; p++)
+                _mult_se3(W + 16 * part_links[p], offsets + 16 * p, out + 16 * (P * b + p));
+        }
+
+        Py_END_ALLOW_THREADS
+
+        PyMem_RawFree(W);
+
+        Py_RETURN_NONE;
+    }
+
+    void _mult_se3(npy_float64 *A, npy_float64 *B, npy_float64 *C)
+    {
+        // C = A B for row-major rigid transforms, the bottom row taken as
+        // (0, 0, 0, 1) rather than multiplied out
+        for (int r = 0; r < 3; r++)
+        {
+            for (int c = 0; c < 4; c++)
+                C[4 * r + c] = A[4 * r] * B[c] + A[4 * r + 1] * B[4 + c] + A[4 * r + 2] * B[8 + c];
+            C[4 * r + 3] += A[4 * r + 3];
+        }
+        C[12] = C[13] = C[14] = 0.0;
+        C[15] = 1.0;
+    }
+
+    void _axis_rotation(npy_float64 *a, double theta, npy_float64 *R)
+    {
+        // Row-major rotation by theta about the unit axis a (Rodrigues)
+        double s = sin(theta), c = cos(theta), v = 1.0 - c;
+        double x = a[0], y = a[1], z = a[2];
+
+        R[0] = c + x * x * v;
+        R[1] = x * y * v - z * s;
+        R[2] = x * z * v + y * s;
+        R[3] = y * x * v + z * s;
+        R[4] = c + y * y * v;
+        R[5] = y * z * v - x * s;
+        R[6] = z * x * v - y * s;
+        R[7] = z * y * v + x * s;
+        R[8] = c + z * z * v;
+    }
+
+    void _pose_row(npy_float64 *T, npy_float64 *row)
+    {
+        // One row-major 4x4 as t + xyzw q, the quaternion by _r2q_cm() on
+        // its transpose -- the column-major layout _r2q_cm() reads -- so
+        // it matches a stored shape's wq exactly
+        npy_float64 cm[16];
+
+        for (int r = 0; r < 4; r++)
+            for (int c = 0; c < 4; c++)
+                cm[4 * c + r] = T[4 * r + c];
+
+        row[0] = T[3];
+        row[1] = T[7];
+        row[2] = T[11];
+        _r2q_cm(cm, row + 3);
+    }
+
+    int _step_args(const char *name, const char *what, PyObject *py_idx, int substeps, npy_intp n, npy_intp **idx, npy_intp *m)
+    {
+        // The optional trailing (idx, substeps) arguments every batched
+        // kernel shares: idx None (every row) or a 1-d intp array of rows
+        // to step, each checked to be in range, and substeps at least 1.
+        // Returns 0, with the Python exception set, if either is invalid.
+        PyArrayObject *arr;
+
+        *idx = NULL;
+        *m = n;
+
+        if (substeps < 1)
+        {
+            PyErr_Format(PyExc_ValueError, "%s expects substeps >= 1, got %d", name, substeps);
+            return 0;
+        }
+
+        if (py_idx == NULL || py_idx == Py_None)
+            return 1;
+
+        arr = (PyArrayObject *)py_idx;
+        if (!PyArray_Check(py_idx) || !PyArray_ISCARRAY_RO(arr) || PyArray_TYPE(arr) != NPY_INTP || PyArray_NDIM(arr) != 1)
+        {
+            PyErr_Format(PyExc_ValueError, "%s expects idx as a C-contiguous 1-d intp array", name);
+            return 0;
+        }
+
+        *idx = (npy_intp *)PyArray_DATA(arr);
+        *m = PyArray_DIM(arr, 0);
+        for (npy_intp j = 0; j < *m; j++)
+        {
+            if ((*idx)[j] < 0 || (*idx)[j] >= n)
+            {
+                PyErr_Format(PyExc_IndexError, "%s idx %zd out of range for %zd %s", name, (Py_ssize_t)(*idx)[j], (Py_ssize_t)n, what);
+                return 0;
+            }
+        }
+
+        return 1;
+    }
+
+    void _step_root(double dt, npy_float64 *v, npy_float64 *T, npy_float64 *wT, npy_float64 *wq)
+    {
+        // Step a scene-graph root: its world transform is its local one,
+        // so this is all SceneNode.update() would do for it afterwards
+        _step_pose(dt, v, T);
+        _copy4(T, wT);
+        _r2q_cm(wT, wq);
+    }
+
+    void _step_pose(double dt, npy_float64 *v_np, npy_float64 *base_np)
+    {
+        // Integrate one column-major 4x4 pose by its twist, with every
+        // temporary a fixed-size Eigen value on the stack
+        const double eps = 2.220446049250313e-16;
+        MapVector6 v(v_np);
+        MapMatrix4dc base(base_np);
+
+        Vector6 dv = v * dt;
+        double theta = dv.tail<3>().norm();
+
+        Matrix3dc R = Matrix3dc::Identity();
+
+        if (theta > (10 * eps))
+        {
+            Matrix3dc sk;
+            skew(dv.tail<3>() / theta, MapMatrix3dc(sk.data()));
+            R += sk * sin(theta) + (sk * (1.0 - cos(theta))) * sk;
+        }
+
+        Matrix3dc rot = R * base.block<3, 3>(0, 0);
+
+        // normalise rotation
+        Vector3 o = rot.col(1);
+        Vector3 a = rot.col(2);
+        Vector3 n = o.cross(a);
+        o = a.cross(n);
+
+        base.block<3, 1>(0, 0) = n / n.norm();
+        base.block<3, 1>(0, 1) = o / o.norm();
+        base.block<3, 1>(0, 2) = a / a.norm();
+
+        // Step translation
+        base.block<3, 1>(0, 3) += dv.head<3>();
+    }
+
+    void _r2q_cm(npy_float64 *T, npy_float64 *q)
+    {
+        // xyzw quaternion of a column-major 4x4's rotation -- the same
+        // branch-on-trace algorithm as spatialgeometry's scene_nb.cpp, so
+        // a stored shape's wq matches what SceneNode.update() would give
+        MapMatrix4dc r(T);
+        double tr = r(0, 0) + r(1, 1) + r(2, 2);
+        double S;
+
+        if (tr > 0)
+        {
+            S = sqrt(tr + 1.0) * 2.0;
+            q[3] = 0.25 * S;
+            q[0] = (r(2, 1) - r(1, 2)) / S;
+            q[1] = (r(0, 2) - r(2, 0)) / S;
+            q[2] = (r(1, 0) - r(0, 1)) / S;
+        }
+        else if ((r(0, 0) > r(1, 1)) && (r(0, 0) > r(2, 2)))
+        {
+            S = sqrt(1.0 + r(0, 0) - r(1, 1) - r(2, 2)) * 2.0;
+            q[3] = (r(2, 1) - r(1, 2)) / S;
+            q[0] = 0.25 * S;
+            q[1] = (r(0, 1) + r(1, 0)) / S;
+            q[2] = (r(0, 2) + r(2, 0)) / S;
+        }
+        else if (r(1, 1) > r(2, 2))
+        {
+            S = sqrt(1.0 + r(1, 1) - r(0, 0) - r(2, 2)) * 2.0;
+            q[3] = (r(0, 2) - r(2, 0)) / S;
+            q[0] = (r(0, 1) + r(1, 0)) / S;
+            q[1] = 0.25 * S;
+            q[2] = (r(1, 2) + r(2, 1)) / S;
+        }
+        else
+        {
+            S = sqrt(1.0 + r(2, 2) - r(0, 0) - r(1, 1)) * 2.0;
+            q[3] = (r(1, 0) - r(0, 1)) / S;
+            q[0] = (r(0, 2) + r(2, 0)) / S;
+            q[1] = (r(1, 2) + r(2, 1)) / S;
+            q[2] = 0.25 * S;
+        }
+    }
+
     double _norm(npy_float64 *v)
     {
         double n = v[0] * v[0] + v[1] * v[1] + v[2] * v[2];
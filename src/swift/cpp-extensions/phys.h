@@ -27,9 +27,21 @@ extern "C"
     void _cross(npy_float64 *a, npy_float64 *b, npy_float64 *c);
     void _r2q(npy_float64 *r, npy_float64 *q);
     void _copy4(npy_float64 *A, npy_float64 *B);
+    void _step_root(double dt, npy_float64 *v, npy_float64 *T, npy_float64 *wT, npy_float64 *wq);
+    void _step_pose(double dt, npy_float64 *v_np, npy_float64 *base_np);
+    void _r2q_cm(npy_float64 *T, npy_float64 *q);
+    void _pose_row(npy_float64 *T, npy_float64 *row);
+    void _mult_se3(npy_float64 *A, npy_float64 *B, npy_float64 *C);
+    void _axis_rotation(npy_float64 *a, double theta, npy_float64 *R);
+    int _step_args(const char *name, const char *what, PyObject *py_idx, int substeps, npy_intp n, npy_intp **idx, npy_intp *m);
 
     static PyObject *step_v(PyObject *self, PyObject *args);
     static PyObject *step_shape(PyObject *self, PyObject *args);
+    static PyObject *step_shapes(PyObject *self, PyObject *args);
+    static PyObject *step_joints(PyObject *self, PyObject *args);
+    static PyObject *step_joints_a(PyObject *self, PyObject *args);
+    static PyObject *poses_to_rows(PyObject *self, PyObject *args);
+    static PyObject *chain_fk(PyObject *self, PyObject *args);
 
 #ifdef __cplusplus
 } /* extern "C" */
@@ -7,11 +7,20 @@
  * implementation of the same interface, without changing main.js.
  *
  * Wire protocol: each message is a JSON-encoded [func, data] pair sent
- * from Python. The browser always sends a response back after handling
- * one (an id, 0, or a JSON blob depending on func) -- see main.js's
- * dispatch table.
+ * from Python -- [func, data, rid] when Python is waiting on a reply, which
+ * main.js then sends back as [rid, reply] (an id, 0, or a JSON blob
+ * depending on func -- see its dispatch table), so replies can be matched
+ * to requests however many are outstanding (SwiftRoute.py's ReplyRouter).
+ * A binary message is a packed frame instead (see
+ * frames.js) -- decoded here and handed to the same callback, with the
+ * decoded frame as `data`. Several messages queued at once on the Python
+ * side arrive as one ["batch", [[func, data], ...]] envelope (see
+ * SwiftRoute.py's SwiftSocket._coalesce()), unpacked here so the callback
+ * still only ever sees one [func, data] at a time, in send order.
  */
 
+import { decodeFrame } from "./frames.js";
+
 // Patched in place to match pyproject.toml's `version` before every
 // release build -- see scripts/sync_js_version.py, run as a step in
 // .github/workflows/cibuildwheel.yml, so this can never drift out of
@@ -31,6 +40,9 @@ export class WebSocketTransport {
   /** @param {string} url */
   constructor(url) {
     this.ws = new WebSocket(url);
+    // The default "blob" would need an async read before decodeFrame()
+    // could look at it -- an ArrayBuffer is usable immediately.
+    this.ws.binaryType = "arraybuffer";
   }
 
   onOpen(cb) {
@@ -38,10 +50,7 @@ export class WebSocketTransport {
   }
 
   onMessage(cb) {
-    this.ws.onmessage = (event) => {
-      const [func, data] = JSON.parse(event.data);
-      cb(func, data);
-    };
+    this.ws.onmessage = (event) => dispatchMessage(event.data, cb);
   }
 
   onClose(cb) {
@@ -53,6 +62,28 @@ export class WebSocketTransport {
   }
 }
 
+/**
+ * Hands one raw websocket message to `cb(func, data, rid)` -- once per
+ * message it contains, in order. `rid` is undefined for a message Python
+ * isn't waiting on a reply to.
+ *
+ * @param {string|ArrayBuffer} raw
+ * @param {(func: string, data: any, rid?: number) => void} cb
+ */
+export function dispatchMessage(raw, cb) {
+  if (raw instanceof ArrayBuffer) {
+    const frame = decodeFrame(raw);
+    cb(frame.func, frame, frame.rid ?? undefined);
+    return;
+  }
+  const [func, data, rid] = JSON.parse(raw);
+  if (func === "batch") {
+    for (const [f, d, r] of data) cb(f, d, r);
+  } else {
+    cb(func, data, rid);
+  }
+}
+
 /**
  * Reads the port Swift's Python side encodes in the page URL, e.g.
  * `http://localhost:52000/?53000` (SwiftRoute.py's start_servers) -- the
@@ -1,7 +1,7 @@
 import assert from "node:assert/strict";
 import { test } from "node:test";
 
-import { portFromLocation } from "./comms.js";
+import { dispatchMessage, portFromLocation } from "./comms.js";
 
 test("portFromLocation reads the port from the query string", (t) => {
   const originalWindow = globalThis.window;
@@ -27,3 +27,28 @@ test("portFromLocation does not read from the pathname", (t) => {
 
   assert.ok(Number.isNaN(portFromLocation()));
 });
+
+
+test("dispatchMessage unpacks a batch envelope in send order", () => {
+  const calls = [];
+  const raw = JSON.stringify([
+    "batch",
+    [
+      ["sim_time", "1.5"],
+      ["update_element", { id: "a" }],
+      ["shape_poses", [], 7],
+    ],
+  ]);
+  dispatchMessage(raw, (func, data, rid) => calls.push([func, data, rid]));
+  assert.deepEqual(calls, [
+    ["sim_time", "1.5", undefined],
+    ["update_element", { id: "a" }, undefined],
+    ["shape_poses", [], 7],
+  ]);
+});
+
+test("dispatchMessage passes a lone message straight through", () => {
+  const calls = [];
+  dispatchMessage(JSON.stringify(["axes", true]), (func, data) => calls.push([func, data]));
+  assert.deepEqual(calls, [["axes", true]]);
+});
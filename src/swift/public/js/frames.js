@@ -0,0 +1,95 @@
+/**
+ * Binary websocket frames -- the alternative to comms.js's JSON [func, data]
+ * envelope for payloads where JSON encoding/parsing is the bottleneck.
+ * Swift.py only sends these when asked to (launch(binary_poses=True)); a
+ * binary message always starts with a uint32 kind tag standing in for the
+ * envelope's func string. Layout (little-endian, see Swift.py's
+ * _pack_pose_frame()):
+ *
+ *   uint32  kind            FRAME_KINDS key
+ *   uint32  nRuns
+ *   uint32  tag             request id (kind 1) / sequence number (kind 2)
+ *   uint32  runs[nRuns][3]  (object id, first part, part count)
+ *   float32 poses[...][7]   tx ty tz qx qy qz qw, every run back to back
+ *
+ * Kept free of three.js imports so it can be unit tested under plain node.
+ */
+
+export const FRAME_KINDS = { 1: "shape_poses", 2: "shape_frame" };
+
+const HEADER_BYTES = 12;
+
+/** Floats per pose row: translation (3) + xyzw quaternion (4). */
+export const POSE_STRIDE = 7;
+
+/**
+ * @param {ArrayBuffer} buffer one binary websocket message
+ * @returns {{func: string, rid: number|null, seq: number|null, runs: Uint32Array, poses: Float32Array}}
+ *   `rid` is the request id a "shape_poses" reply must carry, `seq` a
+ *   streamed "shape_frame"'s sequence number; `runs`/`poses` are views
+ *   into `buffer` -- nothing is copied
+ */
+export function decodeFrame(buffer) {
+  const [kind, nRuns, tag] = new Uint32Array(buffer, 0, 3);
+  const func = FRAME_KINDS[kind];
+  if (func === undefined) throw new Error(`Unknown binary frame kind: ${kind}`);
+  const runs = new Uint32Array(buffer, HEADER_BYTES, nRuns * 3);
+  const poses = new Float32Array(buffer, HEADER_BYTES + nRuns * 12);
+  return {
+    func,
+    rid: kind === 1 ? tag : null,
+    seq: kind === 2 ? tag : null,
+    runs,
+    poses,
+  };
+}
+
+/**
+ * Calls `fn(id, first, count, offset)` once per run, where `offset` is the
+ * run's first float in `frame.poses`.
+ */
+export function forEachRun(frame, fn) {
+  const { runs } = frame;
+  let offset = 0;
+  for (let r = 0; r < runs.length; r += 3) {
+    const count = runs[r + 2];
+    fn(runs[r], runs[r + 1], count, offset);
+    offset += count * POSE_STRIDE;
+  }
+}
+
+/**
+ * Writes the pose row at `buffer[offset]` (t then xyzw q) into `out` as a
+ * column-major 4x4 matrix -- THREE.Matrix4's `elements` layout, so an
+ * InstancedMesh's instance matrices can be filled straight from a frame.
+ * Same result as Matrix4.compose() with a unit scale.
+ *
+ * @param {ArrayLike<number>} buffer pose rows, e.g. a frame's `poses`
+ * @param {number} offset the row's first float
+ * @param {Float32Array|Array<number>} out written from `outOffset` on
+ * @param {number} [outOffset]
+ */
+export function poseMatrix(buffer, offset, out, outOffset = 0) {
+  const x = buffer[offset + 3], y = buffer[offset + 4], z = buffer[offset + 5], w = buffer[offset + 6];
+  const x2 = x + x, y2 = y + y, z2 = z + z;
+  const xx = x * x2, xy = x * y2, xz = x * z2;
+  const yy = y * y2, yz = y * z2, zz = z * z2;
+  const wx = w * x2, wy = w * y2, wz = w * z2;
+
+  out[outOffset] = 1 - (yy + zz);
+  out[outOffset + 1] = xy + wz;
+  out[outOffset + 2] = xz - wy;
+  out[outOffset + 3] = 0;
+  out[outOffset + 4] = xy - wz;
+  out[outOffset + 5] = 1 - (xx + zz);
+  out[outOffset + 6] = yz + wx;
+  out[outOffset + 7] = 0;
+  out[outOffset + 8] = xz + wy;
+  out[outOffset + 9] = yz - wx;
+  out[outOffset + 10] = 1 - (xx + yy);
+  out[outOffset + 11] = 0;
+  out[outOffset + 12] = buffer[offset];
+  out[outOffset + 13] = buffer[offset + 1];
+  out[outOffset + 14] = buffer[offset + 2];
+  out[outOffset + 15] = 1;
+}
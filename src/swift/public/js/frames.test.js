@@ -0,0 +1,68 @@
+import assert from "node:assert/strict";
+import { test } from "node:test";
+
+import { decodeFrame, forEachRun, poseMatrix } from "./frames.js";
+
+/** Builds a frame the way Swift.py's _pack_pose_frame() does. */
+function packFrame(kind, runs, poses, tag = 0) {
+  const words = [kind, runs.length, tag];
+  const header = words.length * 4 + runs.length * 12;
+  const buffer = new ArrayBuffer(header + poses.length * 4);
+  new Uint32Array(buffer, 0, words.length).set(words);
+  new Uint32Array(buffer, words.length * 4, runs.length * 3).set(runs.flat());
+  new Float32Array(buffer, header).set(poses);
+  return buffer;
+}
+
+test("decodeFrame reads the run table and pose buffer without copying", () => {
+  const poses = [1, 2, 3, 0, 0, 0, 1, 4, 5, 6, 0, 0, 1, 0, 7, 8, 9, 1, 0, 0, 0];
+  const buffer = packFrame(1, [[0, 0, 1], [3, 0, 2]], poses, 42);
+
+  const frame = decodeFrame(buffer);
+
+  assert.equal(frame.func, "shape_poses");
+  assert.equal(frame.rid, 42);
+  assert.equal(frame.seq, null);
+  assert.deepEqual(Array.from(frame.runs), [0, 0, 1, 3, 0, 2]);
+  assert.deepEqual(Array.from(frame.poses), poses);
+  assert.equal(frame.poses.buffer, buffer);
+});
+
+test("decodeFrame reads a streamed frame's sequence number", () => {
+  const frame = decodeFrame(packFrame(2, [[4, 1, 1]], [1, 2, 3, 0, 0, 0, 1], 17));
+
+  assert.equal(frame.func, "shape_frame");
+  assert.equal(frame.seq, 17);
+  assert.equal(frame.rid, null);
+  assert.deepEqual(Array.from(frame.runs), [4, 1, 1]);
+  assert.deepEqual(Array.from(frame.poses), [1, 2, 3, 0, 0, 0, 1]);
+});
+
+test("forEachRun yields each run's offset into the pose buffer", () => {
+  const frame = decodeFrame(packFrame(1, [[2, 0, 3], [5, 1, 1]], new Array(28).fill(0)));
+
+  const seen = [];
+  forEachRun(frame, (id, first, count, offset) => seen.push([id, first, count, offset]));
+
+  assert.deepEqual(seen, [
+    [2, 0, 3, 0],
+    [5, 1, 1, 21],
+  ]);
+});
+
+test("decodeFrame rejects an unknown frame kind", () => {
+  assert.throws(() => decodeFrame(packFrame(99, [], [])), /Unknown binary frame kind: 99/);
+});
+
+test("poseMatrix writes a pose row as a column-major matrix", () => {
+  // 90 degrees about z, at (1, 2, 3), in the second row of the buffer
+  const s = Math.SQRT1_2;
+  const rows = [0, 0, 0, 0, 0, 0, 1, 1, 2, 3, 0, 0, s, s];
+  const out = new Float32Array(20);
+
+  poseMatrix(rows, 7, out, 4);
+
+  const expected = [0, 1, 0, 0, -1, 0, 0, 0, 0, 0, 1, 0, 1, 2, 3, 1];
+  Array.from(out.subarray(4)).forEach((v, i) => assert.ok(Math.abs(v - expected[i]) < 1e-6, `element ${i}: ${v}`));
+  assert.deepEqual(Array.from(out.subarray(0, 4)), [0, 0, 0, 0]);
+});
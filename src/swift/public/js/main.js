@@ -1,7 +1,8 @@
 import { createScene, setGroundPattern, updateGroundPatternPosition, setLights } from "./scene.js";
-import { SwiftObject } from "./shapes.js";
+import { SwiftObject, InstancedObject } from "./shapes.js";
 import { Slider, Button, Label, Select, Checkbox, Radio } from "./ui.js";
 import { WebSocketTransport, portFromLocation, SWIFT_JS_VERSION } from "./comms.js";
+import { forEachRun } from "./frames.js";
 import { Recorder } from "./recording.js";
 import { FPS, SimTime } from "./hud.js";
 import { saveScreenshot, timestampedScreenshotName } from "./screenshot.js";
@@ -16,7 +17,8 @@ const recorder = new Recorder(renderer.domElement);
  * Swift.py's `swift_objects` list, mirrored index-for-index -- both robots
  * and shapes are added as one flat list of parts, addressed by the same
  * index space (see shapes.js's module docstring for the wire protocol).
- * @type {Array<SwiftObject|null>}
+ * Swift.add_instances() copies are one InstancedObject, in the same space.
+ * @type {Array<SwiftObject|InstancedObject|null>}
  */
 const objects = [];
 const uiElements = [];
@@ -96,58 +98,106 @@ transport.onClose(() => {
   document.body.appendChild(banner);
 });
 
-transport.onMessage((func, data) => {
+/**
+ * Applies a pose update -- either a JSON `[[id, poses, first?], ...]` list,
+ * or a decoded binary frame (see frames.js).
+ */
+function applyPoses(data) {
+  if (data.poses instanceof Float32Array) {
+    forEachRun(data, (id, first, count, offset) => {
+      objects[id]?.setPosesPacked(data.poses, offset, first, count);
+    });
+  } else {
+    for (const [i, poses, first] of data) {
+      objects[i]?.setPoses(poses, first);
+    }
+  }
+}
+
+/**
+ * SwiftObject's onSettled for object `id`: pushes an unsolicited
+ * {"event": "mounted"} the moment it has loaded (status 1) or failed
+ * (-1 unsupported shape type, -2 asset/mesh load failed -- see
+ * shapes.js's load()), with the browser's own reason as `detail` --
+ * Swift.py's _wait_mounted()/mounted() wake on it directly (SwiftRoute.py's
+ * MountTracker) instead of polling.
+ */
+function notifyMounted(id) {
+  return (status, detail) => transport.send(JSON.stringify({ event: "mounted", id, status, detail }));
+}
+
+/** Every UI element changed since the last call, keyed by element id. */
+function collectChanges() {
+  const changes = {};
+  for (const el of uiElements) {
+    if (el.changed) {
+      changes[el.id] = el.data;
+      el.changed = false;
+    }
+  }
+  return changes;
+}
+
+transport.onMessage((func, data, rid) => {
+  // Every reply goes back tagged with the request id Python sent it under
+  // (see comms.js) -- Python may have several requests outstanding.
+  const reply = (value) => transport.send([rid, value]);
   switch (func) {
     case "shape": {
       const id = objects.length;
-      objects.push(new SwiftObject(scene, data));
-      transport.send(id);
+      objects.push(new SwiftObject(scene, data, notifyMounted(id)));
+      reply(id);
+      break;
+    }
+    case "shapes": {
+      // Swift.add_shapes(): many objects in one message, numbered
+      // consecutively from the id replied with.
+      const first = objects.length;
+      for (const parts of data) {
+        objects.push(new SwiftObject(scene, parts, notifyMounted(objects.length)));
+      }
+      reply(first);
       break;
     }
-    case "shape_mounted": {
-      const [id, _count] = data;
-      const obj = objects[id];
-      // A non-zero code (-1 unsupported shape type, -2 asset/mesh load
-      // failed -- see shapes.js's load()) tells Swift.py's poll loop to
-      // stop and raise with the specific reason, rather than retry
-      // forever -- see SwiftObject.hasError()/errorCode()/errorReason()
-      // and Swift._wait_mounted().
-      const reply = obj.hasError() ? [obj.errorCode, obj.errorReason] : [obj.isMounted() ? 1 : 0, null];
-      transport.send(reply);
+    case "instances": {
+      // Swift.add_instances(): data.count copies of one model, drawn
+      // instanced -- one object id for the lot.
+      const id = objects.length;
+      objects.push(new InstancedObject(scene, data, notifyMounted(id)));
+      reply(id);
       break;
     }
     case "remove": {
       objects[data]?.remove(scene);
       renderer.renderLists.dispose();
       objects[data] = null;
-      transport.send(0);
+      reply(0);
       break;
     }
     case "shape_update": {
       const [id, partData] = data;
       objects[id].updatePart(0, partData);
-      transport.send(0);
+      reply(0);
       break;
     }
     case "shape_poses": {
-      for (const [i, poses] of data) {
-        objects[i]?.setPoses(poses);
-      }
-
-      const changes = {};
-      for (const el of uiElements) {
-        if (el.changed) {
-          changes[el.id] = el.data;
-          el.changed = false;
-        }
-      }
-      transport.send(JSON.stringify(changes));
+      applyPoses(data);
+      reply(collectChanges());
+      break;
+    }
+    case "shape_frame": {
+      // launch(max_inflight=)'s streamed frame -- Python isn't waiting on
+      // a reply, so acknowledge it as an unsolicited event instead
+      // (SwiftSocket routes anything starting {"event" away from the
+      // reply queue), carrying the same change set a reply would.
+      applyPoses(data.poses instanceof Float32Array ? data : data.poses);
+      transport.send(JSON.stringify({ event: "frame", seq: data.seq, changes: collectChanges() }));
       break;
     }
     case "element": {
       const Cls = UI_CLASSES[data.element];
       if (Cls) uiElements.push(new Cls(data));
-      transport.send(0);
+      reply(0);
       break;
     }
     case "update_element": {
@@ -188,18 +238,18 @@ transport.onMessage((func, data) => {
     }
     case "screenshot": {
       saveScreenshot(renderer.domElement, data[0]);
-      transport.send(0);
+      reply(0);
       break;
     }
     case "start_recording": {
       const [framerate, name, format] = data;
       recorder.start(parseFloat(framerate), name, format);
-      transport.send(0);
+      reply(0);
       break;
     }
     case "stop_recording": {
       recorder.stop();
-      setTimeout(() => transport.send(0), 5000);
+      setTimeout(() => reply(0), 5000);
       break;
     }
     case "close": {
@@ -22,6 +22,7 @@ import { GLTFLoader } from "three/addons/loaders/GLTFLoader.js";
 import { Line2 } from "three/addons/lines/Line2.js";
 import { LineGeometry } from "three/addons/lines/LineGeometry.js";
 import { LineMaterial } from "three/addons/lines/LineMaterial.js";
+import { POSE_STRIDE, poseMatrix } from "./frames.js";
 
 const daeLoader = new ColladaLoader();
 const stlLoader = new STLLoader();
@@ -57,6 +58,12 @@ function setPose(object3d, t, q) {
   object3d.quaternion.set(q[0], q[1], q[2], q[3]);
 }
 
+/** setPose(), reading one frames.js pose row (t then xyzw q) at `offset`. */
+function setPosePacked(object3d, buffer, offset) {
+  object3d.position.set(buffer[offset], buffer[offset + 1], buffer[offset + 2]);
+  object3d.quaternion.set(buffer[offset + 3], buffer[offset + 4], buffer[offset + 5], buffer[offset + 6]);
+}
+
 function materialFor(part, geometry) {
   // Mesh.to_dict() sets use_vertex_colors when no explicit color= was ever
   // given (see spatialgeometry's Mesh) -- in that case, prefer whatever
@@ -502,12 +509,16 @@ export class SwiftObject {
   /**
    * @param {THREE.Scene} scene
    * @param {Array<object>} parts flat list of shape dicts
+   * @param {(status: number, detail: string|null) => void} [onSettled]
+   *   called once, as soon as every part has loaded (status 1) or any
+   *   part has failed (its error code) -- see main.js's "mounted" event
    */
-  constructor(scene, parts) {
+  constructor(scene, parts, onSettled = null) {
     this.scene = scene;
     this.parts = parts;
     this.loaded = 0;
     this.failed = 0;
+    this.onSettled = onSettled;
     // First failure's code/reason -- see load()'s two error paths
     // (-1 unsupported shape type, -2 asset/mesh load failed). Kept as
     // the *first* one seen: with several parts, only one reason is ever
@@ -518,6 +529,7 @@ export class SwiftObject {
 
     const cb = () => {
       this.loaded++;
+      this.settle();
     };
     const errCb = (code, reason) => {
       this.failed++;
@@ -525,8 +537,24 @@ export class SwiftObject {
         this.errorCode = code;
         this.errorReason = reason;
       }
+      this.settle();
     };
     for (const part of this.parts) load(part, scene, cb, errCb);
+    // Nothing to load at all (an empty part list) settles immediately.
+    this.settle();
+  }
+
+  /** Fires onSettled, once, the moment the outcome is known. */
+  settle() {
+    if (this.onSettled === null) return;
+    if (this.hasError()) {
+      this.onSettled(this.errorCode, this.errorReason);
+    } else if (this.isMounted()) {
+      this.onSettled(1, null);
+    } else {
+      return;
+    }
+    this.onSettled = null;
   }
 
   isMounted() {
@@ -538,13 +566,30 @@ export class SwiftObject {
     return this.failed > 0;
   }
 
-  setPoses(poses) {
-    for (let i = 0; i < this.parts.length; i++) {
-      const mesh = this.parts[i].mesh;
+  /**
+   * Poses `poses.length` parts starting at part `first` -- a frame only
+   * carries the parts that moved since they were last sent (see Swift.py's
+   * launch(pose_tolerance=)), every other part stays exactly where it is.
+   */
+  setPoses(poses, first = 0) {
+    for (let i = 0; i < poses.length; i++) {
+      const mesh = this.parts[first + i]?.mesh;
       if (mesh) setPose(mesh, poses[i].t, poses[i].q);
     }
   }
 
+  /**
+   * setPoses() for a binary "shape_poses" frame -- `count` parts starting
+   * at part `first`, read straight out of the frame's float buffer from
+   * `offset` on (see frames.js), with no per-part {t, q} objects.
+   */
+  setPosesPacked(buffer, offset, first, count) {
+    for (let i = 0; i < count; i++) {
+      const mesh = this.parts[first + i]?.mesh;
+      if (mesh) setPosePacked(mesh, buffer, offset + i * POSE_STRIDE);
+    }
+  }
+
   /** Handles "shape_update" -- a Shape's geometry/color/etc changed, not just its pose. */
   updatePart(index, partData) {
     const old = this.parts[index];
@@ -578,3 +623,197 @@ export class SwiftObject {
     }
   }
 }
+
+const IDENTITY = new THREE.Matrix4();
+const _instanceMatrix = new THREE.Matrix4();
+
+/**
+ * A loaded part's meshes, ready to be drawn instanced: each one's geometry
+ * and material, plus its matrix within the part's own frame -- the part's
+ * scale, y_up correction, or place inside a loaded scene -- or null when
+ * that's the identity. The part's own pose is dropped: each copy's pose
+ * row stands in for it.
+ *
+ * @returns {Array<{geometry, material, offset: THREE.Matrix4|null, castShadow: boolean, receiveShadow: boolean}>|null}
+ *   null if the part draws anything that isn't a mesh (AxesHelper,
+ *   Line2, a point cloud) -- InstancedMesh only instances meshes
+ */
+function instanceTemplates(root) {
+  root.position.set(0, 0, 0);
+  root.quaternion.identity();
+  root.updateMatrixWorld(true);
+  const templates = [];
+  let instanceable = true;
+  root.traverse((child) => {
+    if (child.isMesh && !child.isLineSegments2) {
+      const offset = child.matrixWorld.equals(IDENTITY) ? null : child.matrixWorld.clone();
+      const { geometry, material, castShadow, receiveShadow } = child;
+      templates.push({ geometry, material, offset, castShadow, receiveShadow });
+    } else if (child.isLine || child.isLineSegments2 || child.isPoints) {
+      instanceable = false;
+    }
+  });
+  return instanceable && templates.length > 0 ? templates : null;
+}
+
+/**
+ * Swift.add_instances()'s object -- `count` copies of one model, whose
+ * part dicts are the same ones a SwiftObject would get. Each part is
+ * loaded once and every mesh it loads as drawn as one THREE.InstancedMesh
+ * of `count` instances, so the model's geometry is uploaded to the GPU
+ * once however many copies there are.
+ *
+ * Poses are addressed like a SwiftObject's, over count * parts.length
+ * flat parts copy by copy: index j is part j % parts.length of copy
+ * floor(j / parts.length) -- a frame's run for this object is its
+ * copies' instance matrices, written straight from the frame's buffer.
+ * Settles (see SwiftObject's onSettled) the same way.
+ */
+export class InstancedObject {
+  /**
+   * @param {THREE.Scene} scene
+   * @param {{parts: Array<object>, count: number, poses: Array<Array<number>>}} data
+   *   the model's part dicts, the number of copies and every copy's
+   *   part's pose row, copy by copy
+   * @param {(status: number, detail: string|null) => void} [onSettled]
+   */
+  constructor(scene, data, onSettled = null) {
+    this.scene = scene;
+    this.parts = data.parts;
+    this.count = data.count;
+    // Latest pose row of every part of every copy -- kept whether or
+    // not the part has loaded yet, so one still loading appears where
+    // its copies are by then, not where they started
+    this.poses = new Float32Array(this.count * this.parts.length * POSE_STRIDE);
+    this.poses.set(data.poses.flat());
+    // Per part, its InstancedMeshes and each one's offset (see
+    // instanceTemplates()) -- empty until it has loaded
+    this.meshes = this.parts.map(() => []);
+    this.loaded = 0;
+    this.failed = 0;
+    this.onSettled = onSettled;
+    this.errorCode = null;
+    this.errorReason = null;
+
+    const stage = new THREE.Group();
+    const errCb = (code, reason) => {
+      this.failed++;
+      if (this.errorCode === null) {
+        this.errorCode = code;
+        this.errorReason = reason;
+      }
+      this.settle();
+    };
+    this.parts.forEach((part, p) => {
+      const cb = () => {
+        stage.remove(part.mesh);
+        const templates = instanceTemplates(part.mesh);
+        if (templates === null) {
+          disposeMesh(part.mesh);
+          errCb(-1, `shape type '${part.stype}' draws lines or points, which can't be instanced`);
+          return;
+        }
+        this.mount(p, templates);
+        this.loaded++;
+        this.settle();
+      };
+      load(part, stage, cb, errCb);
+    });
+    this.settle();
+  }
+
+  /** Adds part `p`'s InstancedMeshes to the scene, every copy placed. */
+  mount(p, templates) {
+    for (const { geometry, material, offset, castShadow, receiveShadow } of templates) {
+      const mesh = new THREE.InstancedMesh(geometry, material, this.count);
+      mesh.instanceMatrix.setUsage(THREE.DynamicDrawUsage);
+      // The copies are spread over the scene independently -- bounds
+      // computed once from where they first were would cull them wrongly
+      mesh.frustumCulled = false;
+      mesh.castShadow = castShadow;
+      mesh.receiveShadow = receiveShadow;
+      this.meshes[p].push({ mesh, offset });
+      this.scene.add(mesh);
+    }
+    for (let k = 0; k < this.count; k++) this.place(p, k);
+    for (const { mesh } of this.meshes[p]) mesh.instanceMatrix.needsUpdate = true;
+  }
+
+  /** Rewrites copy `k`'s instance matrices for part `p` from this.poses. */
+  place(p, k) {
+    const row = (k * this.parts.length + p) * POSE_STRIDE;
+    for (const { mesh, offset } of this.meshes[p]) {
+      const array = mesh.instanceMatrix.array;
+      if (offset === null) {
+        poseMatrix(this.poses, row, array, k * 16);
+      } else {
+        poseMatrix(this.poses, row, _instanceMatrix.elements);
+        _instanceMatrix.multiply(offset).toArray(array, k * 16);
+      }
+    }
+  }
+
+  /** Places flat parts first .. first + count - 1 -- see the class docs. */
+  placeRange(first, count) {
+    const n = this.parts.length;
+    for (let j = first; j < first + count; j++) this.place(j % n, Math.floor(j / n));
+    const touched = Math.min(count, n);
+    for (let i = 0; i < touched; i++) {
+      for (const { mesh } of this.meshes[(first + i) % n]) mesh.instanceMatrix.needsUpdate = true;
+    }
+  }
+
+  /** Fires onSettled, once -- see SwiftObject.settle(). */
+  settle() {
+    if (this.onSettled === null) return;
+    if (this.hasError()) {
+      this.onSettled(this.errorCode, this.errorReason);
+    } else if (this.isMounted()) {
+      this.onSettled(1, null);
+    } else {
+      return;
+    }
+    this.onSettled = null;
+  }
+
+  isMounted() {
+    return this.loaded === this.parts.length;
+  }
+
+  hasError() {
+    return this.failed > 0;
+  }
+
+  /** SwiftObject.setPoses(), over the flat parts. */
+  setPoses(poses, first = 0) {
+    for (let i = 0; i < poses.length; i++) {
+      const row = (first + i) * POSE_STRIDE;
+      this.poses.set(poses[i].t, row);
+      this.poses.set(poses[i].q, row + 3);
+    }
+    this.placeRange(first, poses.length);
+  }
+
+  /** SwiftObject.setPosesPacked(), over the flat parts. */
+  setPosesPacked(buffer, offset, first, count) {
+    this.poses.set(buffer.subarray(offset, offset + count * POSE_STRIDE), first * POSE_STRIDE);
+    this.placeRange(first, count);
+  }
+
+  remove(scene) {
+    // A part's meshes may share a material, and a primitive's geometry
+    // may be cached -- dispose each resource once
+    const geometries = new Set();
+    const materials = new Set();
+    for (const meshes of this.meshes) {
+      for (const { mesh } of meshes) {
+        scene.remove(mesh);
+        geometries.add(mesh.geometry);
+        for (const material of [mesh.material].flat()) materials.add(material);
+        mesh.dispose();
+      }
+    }
+    for (const geometry of geometries) geometry.dispose();
+    for (const material of materials) material.dispose();
+  }
+}
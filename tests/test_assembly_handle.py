@@ -108,6 +108,20 @@ def test_legacy_qd_mutation_updates_robot_q_after_step():
     assert np.allclose(panda.q, q_before + 0.1 * 0.05)
 
 
+@pytest.mark.rtb
+def test_in_place_robot_q_writes_need_legacy_mode():
+    env = make_env()
+    panda = rtb.models.Panda()
+    modern, legacy = env.add_robot(panda), env.add_robot(panda, legacy=True)
+
+    panda.q[0] = 0.3
+    with pytest.warns(DeprecationWarning):
+        legacy._sync_legacy()
+    modern._sync_legacy()
+    assert legacy.q[0] == 0.3
+    assert modern.q[0] == 0.0
+
+
 @pytest.mark.rtb
 def test_new_style_usage_never_warns():
     env = make_env()
@@ -157,6 +171,31 @@ def test_add_assembly_bare_fk_no_robot():
     assert np.allclose(poses[0].t, [0, 0.15, 0], atol=1e-9)
 
 
+def test_add_assembly_fk_may_return_an_ndarray_stack():
+    env = make_env()
+    env._pose_tolerance = None
+    links = [sg.Cuboid([0.3, 0.03, 0.03]), sg.Cuboid([0.25, 0.03, 0.03])]
+
+    def fk_se3(q):
+        j1 = SE3.Rz(q[0])
+        return [j1 * SE3.Tx(0.15), j1 * SE3.Tx(0.3) * SE3.Rz(q[1]) * SE3.Tx(0.125)]
+
+    def fk_array(q):
+        return np.array([T.A for T in fk_se3(q)])
+
+    handles = [
+        env.add_assembly(fk, links, q0=[np.pi / 3, -2.0]) for fk in (fk_se3, fk_array)
+    ]
+    runs, poses = env._frame_poses()
+
+    assert runs == [(handles[0].id, 0, 2), (handles[1].id, 0, 2)]
+    np.testing.assert_allclose(poses[2:], poses[:2], atol=1e-12)
+
+    handles[1]._pose_fn = lambda q: np.eye(4)
+    with pytest.raises(ValueError, match=r"\(n, 4, 4\)"):
+        env._frame_poses()
+
+
 def test_add_assembly_velocity_mode_needs_a_robot():
     env = make_env()
     link1 = sg.Cuboid([0.1, 0.1, 0.1])
@@ -251,3 +290,45 @@ def test_show_lists_user_elements_alongside_builtin_ones(capsys):
     out = capsys.readouterr().out
     assert out.count("UI[") == 1
     assert "speed" in out
+
+
+def test_part_poses_only_calls_fk_again_once_q_changes():
+    env = make_env()
+    calls = []
+
+    def fk(q):
+        calls.append(q.copy())
+        return np.array([SE3.Tx(q[0]).A])
+
+    handle = env.add_assembly(fk, [sg.Sphere(0.1)], q0=[0.0])
+    for _ in range(3):
+        env._frame_poses()
+    assert len(calls) == 1
+    assert handle.part_rows(lambda poses: 1 / 0) is handle.part_rows(
+        lambda poses: 1 / 0
+    )
+
+    handle.q[0] = 0.5
+    runs, poses = env._frame_poses()
+    assert len(calls) == 2 and poses[0, 0] == 0.5
+
+    handle.invalidate()
+    handle.part_poses()
+    assert len(calls) == 3
+
+
+@pytest.mark.rtb
+def test_robot_part_poses_follow_a_moved_base():
+    env = make_env()
+    panda = rtb.models.Panda()
+    handle = env.add_robot(panda)
+    before = handle.part_poses()[0].t
+
+    assert handle.part_poses() is handle.part_poses()
+    panda.base = SE3(1, 0, 0)
+    assert np.allclose(handle.part_poses()[0].t, before + [1, 0, 0])
+
+    # A gripper's q written in place rather than reassigned
+    fingers = handle.part_poses()[-1].t
+    panda.grippers[0].q[:] = 0.04
+    assert not np.allclose(handle.part_poses()[-1].t, fingers)
@@ -0,0 +1,177 @@
+"""
+Tests for AsyncSwift -- the asyncio facade over Swift's scene model.
+
+The connected tests run the real embedded SwiftSocket on the test's own
+event loop and connect a scripted websocket client to it as the browser
+(webbrowser.open_new_tab is patched to start that client instead of a
+real tab), so replies and mount events travel the same path main.js's
+would.
+"""
+
+import asyncio
+import json
+import time
+
+import numpy as np
+import pytest
+import spatialgeometry as sg
+import spatialmath as sm
+import websockets
+
+import swift
+from swift import AsyncSwift, Swift
+
+
+async def _fake_browser(url, received):
+    # Just enough of main.js: reply to everything carrying a request id
+    # (ids for "shape"/"shapes", no UI changes for "shape_poses", "0"
+    # otherwise) and push a "mounted" event for every object created.
+    port = int(url.rsplit("?", 1)[1])
+    next_id = 0
+    async with websockets.connect(f"ws://localhost:{port}/") as ws:
+        await ws.send(json.dumps({"js_version": swift.__version__}))
+        async for raw in ws:
+            if isinstance(raw, bytes):
+                kind, _, rid = np.frombuffer(raw, dtype="<u4", count=3)
+                received.append("shape_poses")
+                if kind == 1:
+                    await ws.send(json.dumps([int(rid), {}]))
+                continue
+            msg = json.loads(raw)
+            for code, data, *rid in msg[1] if msg[0] == "batch" else [msg]:
+                received.append(code)
+                if code == "close":
+                    return
+                if not rid:
+                    continue
+                if code in ("shape", "shapes"):
+                    count = 1 if code == "shape" else len(data)
+                    await ws.send(json.dumps([rid[0], next_id]))
+                    for id in range(next_id, next_id + count):
+                        await ws.send(
+                            json.dumps({"event": "mounted", "id": id, "status": 1})
+                        )
+                    next_id += count
+                else:
+                    await ws.send(
+                        json.dumps([rid[0], {} if code == "shape_poses" else "0"])
+                    )
+
+
+@pytest.fixture
+def browser(monkeypatch):
+    # Every message code the fake browser has received, in order.
+    received = []
+    tasks = []
+
+    def open_new_tab(url):
+        tasks.append(
+            asyncio.get_running_loop().create_task(_fake_browser(url, received))
+        )
+
+    monkeypatch.setattr(swift.SwiftRoute.wb, "open_new_tab", open_new_tab)
+    return received
+
+
+def test_async_swift_serves_the_socket_from_the_callers_loop(browser):
+    async def main():
+        env = AsyncSwift()
+        await env.launch()
+        try:
+            assert env.socket.loop is asyncio.get_running_loop()
+            assert env.socket_thread is None
+
+            box = sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3())
+            box.v = [1.0, 0, 0, 0, 0, 0]
+            assert await env.add_shape(box) == 0
+            assert await env.mounted(0) == 0
+
+            # step() draws at most rate= frames a second, counted from
+            # launch() -- wait a frame out so this one isn't skipped
+            await asyncio.sleep(1 / env.rate)
+            await env.step(0.1)
+            assert box.T[0, 3] == pytest.approx(0.1)
+        finally:
+            await env.close()
+        assert not env.server_thread.is_alive()
+
+    asyncio.run(main())
+    assert browser[:2] == ["element", "element"]  # the built-in controls
+    assert "shape" in browser and "shape_poses" in browser
+    assert browser[-1] == "close"
+
+
+def test_async_swift_concurrent_adds_get_distinct_ids(browser):
+    async def main():
+        env = AsyncSwift()
+        await env.launch(binary_poses=True)
+        try:
+            boxes = [sg.Cuboid([0.1, 0.1, 0.1]) for _ in range(3)]
+            single, many = await asyncio.gather(
+                env.add_shape(boxes[0]), env.add_shapes(boxes[1:], names=["a", "b"])
+            )
+            assert sorted([single, *many]) == [0, 1, 2]
+            assert env.swift_names == {many[0]: "a", many[1]: "b"}
+            for box in boxes:
+                assert env[env.swift_objects.index(box)] is box
+
+            await env.remove(boxes[0])
+            await env.step()
+        finally:
+            await env.close()
+
+    asyncio.run(main())
+    assert "remove" in browser
+
+
+def test_async_swift_refuses_blocking_calls(browser):
+    async def main():
+        env = AsyncSwift()
+        await env.launch()
+        try:
+            # Swift's own blocking add_shape() would wait on a reply only
+            # this (blocked) loop could deliver.
+            with pytest.raises(RuntimeError, match="AsyncSwift"):
+                Swift.add_shape(env, sg.Cuboid([0.1, 0.1, 0.1]))
+        finally:
+            await env.close()
+
+    asyncio.run(main())
+
+
+def test_async_swift_realtime_pacing_yields_to_other_tasks():
+    ticks = []
+
+    async def ticker():
+        while True:
+            ticks.append(time.time())
+            await asyncio.sleep(0.01)
+
+    async def main():
+        env = AsyncSwift()
+        await env.launch(headless=True, realtime=True)
+        task = asyncio.ensure_future(ticker())
+        start = time.time()
+        await env.step(0.2)
+        elapsed = time.time() - start
+        task.cancel()
+        return elapsed
+
+    elapsed = asyncio.run(main())
+    assert elapsed >= 0.15
+    assert len(ticks) >= 5, "step() blocked the loop while pacing"
+
+
+def test_async_swift_headless_run_and_mounted():
+    async def main():
+        env = AsyncSwift()
+        await env.launch(headless=True)
+        box = sg.Sphere(0.1)
+        box.v = [0, 0, 1.0, 0, 0, 0]
+        id = await env.add_shape(box, name="ball")
+        assert await env.mounted(id) == id
+        await env.run(duration=0.2, dt=0.05)
+        assert env.sim_time == pytest.approx(0.2)
+        assert box.T[2, 3] == pytest.approx(0.2)
+
+    asyncio.run(main())
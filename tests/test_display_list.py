@@ -56,6 +56,33 @@ def test_getitem_removed_id_raises_keyerror():
         env[id_]
 
 
+def test_getitem_by_reused_name_skips_removed_objects():
+    env = make_env()
+    first, second = sg.Sphere(0.2), sg.Sphere(0.3)
+    first_id = env.add_shape(first, name="ball")
+    env.add_shape(second, name="ball")
+
+    assert env["ball"] is first
+    env.remove(first_id)
+    assert env["ball"] is second
+    env.remove(second)
+    with pytest.raises(KeyError):
+        env["ball"]
+
+
+def test_remove_by_instance_finds_its_id_without_a_scan():
+    env = make_env()
+    shapes = [sg.Sphere(0.1) for _ in range(3)]
+    ids = env.add_shapes(shapes)
+
+    assert env._object_ids[id(shapes[1])] == [ids[1]]
+    env.remove(shapes[1])
+    assert env.swift_objects[ids[1]] is None
+    assert id(shapes[1]) not in env._object_ids
+    with pytest.raises(ValueError):
+        env.remove(shapes[1])
+
+
 def test_getitem_out_of_range_id_raises_keyerror():
     env = make_env()
 
@@ -0,0 +1,122 @@
+"""
+Tests for add_instances() -- many copies of one model, drawn by the
+browser as an InstancedMesh per part -- and its InstanceHandle.
+"""
+
+import numpy as np
+import pytest
+import roboticstoolbox as rtb
+import spatialgeometry as sg
+from numpy.testing import assert_allclose
+from spatialmath import SE3
+
+from swift import InstanceHandle, KinematicChain, Swift
+
+
+def make_env():
+    env = Swift()
+    env.headless = True
+    env._pose_tolerance = None
+    return env
+
+
+def grid(n):
+    return np.array([SE3(i, 0, 0).A for i in range(n)])
+
+
+def test_copies_are_posed_as_one_run_copy_by_copy():
+    env = make_env()
+    parts = [sg.Cuboid([0.1] * 3, pose=SE3(0, 0, 1)), sg.Sphere(0.1, pose=SE3.Rx(0.5))]
+    handle = env.add_instances(parts, grid(3))
+
+    assert isinstance(handle, InstanceHandle)
+    assert (len(handle), handle.nparts) == (3, 2)
+    runs, poses = env._frame_poses()
+    assert runs == [(handle.id, 0, 6)]
+    expected = [(SE3(i, 0, 0) * SE3(part._wT)).A for i in range(3) for part in parts]
+    assert_allclose(handle.part_poses(), expected, atol=1e-12)
+    assert_allclose(poses[:, :3], [T[:3, 3] for T in expected], atol=1e-12)
+
+
+def test_only_copies_that_moved_are_sent():
+    env = make_env()
+    env._pose_tolerance = 1e-6
+    handle = env.add_instances(sg.Sphere(0.1), grid(4))
+    env._frame_poses()
+    rows = handle.part_rows(lambda T: None)
+
+    assert env._frame_poses()[0] == []
+    assert handle.part_rows(lambda T: None) is rows
+
+    handle.poses[2] = SE3(0, 5, 0).A
+    runs, poses = env._frame_poses()
+    assert runs == [(handle.id, 2, 1)]
+    assert_allclose(poses, [[0, 5, 0, 0, 0, 0, 1]])
+
+
+def test_poses_as_rows_and_invalid_shapes():
+    env = make_env()
+    handle = env.add_instances(
+        sg.Sphere(0.1), [[1, 2, 3, 0, 0, 0, 1], [0, 0, 0, 0, 0, 1, 0]]
+    )
+    assert_allclose(handle.poses[0], SE3(1, 2, 3).A)
+    assert_allclose(handle.poses[1], SE3.Rz(np.pi).A, atol=1e-12)
+
+    with pytest.raises(
+        ValueError, match=r"add_instances\(\)'s poses must be an \(2, 4, 4\)"
+    ):
+        env.add_instances(sg.Sphere(0.1), np.zeros((2, 3)))
+    with pytest.raises(ValueError, match="needs a robot or a chain"):
+        env.add_instances(sg.Sphere(0.1), grid(2), q=np.zeros((2, 1)))
+    handle.poses = grid(3)
+    with pytest.raises(ValueError, match=r"must stay \(2, 4, 4\)"):
+        handle.part_poses()
+
+
+def test_chain_copies_each_have_their_own_q():
+    env = make_env()
+    chain = KinematicChain([np.eye(4), SE3.Tx(0.3).A], [[0, 0, 1], [0, 0, 2]])
+    links = [sg.Cuboid([0.3, 0.03, 0.03]), sg.Cuboid([0.25, 0.03, 0.03])]
+    handle = env.add_instances(links, grid(3), chain=chain)
+    assert handle.q.shape == (3, 2)
+
+    handle.q[1] = [np.pi / 2, 0.5]
+    expected = chain([np.pi / 2, 0.5], base=SE3(1, 0, 0).A)
+    assert_allclose(handle.part_poses()[2:4], expected, atol=1e-12)
+
+    with pytest.raises(ValueError, match="2 parts, but 1"):
+        env.add_instances(links[:1], grid(3), chain=chain)
+    with pytest.raises(ValueError, match=r"\(3, 2\) joint configurations"):
+        env.add_instances(links, grid(3), q=np.zeros((3, 1)), chain=chain)
+
+
+def test_callback_poses_every_copy_each_step():
+    env = make_env()
+    rise = lambda t, values: np.tile([0, 0, t, 0, 0, 0, 1], (2, 1))  # noqa: E731
+    handle = env.add_instances(sg.Sphere(0.1), grid(2), callback=rise)
+
+    env.step(0.1)
+    assert_allclose(handle.poses[:, 2, 3], [0.1, 0.1])
+
+
+def test_remove_and_mounted_take_the_handle():
+    env = make_env()
+    handle = env.add_instances(sg.Sphere(0.1), grid(2), name="markers")
+    assert env["markers"] is handle
+    assert env.mounted(handle).result() == handle.id
+
+    env.remove(handle)
+    assert env._frame_poses()[0] == []
+
+
+@pytest.mark.rtb
+def test_robot_copies_match_fkine_geometry_from_each_base():
+    env = make_env()
+    panda = rtb.models.Panda()
+    handle = env.add_instances(panda, grid(2))
+    assert handle.q.shape == (2, 9)
+
+    handle.q[1, :7] = panda.qr
+    panda.base = SE3(1, 0, 0)
+    expected = np.array([T.A for T in panda.fkine_geometry(panda.qr, 1.0, 0.0)])
+    assert_allclose(handle.part_poses()[handle.nparts :], expected, atol=1e-12)
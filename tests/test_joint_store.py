@@ -0,0 +1,288 @@
+"""
+Tests for JointStore -- the contiguous q/qd/limit arrays step() integrates
+every velocity-controlled robot from in one phys.step_joints() call -- and
+for how Swift drives robot handles through it.
+
+Most of these only need what the store reads off a robot (joint count,
+limits and the deprecated-style q/qd/control_mode), so use a stand-in
+rather than a real roboticstoolbox model; see pyproject.toml's rtb marker.
+"""
+
+import importlib
+import warnings
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import roboticstoolbox as rtb
+from numpy.testing import assert_allclose
+from spatialmath import SE3
+
+from swift import AssemblyHandle, JointStore, Swift
+
+swift_module = importlib.import_module("swift.Swift")
+
+
+class FakeRobot:
+    """The attributes of an rtb.Robot that Swift's joint stepping reads"""
+
+    def __init__(self, n, qlim=None, qdlim=None):
+        self._n = n
+        self.links = [
+            SimpleNamespace(isjoint=True, qdlim=None if qdlim is None else qdlim[j])
+            for j in range(n)
+        ]
+        self._q = np.zeros(n)
+        self._qd = np.zeros(n)
+        self._control_mode = "v"
+        self._qlim = np.zeros((2, n)) if qlim is None else np.array(qlim, dtype=float)
+        self._valid_qlim = qlim is not None
+
+    @property
+    def q(self):
+        return self._q
+
+    @property
+    def qd(self):
+        return self._qd
+
+    @property
+    def control_mode(self):
+        return self._control_mode
+
+
+def make_handle(n=2, qlim=None, qdlim=None):
+    robot = FakeRobot(n, qlim, qdlim)
+    return AssemblyHandle(lambda q: [SE3()], robot.q, robot=robot)
+
+
+def make_env():
+    env = Swift()
+    env.headless = True
+    return env
+
+
+def add_handle(env, handle):
+    # add_robot() without building parts from a real robot's links
+    (handle.id,) = env._add_objects([handle], None)
+    return handle
+
+
+def test_stored_handles_view_the_store_buffers():
+    store = JointStore(capacity=3)
+    handles = [make_handle(n) for n in (2, 3, 1)]
+    for id, handle in enumerate(handles):
+        handle.qd[:] = id + 1
+        store.add(handle, id)
+
+    assert store.capacity == 6
+    assert_allclose(store.qd, [1, 1, 2, 2, 2, 3])
+    handles[1].q[2] = 7.0
+    assert store.q[4] == 7.0
+    for handle in handles:
+        assert np.shares_memory(handle.q, store.q)
+
+
+def test_remove_gives_the_handle_its_own_arrays_and_closes_the_gap():
+    store = JointStore()
+    handles = [make_handle(2) for _ in range(3)]
+    for id, handle in enumerate(handles):
+        handle.q[:] = id
+        store.add(handle, id)
+
+    assert store.remove(handles[1])
+    assert not store.remove(handles[1])
+    assert store.ids == [0, 2]
+    assert_allclose(store.q, [0, 0, 2, 2])
+    handles[1].q[:] = 9.0
+    assert_allclose(store.q, [0, 0, 2, 2])
+    assert np.shares_memory(handles[2].q, store.q)
+
+
+def test_sync_copies_in_reassigned_q_and_rebinds_the_view():
+    store = JointStore()
+    handle = make_handle(2)
+    store.add(handle, 0)
+
+    handle.q = [0.5, 0.25]
+    handle.qd = np.ones(2)
+    store.sync()
+    assert_allclose(store.q, [0.5, 0.25])
+    assert_allclose(store.qd, [1, 1])
+    handle.q[0] = 3.0
+    assert store.q[0] == 3.0
+
+    handle.q = [1.0, 2.0, 3.0]
+    with pytest.raises(ValueError, match="2 joints"):
+        store.sync()
+
+
+def test_active_follows_control_mode_and_qd():
+    store = JointStore()
+    handles = [make_handle(2) for _ in range(4)]
+    for id, handle in enumerate(handles):
+        handle.qd[1] = 1.0
+        store.add(handle, id)
+    handles[0].qd[:] = 0
+    handles[1].control_mode = "p"
+    handles[2].readonly = True
+
+    assert store.active().tolist() == [3]
+    assert store.joints(store.active()).tolist() == [6, 7]
+
+
+def test_limits_only_clamp_a_robot_with_valid_qlim():
+    store = JointStore()
+    limited = make_handle(2, qlim=[[-1, -1], [1, 1]])
+    free = make_handle(2)
+    for id, handle in enumerate([limited, free]):
+        handle.qd[:] = 10.0
+        store.add(handle, id)
+
+    swift_module.step_joints(1.0, *store.buffers())
+    assert_allclose(limited.q, [1, 1])
+    assert_allclose(free.q, [10, 10])
+
+
+def test_step_integrates_every_velocity_controlled_handle_at_once(monkeypatch):
+    env = make_env()
+    handles = [
+        add_handle(env, make_handle(3, qlim=[[-1] * 3, [1] * 3])) for _ in range(4)
+    ]
+    for handle in handles[:3]:
+        handle.qd = [0.5, -0.5, 0.0]
+    handles[2].control_mode = "p"
+
+    calls = []
+    step_joints = swift_module.step_joints
+
+    def recording_step_joints(dt, q, qd, lo, hi, idx=None, substeps=1):
+        calls.append(idx.tolist())
+        step_joints(dt, q, qd, lo, hi, idx, substeps)
+
+    monkeypatch.setattr(swift_module, "step_joints", recording_step_joints)
+    env.step(0.5)
+    env.step(2.0)
+
+    assert calls == [[0, 1, 2, 3, 4, 5]] * 2
+    for handle in handles[:2]:
+        assert_allclose(handle.q, [1, -1, 0])
+    assert_allclose(handles[2].q, [0, 0, 0])
+
+
+def test_step_integrates_acceleration_controlled_handles():
+    env = make_env()
+    accel = add_handle(env, make_handle(2, qlim=[[-1, -1], [1, 1]], qdlim=[0.5, 10.0]))
+    velocity = add_handle(env, make_handle(2))
+    accel.control_mode = "a"
+    accel.qdd = [1.0, 4.0]
+    velocity.qd[:] = 1.0
+    velocity.qdd[:] = 100.0
+
+    env.step(0.5)
+    assert_allclose(accel.qd, [0.5, 2.0])
+    assert_allclose(accel.q, [0.25, 1.0])
+    assert_allclose(velocity.q, [0.5, 0.5])
+
+    # At the limit -- held there, not wound further in
+    env.step(0.5)
+    assert_allclose(accel.q, [0.5, 1.0])
+    assert_allclose(accel.qd, [0.5, 0.0])
+
+
+def test_substeps_integrate_inside_one_step():
+    env = make_env()
+    handle = add_handle(env, make_handle(1, qlim=[[-1], [1]]))
+    handle.control_mode = "a"
+    handle.qdd[:] = 2.0
+    calls = []
+    follower = add_handle(env, make_handle(1))
+    follower.callback = lambda t, values: calls.append(t) or [t]
+
+    # Five semi-implicit Euler steps of 0.1 s, one callback at the end
+    env.step(0.5, substeps=5)
+    assert_allclose(handle.qd, [1.0])
+    assert_allclose(handle.q, [0.3])
+    assert calls == [0.5] and env.sim_time == 0.5
+    with pytest.raises(ValueError, match="substeps"):
+        env.step(0.5, substeps=0)
+
+
+def test_acceleration_control_of_a_bare_assembly_is_rejected():
+    env = make_env()
+    handle = add_handle(env, AssemblyHandle(lambda q: [SE3()], [0.0]))
+    handle.control_mode = "a"
+
+    with pytest.raises(ValueError, match="control_mode='a'"):
+        env.step(0.1)
+
+
+def test_legacy_robot_q_writes_are_picked_up_and_pushed_back():
+    env = make_env()
+    handle = add_handle(env, make_handle(2))
+    robot = handle.robot
+
+    robot._qd = np.array([1.0, 0.0])
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        env.step(0.5)
+    assert_allclose(handle.q, [0.5, 0])
+    assert_allclose(robot._q, [0.5, 0])
+    assert np.shares_memory(handle.q, env._joint_store.q)
+
+
+def test_only_reassigned_robot_state_is_compared():
+    store = JointStore()
+    handles = [make_handle(2) for _ in range(3)]
+    for id, handle in enumerate(handles):
+        store.add(handle, id)
+
+    assert store._legacy_writes() == []
+    # Written in place -- no new object, nothing to compare
+    handles[0].robot._q[0] = 1.0
+    assert store._legacy_writes() == []
+
+    # Reassigned -- compared, and adopted only if the value changed
+    handles[1].robot._qd = handles[1].robot._qd.copy()
+    handles[2].robot._control_mode = "p"
+    assert store._legacy_writes() == handles[1:]
+    with warnings.catch_warnings():
+        warnings.simplefilter("error", DeprecationWarning)
+        handles[1]._sync_legacy()
+    assert store._legacy_writes() == handles[2:]
+
+
+def test_legacy_handles_pick_up_in_place_writes():
+    env = make_env()
+    handle = add_handle(env, make_handle(2))
+    handle.legacy = True
+
+    handle.robot._q[1] = 0.5
+    with pytest.warns(DeprecationWarning):
+        env.step(0.1)
+    assert_allclose(handle.q, [0, 0.5])
+
+
+def test_remove_takes_a_handle_out_of_the_step():
+    env = make_env()
+    kept, removed = (add_handle(env, make_handle(2)) for _ in range(2))
+    kept.qd[:] = removed.qd[:] = 1.0
+
+    env.remove(removed)
+    env.step(0.5)
+    assert env._joint_store.handles == [kept]
+    assert_allclose(kept.q, [0.5, 0.5])
+    assert_allclose(removed.q, [0, 0])
+
+
+@pytest.mark.rtb
+def test_add_robot_handles_are_stepped_from_the_store():
+    env = make_env()
+    panda = rtb.models.Panda()
+    handles = [env.add_robot(panda) for _ in range(2)]
+    handles[0].qd[0] = 1.0
+
+    env.step(0.1)
+    assert len(env._joint_store) == 2
+    assert handles[0].q[0] == pytest.approx(0.1)
+    assert handles[1].q[0] == 0.0
@@ -0,0 +1,154 @@
+"""
+Tests for KinematicChain -- the array description of a kinematic tree
+add_assembly() accepts in place of an fk, posed by phys.chain_fk() -- and
+for how Swift batches the handles that share one.
+"""
+
+import importlib
+
+import numpy as np
+import pytest
+import roboticstoolbox as rtb
+import spatialgeometry as sg
+from numpy.testing import assert_allclose
+from spatialmath import SE3
+
+from swift import KinematicChain, Swift
+
+chain_module = importlib.import_module("swift.KinematicChain")
+
+
+def make_env():
+    env = Swift()
+    env.headless = True
+    env._pose_tolerance = None
+    return env
+
+
+def planar_arm():
+    # Two revolute z joints 0.3 apart, a part at the middle of each link
+    return KinematicChain(
+        [np.eye(4), SE3.Tx(0.3).A],
+        [[0, 0, 1], [0, 0, 2]],
+        part_offsets=[SE3.Tx(0.15).A, SE3.Tx(0.125).A],
+    )
+
+
+def planar_fk(q):
+    j1 = SE3.Rz(q[0])
+    return [j1 * SE3.Tx(0.15), j1 * SE3.Tx(0.3) * SE3.Rz(q[1]) * SE3.Tx(0.125)]
+
+
+def links():
+    return [sg.Cuboid([0.3, 0.03, 0.03]), sg.Cuboid([0.25, 0.03, 0.03])]
+
+
+def test_defaults_describe_a_serial_chain_with_a_part_per_link():
+    chain = KinematicChain(
+        [np.eye(4), SE3.Tz(0.1).A, SE3.Tz(0.2).A],
+        [[0, 0, 1], [0, 0, 0], [1, 0, 0]],
+        prismatic=[0, 0, 1],
+    )
+
+    assert (chain.n, chain.nlinks, chain.nparts) == (2, 3, 3)
+    assert chain._links.tolist() == [[-1, 0, 0], [0, -1, 0], [1, 1, 1]]
+    poses = chain([np.pi / 2, 0.5])
+    assert_allclose(
+        poses[2], (SE3.Rz(np.pi / 2) * SE3.Tz(0.3) * SE3.Tx(0.5)).A, atol=1e-12
+    )
+
+
+def test_invalid_descriptions_are_rejected():
+    T = [np.eye(4)] * 2
+    with pytest.raises(ValueError, match="earlier link"):
+        KinematicChain(T, [[0, 0, 1]] * 2, parents=[-1, 1])
+    with pytest.raises(ValueError, match="nonzero axis"):
+        KinematicChain(T, [[0, 0, 1], [0, 0, 0]], joints=[0, 1])
+    with pytest.raises(ValueError, match="link indices below 2"):
+        KinematicChain(T, [[0, 0, 1]] * 2, part_links=[0, 2])
+    with pytest.raises(ValueError, match=r"\(k, 2\)"):
+        planar_arm().fk_many(np.zeros((3, 1)))
+
+
+def test_add_assembly_poses_a_chain_like_the_same_fk():
+    env = make_env()
+    chain = planar_arm()
+    by_chain = env.add_assembly(chain, links())
+    by_fk = env.add_assembly(planar_fk, links(), q0=[0.0, 0.0])
+    assert_allclose(by_chain.q, [0, 0])
+
+    by_chain.q = by_fk.q = [np.pi / 3, -2.0]
+    runs, poses = env._frame_poses()
+    assert [count for _, _, count in runs] == [2, 2]
+    assert_allclose(poses[:2], poses[2:], atol=1e-12)
+
+    with pytest.raises(ValueError, match="2 parts, but 1"):
+        env.add_assembly(chain, links()[:1])
+
+
+def test_handles_of_one_chain_are_posed_in_one_call(monkeypatch):
+    env = make_env()
+    chain = planar_arm()
+    handles = [env.add_assembly(chain, links()) for _ in range(5)]
+    calls = []
+    chain_fk = chain_module.chain_fk
+
+    def recording_chain_fk(pre, links, axes, part_links, offsets, Q, bases, out):
+        calls.append(len(Q))
+        chain_fk(pre, links, axes, part_links, offsets, Q, bases, out)
+
+    monkeypatch.setattr(chain_module, "chain_fk", recording_chain_fk)
+    for i, handle in enumerate(handles):
+        handle.q[0] = i
+    env._frame_poses()
+    assert calls == [5]
+
+    # Only what moved -- and a lone stale handle on its own
+    handles[3].q[1] = 1.0
+    runs, poses = env._frame_poses()
+    assert calls == [5, 1]
+    assert_allclose(poses[6:8, :3], [T.t for T in planar_fk([3, 1.0])], atol=1e-12)
+    env._frame_poses()
+    assert calls == [5, 1]
+
+
+def test_moving_a_chains_base_moves_its_handles():
+    env = make_env()
+    chain = planar_arm()
+    handle = env.add_assembly(chain, links())
+    before = handle.part_poses()[:, :3, 3].copy()
+
+    chain.base = SE3(0, 0, 1).A
+    assert_allclose(handle.part_poses()[:, :3, 3], before + [0, 0, 1])
+
+
+@pytest.mark.rtb
+def test_from_robot_matches_fkine_geometry_with_grippers_and_base():
+    panda = rtb.models.Panda()
+    panda.base = SE3(1, 2, 0) * SE3.Rz(0.5)
+    panda.grippers[0].q = [0.01, 0.02]
+    chain = KinematicChain.from_robot(panda, collision_alpha=1.0)
+    q = panda.qr + 0.1
+
+    expected = np.array([T.A for T in panda.fkine_geometry(q, 1.0, 1.0)])
+    assert chain.n == 9
+    assert_allclose(chain(np.concatenate([q, [0.01, 0.02]])), expected, atol=1e-12)
+
+
+@pytest.mark.rtb
+def test_add_robot_native_fk_draws_the_same_frame():
+    env = make_env()
+    panda = rtb.models.Panda()
+    handles = [env.add_robot(panda, native_fk=native) for native in (False, True)]
+    for handle in handles:
+        handle.q = panda.qr
+
+    runs, poses = env._frame_poses()
+    n = runs[0][2]
+    assert isinstance(handles[1]._pose_fn, KinematicChain)
+    assert_allclose(poses[n:], poses[:n], atol=1e-12)
+
+    panda.base = SE3(0, 1, 0)
+    panda.grippers[0].q = [0.03, 0.03]
+    runs, poses = env._frame_poses()
+    assert_allclose(poses[n:], poses[:n], atol=1e-12)
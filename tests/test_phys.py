@@ -1,7 +1,9 @@
 """
 Tests for the physics step functions.
 
-The Python fallbacks (_step_v_py, _step_shape_py) are always tested.
+The Python fallbacks (_step_v_py, _step_shape_py, _step_shapes_py,
+_step_joints_py, _step_joints_a_py, _poses_to_rows_py, _chain_fk_py) are
+always tested.
 When the compiled C extension is available, each test is also run against
 it and the results are compared to the Python output.
 """
@@ -11,10 +13,26 @@ import pytest
 from numpy.testing import assert_allclose
 import spatialmath.base as smb
 
-from swift.Swift import _step_v_py, _step_shape_py
+from swift.Swift import (
+    _step_v_py,
+    _step_shape_py,
+    _step_shapes_py,
+    _step_joints_py,
+    _step_joints_a_py,
+    _poses_to_rows_py,
+)
+from swift.KinematicChain import _chain_fk_py
 
 try:
-    from swift.phys import step_v as _step_v_c, step_shape as _step_shape_c
+    from swift.phys import (
+        step_v as _step_v_c,
+        step_shape as _step_shape_c,
+        step_shapes as _step_shapes_c,
+        step_joints as _step_joints_c,
+        step_joints_a as _step_joints_a_c,
+        poses_to_rows as _poses_to_rows_c,
+        chain_fk as _chain_fk_c,
+    )
 
     HAS_EXT = True
 except ImportError:
@@ -198,6 +216,32 @@ class TestStepShape:
         self._call_py(0.1, v, base)
         assert base_ref is base
 
+    def test_writes_world_transform_and_xyzw_quaternion(self):
+        base = _identity_base()
+        sT = np.asfortranarray(np.zeros((4, 4)))
+        sq = np.zeros(4)
+        v = np.array([0.1, 0.2, 0.3, 0.0, 0.0, np.pi], dtype=np.float64)
+        _step_shape_py(0.5, v, base, sT, sq)
+        assert_allclose(sT, base)
+        assert_allclose(sq, [0, 0, np.sqrt(0.5), np.sqrt(0.5)], atol=1e-12)
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_c_extension_writes_world_transform_and_quaternion(self):
+        v = np.array([0.05, -0.03, 0.01, 0.1, -2.0, 0.15], dtype=np.float64)
+        outputs = []
+        for step in (_step_shape_py, _step_shape_c):
+            base = _identity_base()
+            sT = np.asfortranarray(np.zeros((4, 4)))
+            sq = np.zeros(4)
+            for _ in range(10):
+                step(0.1, v, base, sT, sq)
+            outputs.append((base, sT, sq))
+        (base_py, sT_py, sq_py), (base_c, sT_c, sq_c) = outputs
+        assert_allclose(sT_c, base_c)
+        assert_allclose(sT_c, sT_py, atol=1e-12)
+        assert_allclose(sq_c, sq_py, atol=1e-12)
+        _assert_same_rotation(sq_c, smb.r2q(base_c[:3, :3], order="xyzs"))
+
     def test_homogeneous_row_unchanged(self):
         """Bottom row of base must always remain [0, 0, 0, 1]."""
         base = _identity_base()
@@ -243,3 +287,384 @@ class TestStepShape:
         t_c, q_c = _pose_from_base(base_c)
         assert_allclose(t_py, t_c, atol=1e-10)
         _assert_same_rotation(q_py, q_c, atol=1e-8)
+
+
+# ---------------------------------------------------------------------------
+# step_shapes tests
+# ---------------------------------------------------------------------------
+
+
+def _stacked_poses(n, seed=0):
+    """(n, 4, 4) buffer of random poses, each 4x4 stored column-major as
+    in a ShapeStore -- buf[i].T is pose i -- plus a few axis-aligned half
+    turns that exercise every branch of the quaternion extraction."""
+    rng = np.random.default_rng(seed)
+    poses = [
+        smb.trnorm(smb.rpy2tr(*rng.uniform(-np.pi, np.pi, 3))) for _ in range(n - 3)
+    ]
+    poses += [
+        np.diag([1.0, -1, -1, 1]),
+        np.diag([-1.0, 1, -1, 1]),
+        np.diag([-1.0, -1, 1, 1]),
+    ]
+    for T in poses[: n - 3]:
+        T[:3, 3] = rng.uniform(-1, 1, 3)
+    return np.ascontiguousarray(np.array(poses).transpose(0, 2, 1))
+
+
+class TestStepShapes:
+    def _inputs(self, n=20):
+        v = np.random.default_rng(1).normal(size=(n, 6))
+        v[-3:] = 0.0
+        return v, _stacked_poses(n), np.zeros((n, 4, 4)), np.zeros((n, 4))
+
+    def test_matches_step_shape_per_pose(self):
+        v, T, wT, wq = self._inputs()
+        expected = [np.asfortranarray(T[i].T) for i in range(len(T))]
+        for vi, base in zip(v, expected):
+            _step_shape_py(0.1, vi, base, _zero_wT(), _zero_wq())
+        _step_shapes_py(0.1, v, T, wT, wq)
+        for i, base in enumerate(expected):
+            assert_allclose(T[i].T, base, atol=1e-12)
+
+    def test_writes_world_transform_and_xyzw_quaternion(self):
+        v, T, wT, wq = self._inputs()
+        _step_shapes_py(0.1, v, T, wT, wq)
+        assert_allclose(wT, T)
+        for i in range(len(T)):
+            _assert_same_rotation(wq[i], smb.r2q(T[i].T[:3, :3], order="xyzs"))
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_matches_c_extension(self):
+        v, T_py, wT_py, wq_py = self._inputs()
+        T_c, wT_c, wq_c = T_py.copy(), wT_py.copy(), wq_py.copy()
+        for _ in range(10):
+            _step_shapes_py(0.05, v, T_py, wT_py, wq_py)
+            _step_shapes_c(0.05, v, T_c, wT_c, wq_c)
+        assert_allclose(T_c, T_py, atol=1e-12)
+        assert_allclose(wT_c, wT_py, atol=1e-12)
+        assert_allclose(wq_c, wq_py, atol=1e-12)
+
+    def test_idx_steps_only_those_rows(self):
+        v, T, wT, wq = self._inputs()
+        idx = np.array([0, 5, 7], dtype=np.intp)
+        expected = T.copy(), wT.copy(), wq.copy()
+        _step_shapes_py(0.1, v, *expected)
+        steps = [_step_shapes_py] + ([_step_shapes_c] if HAS_EXT else [])
+        for step in steps:
+            out = T.copy(), wT.copy(), wq.copy()
+            step(0.1, v, *out, idx)
+            rest = np.setdiff1d(np.arange(len(T)), idx)
+            for got, want, before in zip(out, expected, (T, wT, wq)):
+                assert_allclose(got[idx], want[idx], atol=1e-12)
+                assert_allclose(got[rest], before[rest])
+
+    def test_substeps_match_that_many_shorter_steps(self):
+        steps = [_step_shapes_py] + ([_step_shapes_c] if HAS_EXT else [])
+        for step in steps:
+            v, T, wT, wq = self._inputs()
+            once = T.copy(), wT.copy(), wq.copy()
+            for _ in range(3):
+                step(0.1, v, *once)
+            step(0.3, v, T, wT, wq, None, 3)
+            for got, want in zip((T, wT, wq), once):
+                assert_allclose(got, want, atol=1e-12)
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_c_extension_rejects_mismatched_arrays(self):
+        v, T, wT, wq = self._inputs()
+        with pytest.raises(ValueError, match="step_shapes"):
+            _step_shapes_c(0.1, v, T[:-1], wT, wq)
+        with pytest.raises(ValueError, match="C-contiguous"):
+            _step_shapes_c(0.1, v, T.transpose(0, 2, 1), wT, wq)
+        with pytest.raises(IndexError, match="out of range"):
+            _step_shapes_c(0.1, v, T, wT, wq, np.array([len(v)], dtype=np.intp))
+
+
+# ---------------------------------------------------------------------------
+# step_joints tests
+# ---------------------------------------------------------------------------
+
+
+class TestStepJoints:
+    def _inputs(self):
+        # Two robots end to end: 3 limited joints, then 2 unlimited ones
+        q = np.array([0.0, 0.9, -0.9, 5.0, -5.0])
+        qd = np.array([1.0, 5.0, -5.0, 10.0, -10.0])
+        lo = np.array([-1.0, -1.0, -1.0, -np.inf, -np.inf])
+        hi = np.array([1.0, 1.0, 1.0, np.inf, np.inf])
+        return q, qd, lo, hi
+
+    def test_matches_step_v_per_robot(self):
+        q, qd, lo, hi = self._inputs()
+        first, second = q[:3].copy(), q[3:].copy()
+        _step_v_py(3, 1, 0.1, first, qd[:3], np.stack([lo[:3], hi[:3]]))
+        _step_v_py(2, 0, 0.1, second, qd[3:], np.zeros((2, 2)))
+        _step_joints_py(0.1, q, qd, lo, hi)
+        assert_allclose(q, np.concatenate([first, second]))
+
+    def test_nan_limit_never_clamps(self):
+        q, qd = np.array([0.9]), np.array([5.0])
+        nan = np.array([np.nan])
+        steps = [_step_joints_py] + ([_step_joints_c] if HAS_EXT else [])
+        for step in steps:
+            out = q.copy()
+            step(0.1, out, qd, nan, nan)
+            assert out[0] == pytest.approx(1.4)
+
+    def test_idx_steps_only_those_joints(self):
+        idx = np.array([1, 3], dtype=np.intp)
+        steps = [_step_joints_py] + ([_step_joints_c] if HAS_EXT else [])
+        for step in steps:
+            q, qd, lo, hi = self._inputs()
+            step(0.1, q, qd, lo, hi, idx)
+            assert_allclose(q, [0.0, 1.0, -0.9, 6.0, -5.0])
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_matches_c_extension(self):
+        q_py, qd, lo, hi = self._inputs()
+        q_c = q_py.copy()
+        for _ in range(5):
+            _step_joints_py(0.05, q_py, qd, lo, hi)
+            _step_joints_c(0.05, q_c, qd, lo, hi)
+        assert_allclose(q_c, q_py)
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_c_extension_rejects_mismatched_arrays(self):
+        q, qd, lo, hi = self._inputs()
+        with pytest.raises(ValueError, match="step_joints"):
+            _step_joints_c(0.1, q, qd[:-1], lo, hi)
+        with pytest.raises(ValueError, match="C-contiguous"):
+            _step_joints_c(0.1, q, qd, lo, hi.astype(np.float32))
+        with pytest.raises(IndexError, match="out of range"):
+            _step_joints_c(0.1, q, qd, lo, hi, np.array([len(q)], dtype=np.intp))
+
+
+# ---------------------------------------------------------------------------
+# step_joints_a tests
+# ---------------------------------------------------------------------------
+
+
+class TestStepJointsA:
+    def _inputs(self):
+        q = np.array([0.0, 0.9, 0.0, 0.0])
+        qd = np.array([0.0, 1.0, 1.9, 0.0])
+        qdd = np.array([1.0, 0.0, 5.0, -4.0])
+        lo = np.array([-1.0, -1.0, -np.inf, -np.inf])
+        hi = np.array([1.0, 1.0, np.inf, np.inf])
+        qdlim = np.array([np.inf, np.inf, 2.0, np.inf])
+        return q, qd, qdd, lo, hi, qdlim
+
+    def _steps(self):
+        return [_step_joints_a_py] + ([_step_joints_a_c] if HAS_EXT else [])
+
+    def test_integrates_acceleration_then_velocity(self):
+        for step in self._steps():
+            q, qd, qdd, lo, hi, qdlim = self._inputs()
+            step(0.5, q, qd, qdd, lo, hi, qdlim)
+            assert_allclose(qd[[0, 3]], [0.5, -2.0])
+            assert_allclose(q[[0, 3]], [0.25, -1.0])
+
+    def test_clamps_velocity_to_qdlim(self):
+        for step in self._steps():
+            q, qd, qdd, lo, hi, qdlim = self._inputs()
+            step(0.5, q, qd, qdd, lo, hi, qdlim)
+            assert qd[2] == 2.0
+            assert q[2] == pytest.approx(1.0)
+
+    def test_position_limit_stops_the_joint(self):
+        for step in self._steps():
+            q, qd, qdd, lo, hi, qdlim = self._inputs()
+            step(0.5, q, qd, qdd, lo, hi, qdlim)
+            assert q[1] == 1.0
+            assert qd[1] == 0.0
+
+    def test_idx_steps_only_those_joints(self):
+        idx = np.array([0, 2], dtype=np.intp)
+        for step in self._steps():
+            q, qd, qdd, lo, hi, qdlim = self._inputs()
+            step(0.5, q, qd, qdd, lo, hi, qdlim, idx)
+            assert_allclose(q, [0.25, 0.9, 1.0, 0.0])
+            assert_allclose(qd, [0.5, 1.0, 2.0, 0.0])
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_matches_c_extension(self):
+        py, c = self._inputs(), self._inputs()
+        for _ in range(10):
+            _step_joints_a_py(0.05, *py)
+            _step_joints_a_c(0.05, *c)
+        for got, want in zip(c, py):
+            assert_allclose(got, want)
+
+    def test_substeps_match_that_many_shorter_steps(self):
+        for step in self._steps():
+            once, split = self._inputs(), self._inputs()
+            for _ in range(4):
+                step(0.125, *once)
+            step(0.5, *split, None, 4)
+            for got, want in zip(split, once):
+                assert_allclose(got, want)
+
+    def test_rejects_fewer_than_one_substep(self):
+        for step in self._steps():
+            with pytest.raises(ValueError, match="substeps"):
+                step(0.5, *self._inputs(), None, 0)
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_c_extension_rejects_mismatched_arrays(self):
+        q, qd, qdd, lo, hi, qdlim = self._inputs()
+        with pytest.raises(ValueError, match="step_joints_a"):
+            _step_joints_a_c(0.1, q, qd, qdd[:-1], lo, hi, qdlim)
+        with pytest.raises(ValueError, match="C-contiguous"):
+            _step_joints_a_c(0.1, q, qd[::-1], qdd, lo, hi, qdlim)
+
+
+# ---------------------------------------------------------------------------
+# poses_to_rows tests
+# ---------------------------------------------------------------------------
+
+
+class TestPosesToRows:
+    def _poses(self, n=20):
+        # _stacked_poses() is column-major -- these are the usual way round
+        return np.ascontiguousarray(_stacked_poses(n).transpose(0, 2, 1))
+
+    def _converters(self):
+        return [_poses_to_rows_py] + ([_poses_to_rows_c] if HAS_EXT else [])
+
+    def test_rows_are_translation_and_xyzw_quaternion(self):
+        T = self._poses()
+        for convert in self._converters():
+            rows = np.empty((len(T), 7))
+            convert(T, rows)
+            assert_allclose(rows[:, :3], T[:, :3, 3])
+            for row, pose in zip(rows, T):
+                _assert_same_rotation(row[3:], smb.r2q(pose[:3, :3], order="xyzs"))
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_matches_c_extension(self):
+        T = self._poses()
+        rows_py, rows_c = np.empty((len(T), 7)), np.empty((len(T), 7))
+        _poses_to_rows_py(T, rows_py)
+        _poses_to_rows_c(T, rows_c)
+        assert_allclose(rows_c, rows_py, atol=1e-12)
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_c_extension_rejects_mismatched_arrays(self):
+        T = self._poses()
+        with pytest.raises(ValueError, match="poses_to_rows"):
+            _poses_to_rows_c(T[:-1], np.empty((len(T), 7)))
+        with pytest.raises(ValueError, match="C-contiguous"):
+            _poses_to_rows_c(T.transpose(0, 2, 1), np.empty((len(T), 7)))
+
+
+# ---------------------------------------------------------------------------
+# chain_fk tests
+# ---------------------------------------------------------------------------
+
+
+class TestChainFk:
+    # A revolute z joint, a prismatic x joint on a branch off the first
+    # link, and a fixed link after the revolute one; one part per link
+    # plus a second, offset part on the last
+    pre = np.array(
+        [
+            smb.transl(0, 0, 0.3),
+            smb.transl(0.5, 0, 0) @ smb.trotx(0.2),
+            smb.transl(0, 0.1, 0),
+        ]
+    )
+    links = np.array([[-1, 0, 0], [0, 1, 1], [0, -1, 0]], dtype=np.intp)
+    axes = np.array([[0.0, 0, 1], [1, 0, 0], [0, 0, 0]])
+    part_links = np.array([0, 1, 2, 2], dtype=np.intp)
+    offsets = np.array([np.eye(4), np.eye(4), np.eye(4), smb.transl(0, 0, 1)])
+
+    def _fk(self, fk, Q, bases):
+        out = np.empty((len(Q), len(self.part_links), 4, 4))
+        fk(
+            self.pre,
+            self.links,
+            self.axes,
+            self.part_links,
+            self.offsets,
+            Q,
+            bases,
+            out,
+        )
+        return out
+
+    def _kernels(self):
+        return [_chain_fk_py] + ([_chain_fk_c] if HAS_EXT else [])
+
+    def test_links_compose_fixed_transform_then_joint(self):
+        Q = np.array([[np.pi / 2, 0.25], [0.3, -1.0]])
+        bases = np.array([np.eye(4), smb.transl(1, 2, 3)])
+        for fk in self._kernels():
+            out = self._fk(fk, Q, bases)
+            for base, q, poses in zip(bases, Q, out):
+                w0 = base @ self.pre[0] @ smb.trotz(q[0])
+                w1 = w0 @ self.pre[1] @ smb.transl(q[1], 0, 0)
+                w2 = w0 @ self.pre[2]
+                assert_allclose(poses, [w0, w1, w2, w2 @ self.offsets[3]], atol=1e-12)
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_matches_c_extension(self):
+        rng = np.random.default_rng(0)
+        Q = rng.uniform(-3, 3, (50, 2))
+        bases = np.array(
+            [smb.transl(*t) @ smb.rpy2tr(*r) for t, r in rng.uniform(-1, 1, (50, 2, 3))]
+        )
+        assert_allclose(
+            self._fk(_chain_fk_c, Q, bases),
+            self._fk(_chain_fk_py, Q, bases),
+            atol=1e-12,
+        )
+
+    @pytest.mark.skipif(not HAS_EXT, reason="C extension not available")
+    def test_c_extension_rejects_mismatched_arrays(self):
+        Q, bases = np.zeros((1, 2)), np.eye(4)[None]
+        out = np.empty((1, 4, 4, 4))
+        with pytest.raises(ValueError, match="chain_fk expects pre"):
+            _chain_fk_c(
+                self.pre,
+                self.links,
+                self.axes,
+                self.part_links,
+                self.offsets,
+                Q,
+                bases,
+                out[:, :3],
+            )
+        with pytest.raises(ValueError, match="intp"):
+            _chain_fk_c(
+                self.pre,
+                self.links.astype(float),
+                self.axes,
+                self.part_links,
+                self.offsets,
+                Q,
+                bases,
+                out,
+            )
+        with pytest.raises(ValueError, match="out of range"):
+            _chain_fk_c(
+                self.pre,
+                self.links,
+                self.axes,
+                self.part_links,
+                self.offsets,
+                Q[:, :1],
+                bases,
+                out,
+            )
+        with pytest.raises(ValueError, match="out of range"):
+            _chain_fk_c(
+                self.pre,
+                self.links,
+                self.axes,
+                self.part_links + 1,
+                self.offsets,
+                Q,
+                bases,
+                out,
+            )
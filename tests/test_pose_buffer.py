@@ -0,0 +1,89 @@
+"""
+Tests for PoseBuffer -- the double buffer step() publishes pose snapshots
+into for launch(render_thread=True)'s render thread -- and for how that
+thread cuts each snapshot down to the parts that moved.
+"""
+
+import numpy as np
+from numpy.testing import assert_allclose
+
+from swift import PoseBuffer, Swift
+
+
+def test_take_returns_the_latest_snapshot_once():
+    buffer = PoseBuffer()
+    assert buffer.take() is None
+
+    buffer.publish(0.1, [(0, 0, 1)], np.zeros((1, 7)))
+    snapshot = buffer.take()
+    assert snapshot.t == 0.1 and snapshot.runs == [(0, 0, 1)]
+    assert buffer.take() is None
+
+
+def test_publishing_over_an_untaken_snapshot_drops_it():
+    buffer = PoseBuffer()
+    for t in (0.1, 0.2, 0.3):
+        buffer.publish(t, [], np.empty((0, 7)))
+
+    assert buffer.take().t == 0.3
+    assert buffer.dropped == 2
+
+    # The front snapshot stays the reader's while the next is published
+    buffer.publish(0.4, [(0, 0, 1)], _rows(4))
+    front = buffer.take()
+    buffer.publish(0.5, [(0, 0, 1)], _rows(5))
+    assert front.t == 0.4 and front.runs == [(0, 0, 1)]
+    assert_allclose(front.poses[:, 0], [4])
+    assert buffer.dropped == 2
+    assert buffer.take().t == 0.5
+    assert front.t == 0.4
+    assert_allclose(front.poses[:, 0], [4])
+
+
+def test_clear_forgets_an_untaken_snapshot():
+    buffer = PoseBuffer()
+    buffer.publish(0.1, [], np.empty((0, 7)))
+    buffer.clear()
+    assert buffer.take() is None
+
+
+def _rows(*xs):
+    rows = np.zeros((len(xs), 7))
+    rows[:, 0] = xs
+    rows[:, 6] = 1
+    return rows
+
+
+def test_changed_poses_keeps_only_moved_parts():
+    env = Swift()
+    env._pose_tolerance = 0.01
+    runs = [(0, 0, 1), (1, 0, 3)]
+
+    assert env._changed_poses(runs, _rows(0, 0, 0, 0))[0] == runs
+    assert env._changed_poses(runs, _rows(0, 0, 0, 0))[0] == []
+
+    # Drift is measured from the pose last sent, so it accumulates
+    changed, poses = env._changed_poses(runs, _rows(0.005, 0, 0.5, 0))
+    assert changed == [(1, 1, 1)]
+    assert_allclose(poses[:, 0], [0.5])
+    changed, poses = env._changed_poses(runs, _rows(0.011, 0, 0.5, 0.5))
+    assert changed == [(0, 0, 1), (1, 2, 1)]
+    assert_allclose(poses[:, 0], [0.011, 0.5])
+
+    # A new object changes the layout -- everything is resent
+    runs = runs + [(2, 0, 1)]
+    assert env._changed_poses(runs, _rows(0.011, 0, 0.5, 0.5, 0))[0] == runs
+
+
+def test_changed_poses_skips_runs_with_no_parts():
+    # An empty instance group is a run of count 0 -- in the middle or last
+    env = Swift()
+    env._pose_tolerance = 0.01
+    runs = [(0, 0, 1), (1, 0, 0), (2, 0, 2), (3, 0, 0)]
+    env._changed_poses(runs, _rows(0, 0, 0))
+
+    changed, poses = env._changed_poses(runs, _rows(0, 0.5, 0))
+    assert changed == [(2, 0, 1)]
+    assert_allclose(poses[:, 0], [0.5])
+    changed, _ = env._changed_poses(runs, _rows(0.5, 0.5, 0.5))
+    assert changed == [(0, 0, 1), (2, 1, 1)]
@@ -13,6 +13,7 @@ frontend has no way to detect on its own.
 import importlib
 import json
 import threading
+import time
 from queue import Empty, Queue
 
 import numpy as np
@@ -21,7 +22,7 @@ import roboticstoolbox as rtb
 import spatialgeometry as sg
 import spatialmath as sm
 
-from swift import Swift
+from swift import LoopChannel, Swift
 
 # swift/__init__.py's `from swift.Swift import Swift` rebinds the `Swift`
 # package's `Swift` attribute from the submodule to the class, shadowing it
@@ -33,7 +34,14 @@ swift_module = importlib.import_module("swift.Swift")
 class FakeBrowser:
     """
     Drains Swift's outq like a real browser would, recording every message
-    and replying with a scripted response (or "0" if none was queued).
+    and replying with a scripted response (or "0" if none was queued) --
+    the JSON text main.js would send, tagged with the request's id.
+
+    A "shape"/"shapes"/"instances" message takes two scripted responses: the reply
+    (the first new id), then the load outcome main.js pushes as "mounted"
+    events -- ``[1, None]`` for loaded, ``[code, reason]`` for a failure,
+    or for "shapes" ``[code, reason, id]`` naming the one object that
+    failed (every other one mounts).
     """
 
     def __init__(self, env, responses=None):
@@ -47,16 +55,37 @@ class FakeBrowser:
     def _run(self):
         while not self._stop:
             try:
-                expected, (code, data) = self.env.outq.get(timeout=1)
+                rid, (code, data) = self.env.outq.get(timeout=1)
             except Exception:
                 continue
             self.received.append((code, data))
-            if expected:
+            if isinstance(data, bytes):
+                # A binary frame carries its request id in its header.
+                rid = (
+                    int(np.frombuffer(data, dtype="<u4", count=3)[2])
+                    if data[0] == 1
+                    else None
+                )
+            if rid is not None:
                 reply = self.responses.pop(0) if self.responses else "0"
-                self.env.inq.put(reply)
+                self.env._replies.resolve(f"[{rid}, {reply}]")
+            if code in ("shape", "shapes", "instances"):
+                self._push_mounted(int(reply), len(data) if code == "shapes" else 1)
             if code == "close":
                 break
 
+    def _push_mounted(self, first, count):
+        outcome = json.loads(self.responses.pop(0)) if self.responses else [1, None]
+        status, detail, *failed = outcome
+        failed_id = failed[0] if failed else first
+        for id in range(first, first + count):
+            if status == 1 or id != failed_id:
+                self.env._mounts.resolve({"event": "mounted", "id": id, "status": 1})
+            else:
+                self.env._mounts.resolve(
+                    {"event": "mounted", "id": id, "status": status, "detail": detail}
+                )
+
     def stop(self):
         self._stop = True
 
@@ -78,7 +107,7 @@ def test_add_shape_sends_a_one_element_part_list():
 
     assert box_id == 0
     codes = [c for c, _ in browser.received]
-    assert codes == ["shape", "shape_mounted"]
+    assert codes == ["shape"]
 
     _, shape_data = browser.received[0]
     assert isinstance(shape_data, list)
@@ -86,9 +115,24 @@ def test_add_shape_sends_a_one_element_part_list():
     assert shape_data[0]["stype"] == "cuboid"
     assert "scale" in shape_data[0]
     assert "color" in shape_data[0] and "opacity" in shape_data[0]
+    browser.stop()
+
 
-    _, mounted_data = browser.received[1]
-    assert mounted_data == [box_id, 1]
+def test_add_instances_sends_the_model_once_with_every_copys_pose():
+    env = make_env()
+    browser = FakeBrowser(env, responses=["0", json.dumps([1, None])])
+
+    marker = sg.Sphere(0.05, pose=sm.SE3(0, 0, 0.1))
+    handle = env.add_instances(marker, [sm.SE3(i, 0, 0).A for i in range(3)])
+
+    assert handle.id == 0
+    code, data = browser.received[0]
+    assert code == "instances"
+    assert data["count"] == 3
+    assert [part["stype"] for part in data["parts"]] == ["sphere"]
+    np.testing.assert_allclose(
+        np.array(data["poses"])[:, :3], [[0, 0, 0.1], [1, 0, 0.1], [2, 0, 0.1]]
+    )
     browser.stop()
 
 
@@ -145,6 +189,81 @@ def test_add_shape_raises_with_the_specific_reason_for_an_unsupported_shape_type
     browser.stop()
 
 
+def test_add_shapes_sends_every_part_list_in_one_message():
+    env = make_env()
+    browser = FakeBrowser(env, responses=["0", json.dumps([1, None, None])])
+
+    boxes = [sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3(i, 0, 0)) for i in range(5)]
+    ids = env.add_shapes(boxes, names=["first", None, None, None, "last"])
+
+    assert ids == [0, 1, 2, 3, 4]
+    assert [c for c, _ in browser.received] == ["shapes"]
+    _, shapes_data = browser.received[0]
+    assert len(shapes_data) == 5
+    assert all(
+        len(parts) == 1 and parts[0]["stype"] == "cuboid" for parts in shapes_data
+    )
+    assert all(env.swift_objects[i] is box for i, box in zip(ids, boxes))
+    assert env.swift_names == {0: "first", 4: "last"}
+    browser.stop()
+
+
+def test_add_shapes_reports_which_object_failed_to_load():
+    env = make_env()
+    browser = FakeBrowser(
+        env, responses=["0", json.dumps([-2, "failed to load STL file", 2])]
+    )
+
+    boxes = [sg.Cuboid([0.1, 0.1, 0.1]) for _ in range(3)]
+    with pytest.raises(RuntimeError, match="object 2: failed to load STL file"):
+        env.add_shapes(boxes)
+    browser.stop()
+
+
+def test_add_shapes_headless_assigns_consecutive_ids():
+    env = Swift()
+    env.launch(headless=True)
+    env.add(sg.Sphere(0.1))
+
+    assert env.add_shapes([sg.Sphere(0.1) for _ in range(3)]) == [1, 2, 3]
+    assert env.add_shapes([]) == []
+
+
+def test_add_shape_without_waiting_returns_before_the_mount_event():
+    env = make_env()
+    # No scripted outcome: hold the "mounted" push back until we send it.
+    browser = FakeBrowser(env, responses=["0"])
+    browser._push_mounted = lambda first, count: None
+
+    box_id = env.add_shape(sg.Cuboid([0.1, 0.1, 0.1]), wait=False)
+    mounted = env.mounted(box_id)
+
+    assert env.swift_objects[box_id] is not None
+    assert not mounted.done()
+    env._mounts.resolve({"event": "mounted", "id": box_id, "status": 1})
+    assert mounted.result(timeout=1) == box_id
+    browser.stop()
+
+
+def test_mount_tracker_keeps_events_that_arrive_before_anyone_asks():
+    from swift import MountTracker
+
+    mounts = MountTracker()
+    mounts.resolve({"event": "mounted", "id": 3, "status": 1})
+    mounts.resolve(
+        {
+            "event": "mounted",
+            "id": 4,
+            "status": -1,
+            "detail": "unsupported shape type 'x'",
+        }
+    )
+
+    assert mounts.future(3).result(timeout=0) == 3
+    with pytest.raises(RuntimeError, match="object 4: unsupported shape type 'x'"):
+        mounts.future(4).result(timeout=0)
+
+
 def test_send_socket_raises_timeout_instead_of_hanging_forever(monkeypatch):
     # Regression test for bugs.md Bug 1: a browser tab that goes away
     # (closed, crashed, dropped into another window/profile mid-drag)
@@ -157,6 +276,77 @@ def test_send_socket_raises_timeout_instead_of_hanging_forever(monkeypatch):
         env._send_socket("shape", ["dummy"])
 
 
+def test_replies_are_matched_to_requests_by_id_not_arrival_order():
+    env = make_env()
+    results = {}
+
+    def ask(name):
+        results[name] = env._send_socket("shape_mounted", [name, 1])
+
+    threads = [threading.Thread(target=ask, args=(n,)) for n in (0, 1)]
+    for t in threads:
+        t.start()
+    sent = [env.outq.get(timeout=5) for _ in threads]
+
+    # Answer in the opposite order to the one the requests went out in.
+    for rid, (_, (name, _)) in reversed(sent):
+        assert env._replies.resolve(json.dumps([rid, f"reply to {name}"]))
+    for t in threads:
+        t.join(timeout=5)
+
+    assert results == {0: "reply to 0", 1: "reply to 1"}
+    assert len(env._replies) == 0
+
+
+def test_reply_to_an_abandoned_request_is_dropped(monkeypatch):
+    monkeypatch.setattr(swift_module, "_REPLY_TIMEOUT", 0.05)
+    env = make_env()
+    with pytest.raises(TimeoutError):
+        env._send_socket("shape", ["dummy"])
+    rid, _ = env.outq.get(timeout=1)
+
+    assert len(env._replies) == 0
+    assert not env._replies.resolve(json.dumps([rid, 0]))
+
+
+def test_concurrent_adds_agree_with_the_browser_on_object_ids():
+    # Two threads adding at once: the browser numbers objects in arrival
+    # order, so Python must hand out ids in the order it queues "shape".
+    env = make_env()
+    stop = threading.Event()
+
+    def browser():
+        created = 0
+        while not stop.is_set():
+            try:
+                rid, (code, _) = env.outq.get(timeout=0.1)
+            except Empty:
+                continue
+            if code == "shape":
+                env._replies.resolve(json.dumps([rid, created]))
+                env._mounts.resolve({"event": "mounted", "id": created, "status": 1})
+                created += 1
+
+    threading.Thread(target=browser, daemon=True).start()
+
+    added = []
+
+    def add_many():
+        for _ in range(10):
+            box = sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3())
+            added.append((env.add(box), box))
+
+    threads = [threading.Thread(target=add_many) for _ in range(2)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join(timeout=10)
+    stop.set()
+
+    assert sorted(i for i, _ in added) == list(range(20))
+    assert all(env.swift_objects[i] is box for i, box in added)
+
+
 @pytest.mark.rtb
 def test_add_robot_sends_flat_list_of_all_link_parts():
     env = make_env()
@@ -169,15 +359,13 @@ def test_add_robot_sends_flat_list_of_all_link_parts():
     robot_id = env.add(panda)
 
     codes = [c for c, _ in browser.received]
-    assert codes == ["shape", "shape_mounted"]
+    assert codes == ["shape"]
 
     _, shape_data = browser.received[0]
     assert isinstance(shape_data, list)
     assert len(shape_data) == n_parts
 
     assert robot_id.id == 0
-    _, mounted_data = browser.received[1]
-    assert mounted_data == [0, n_parts]
     browser.stop()
 
 
@@ -198,6 +386,578 @@ def test_draw_all_batches_poses_by_object_index_and_returns_element_events():
     browser.stop()
 
 
+def _unpack_pose_frame(frame):
+    # Mirrors frames.js's decodeFrame() -- see Swift.py's _pack_pose_frame().
+    kind, n_runs, _tag = np.frombuffer(frame, dtype="<u4", count=3)
+    runs = np.frombuffer(frame, dtype="<u4", count=3 * n_runs, offset=12).reshape(-1, 3)
+    poses = np.frombuffer(frame, dtype="<f4", offset=12 + 12 * n_runs).reshape(-1, 7)
+    return int(kind), runs.tolist(), poses
+
+
+def test_draw_all_binary_poses_packs_runs_and_a_float_buffer():
+    env = make_env()
+    env._binary_poses = True
+    browser = FakeBrowser(
+        env, responses=["0", json.dumps([1, None]), "1", json.dumps([1, None])]
+    )
+
+    env.add(sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3(1.0, 2.0, 3.0)))
+    parts = [sg.Sphere(0.1), sg.Sphere(0.1)]
+    env.add_assembly(lambda q: [sm.SE3(0.5, 0, 0), sm.SE3.Rz(np.pi / 2)], parts)
+
+    browser.responses.append(json.dumps({"0": True}))
+    events = env._draw_all()
+
+    code, frame = browser.received[-1]
+    assert code == "shape_poses"
+    assert isinstance(frame, bytes)
+
+    kind, runs, poses = _unpack_pose_frame(frame)
+    assert kind == swift_module._FRAME_SHAPE_POSES
+    assert runs == [[0, 0, 1], [1, 0, 2]]
+    np.testing.assert_allclose(poses[0], [1, 2, 3, 0, 0, 0, 1], atol=1e-6)
+    np.testing.assert_allclose(poses[1], [0.5, 0, 0, 0, 0, 0, 1], atol=1e-6)
+    s = np.sqrt(0.5)
+    np.testing.assert_allclose(poses[2], [0, 0, 0, 0, 0, s, s], atol=1e-6)
+    assert events == {"0": True}
+    browser.stop()
+
+
+def test_draw_all_only_resends_parts_that_moved():
+    env = make_env()
+    browser = FakeBrowser(
+        env, responses=["0", json.dumps([1, None]), "1", json.dumps([1, None])]
+    )
+
+    box = sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3())
+    env.add(box)
+    offsets = [0.0, 0.0, 0.0]
+    parts = [sg.Sphere(0.1) for _ in offsets]
+    handle = env.add_assembly(lambda q: [sm.SE3(x, 0, 0) for x in offsets], parts)
+
+    env._draw_all()
+    first = browser.received[-1][1]
+    assert [entry[0] for entry in first] == [0, 1]
+
+    # Nothing moved -- an empty frame, still sent for its event reply.
+    env._draw_all()
+    assert browser.received[-1] == ("shape_poses", [])
+
+    # Only the assembly's last part moved -- one run, starting at part 2.
+    # (fk reads offsets rather than q, so its cached poses need dropping.)
+    offsets[2] = 0.5
+    handle.invalidate()
+    env._draw_all()
+    assert browser.received[-1][1] == [
+        [1, [{"t": [0.5, 0.0, 0.0], "q": [0.0, 0.0, 0.0, 1.0]}], 2]
+    ]
+
+    box.T = sm.SE3(0, 0, 1)
+    box.update()
+    env._draw_all()
+    assert browser.received[-1][1] == [[0, [box.fk_dict()]]]
+    browser.stop()
+
+
+def test_draw_all_pose_tolerance_accumulates_small_moves():
+    # Compared against the pose last *sent*, not last frame's -- a part
+    # creeping by less than the tolerance each frame still gets resent
+    # once its total drift exceeds it.
+    env = make_env()
+    env._pose_tolerance = 0.01
+    browser = FakeBrowser(env, responses=["0", json.dumps([1, None])])
+
+    box = sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3())
+    env.add(box)
+    env._draw_all()
+
+    sent = []
+    for x in (0.004, 0.008, 0.012):
+        box.T = sm.SE3(x, 0, 0)
+        box.update()
+        env._draw_all()
+        sent.append(browser.received[-1][1])
+
+    assert sent[0] == [] and sent[1] == []
+    assert sent[2] == [[0, [box.fk_dict()]]]
+    browser.stop()
+
+
+def test_draw_all_without_pose_tolerance_resends_everything():
+    env = make_env()
+    env._pose_tolerance = None
+    browser = FakeBrowser(env, responses=["0", json.dumps([1, None])])
+
+    box = sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3())
+    env.add(box)
+    env._draw_all()
+    env._draw_all()
+
+    assert browser.received[-1][1] == [[0, [box.fk_dict()]]]
+    browser.stop()
+
+
+def _streaming_env(max_inflight):
+    env = make_env()
+    env._max_inflight = max_inflight
+    env._period = 0  # render every step
+    return env
+
+
+def test_streamed_frames_are_fire_and_forget_up_to_max_inflight():
+    env = _streaming_env(2)
+    browser = FakeBrowser(env)
+
+    for _ in range(3):
+        env.step(0.05)
+    _wait_for_received(browser, 5)
+
+    # The third frame would have made three in flight -- dropped, not
+    # queued. Nothing ever waited on a reply (FakeBrowser sent none).
+    codes = [c for c, _ in browser.received]
+    assert codes == ["shape_frame", "sim_time", "shape_frame", "sim_time", "sim_time"]
+    assert [d["seq"] for c, d in browser.received if c == "shape_frame"] == [1, 2]
+
+    env.evq.put(json.dumps({"event": "frame", "seq": 2, "changes": {}}))
+    env.step(0.05)
+    _wait_for_received(browser, 7)
+    assert browser.received[-2][0] == "shape_frame"
+    assert browser.received[-2][1]["seq"] == 3
+    browser.stop()
+
+
+def test_streamed_frame_acks_apply_ui_events_at_the_next_step():
+    from swift import Button
+
+    env = _streaming_env(4)
+    browser = FakeBrowser(env)
+    clicks = []
+    env.add_ui(Button(lambda _: clicks.append(env.sim_time)))
+
+    env.step(0.05)
+    env.evq.put(json.dumps({"event": "frame", "seq": 1, "changes": {"0": True}}))
+    assert clicks == []
+
+    env.step(0.05)
+    assert clicks == [pytest.approx(0.1)]
+    assert env._frame_acked == 1
+    browser.stop()
+
+
+def test_streamed_binary_frame_carries_its_sequence_number():
+    env = _streaming_env(1)
+    env._binary_poses = True
+    browser = FakeBrowser(env, responses=["0", json.dumps([1, None])])
+    env.add(sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3(1.0, 0, 0)))
+
+    env.step(0.05)
+    _wait_for_received(browser, 2)
+
+    code, frame = browser.received[1]
+    assert code == "shape_frame"
+    kind, n_runs, seq = np.frombuffer(frame, dtype="<u4", count=3)
+    assert (kind, n_runs, seq) == (swift_module._FRAME_SHAPE_FRAME, 1, 1)
+    browser.stop()
+
+
+def _threaded_env(rate):
+    env = make_env()
+    env._render_threaded = True
+    env.rate = rate
+    env._start_render_thread()
+    return env
+
+
+def _step_next_frame(env, dt):
+    # As if a whole frame period had passed since the last snapshot
+    env._laststep = 0
+    env.step(dt)
+
+
+def test_render_thread_draws_only_the_latest_snapshot():
+    # A rate so low the thread never ticks by itself -- tick it by hand
+    env = _threaded_env(1e-3)
+    browser = FakeBrowser(env, responses=["0", json.dumps([1, None])])
+    box = sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3())
+    box.v = [1.0, 0, 0, 0, 0, 0]
+    env.add_shape(box)
+
+    # step() never touches the socket -- it only publishes
+    for _ in range(3):
+        _step_next_frame(env, 0.1)
+    assert len(browser.received) == 1
+    assert env._snapshots.dropped == 2
+
+    browser.responses.append("{}")
+    env._render_tick()
+    _wait_for_received(browser, 3)
+    assert [c for c, _ in browser.received[1:]] == ["shape_poses", "sim_time"]
+    np.testing.assert_allclose(browser.received[1][1][0][1][0]["t"], [0.3, 0, 0])
+    assert browser.received[2][1] == pytest.approx(0.3)
+
+    # Nothing new published -- nothing drawn
+    env._render_tick()
+    assert len(browser.received) == 3
+    env._stop_render_thread()
+    browser.stop()
+
+
+def test_render_thread_snapshots_at_most_once_a_frame_period():
+    env = _threaded_env(1e-3)
+    browser = FakeBrowser(env, responses=["0", json.dumps([1, None])])
+    box = sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3())
+    box.v = [1.0, 0, 0, 0, 0, 0]
+    env.add_shape(box)
+
+    # Only the first step of the period is snapshotted
+    _step_next_frame(env, 0.1)
+    env.step(0.1)
+    env.step(0.1)
+    assert env._snapshots.dropped == 0
+    assert env._snapshots.take().t == pytest.approx(0.1)
+    assert env._snapshots.take() is None
+    env._stop_render_thread()
+    browser.stop()
+
+
+def test_render_thread_collects_shape_update_replies_for_step():
+    env = _threaded_env(1e-3)
+    browser = FakeBrowser(env, responses=["0", json.dumps([1, None])])
+    box = sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3())
+    env.add_shape(box)
+
+    # step() leaves the "shape_update" reply to the render thread
+    box.color = "red"
+    env.step(0.1)
+    assert env._render_replies.qsize() == 1
+    _wait_for_received(browser, 2)
+    assert browser.received[1][0] == "shape_update"
+
+    browser.responses.append("{}")
+    env._render_tick()
+    assert env._render_replies.empty()
+    env._stop_render_thread()
+    browser.stop()
+
+
+def test_render_thread_sends_moved_parts_past_an_empty_instance_group():
+    env = _threaded_env(1e-3)
+    browser = FakeBrowser(
+        env, responses=["0", json.dumps([1, None]), "1", json.dumps([1, None])]
+    )
+    box = sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3())
+    box.v = [1.0, 0, 0, 0, 0, 0]
+    env.add_shape(box)
+    # No copies at all -- a run of zero parts, last in the frame
+    handle = env.add_instances(sg.Sphere(0.1), np.empty((0, 4, 4)))
+    assert len(handle) == 0
+
+    for _ in range(2):
+        _step_next_frame(env, 0.1)
+        browser.responses.append("{}")
+        env._render_tick()
+    _wait_for_received(browser, 6)
+    assert [c for c, _ in browser.received[2:]] == [
+        "shape_poses",
+        "sim_time",
+        "shape_poses",
+        "sim_time",
+    ]
+    assert [entry[0] for entry in browser.received[4][1]] == [0]
+    np.testing.assert_allclose(browser.received[4][1][0][1][0]["t"], [0.2, 0, 0])
+    env._stop_render_thread()
+    browser.stop()
+
+
+def test_render_thread_queues_ui_events_for_the_next_step():
+    from swift import Button
+
+    env = _threaded_env(200)
+    browser = FakeBrowser(env, responses=["0", json.dumps({"0": True}), "{}"])
+    clicks = []
+    env.add_ui(Button(lambda _: clicks.append(threading.current_thread().name)))
+
+    _step_next_frame(env, 0.05)
+    deadline = time.time() + 1
+    while env._render_events.empty() and time.time() < deadline:
+        time.sleep(0.01)
+    # Drawn and replied to, but the callback waits for the stepping thread
+    assert clicks == []
+
+    env.step(0.05)
+    assert clicks == [threading.current_thread().name]
+
+    env._stop_render_thread()
+    assert env._render_thread is None
+    browser.stop()
+
+
+def test_launch_rejects_render_thread_with_max_inflight():
+    with pytest.raises(ValueError, match="render_thread"):
+        Swift().launch(headless=True, render_thread=True, max_inflight=2)
+
+
+def test_loop_channel_wakes_a_waiting_loop_from_another_thread():
+    import asyncio
+
+    channel = LoopChannel()
+    with pytest.raises(Empty):
+        channel.get_nowait()
+
+    async def main():
+        channel.bind(asyncio.get_running_loop())
+        ready = channel.ready()
+        assert not ready.done()
+        threading.Timer(0.05, channel.put, args=("a",)).start()
+        await asyncio.wait_for(ready, 5)
+        return channel.get_nowait()
+
+    assert asyncio.run(main()) == "a"
+
+    # The synchronous side still behaves like queue.Queue.
+    channel.put("b")
+    assert channel.get(timeout=1) == "b"
+    with pytest.raises(Empty):
+        channel.get(timeout=0.01)
+
+
+def test_swift_socket_routes_browser_events_away_from_replies():
+    import asyncio
+
+    import websockets
+
+    from swift.SwiftRoute import SwiftSocket
+
+    from swift import MountTracker
+
+    outq, inq, evq, mounts = LoopChannel(), Queue(), Queue(), MountTracker()
+    t = threading.Thread(
+        target=SwiftSocket,
+        args=(outq, inq, lambda: True, threading.Event(), evq, None, mounts),
+        daemon=True,
+    )
+    t.start()
+    port, instance = inq.get(timeout=5)
+
+    async def client():
+        async with websockets.connect(f"ws://localhost:{port}/") as ws:
+            await ws.send("Connected")
+            await ws.send(json.dumps({"event": "mounted", "id": 0, "status": 1}))
+            await ws.send(json.dumps({"event": "frame", "seq": 1, "changes": {}}))
+            await ws.send(json.dumps({"0": True}))
+            await asyncio.sleep(0.2)
+
+    asyncio.run(client())
+    instance.stop()
+    t.join(timeout=3)
+
+    assert inq.get(timeout=1) == "Connected"
+    assert inq.get(timeout=1) == '{"0": true}'
+    assert json.loads(evq.get(timeout=1))["seq"] == 1
+    assert evq.empty()
+    assert mounts.future(0).result(timeout=1) == 0
+
+
+def test_swift_socket_tags_requests_and_routes_replies_by_id():
+    import asyncio
+
+    import websockets
+
+    from swift import ReplyRouter
+    from swift.SwiftRoute import SwiftSocket
+
+    outq, inq, replies = LoopChannel(), Queue(), ReplyRouter()
+    t = threading.Thread(
+        target=SwiftSocket,
+        args=(outq, inq, lambda: True, threading.Event(), None, replies),
+        daemon=True,
+    )
+    t.start()
+    port, instance = inq.get(timeout=5)
+
+    rid, reply = replies.reserve()
+    outq.put([rid, ["shape", []]])
+    received = []
+
+    async def client():
+        async with websockets.connect(f"ws://localhost:{port}/") as ws:
+            await ws.send("Connected")
+            received.append(json.loads(await asyncio.wait_for(ws.recv(), 5)))
+            await ws.send(json.dumps([rid, 3]))
+            await asyncio.sleep(0.2)
+
+    asyncio.run(client())
+    instance.stop()
+    t.join(timeout=3)
+
+    assert received == [["shape", [], rid]]
+    assert reply.result(timeout=1) == 3
+    assert inq.get(timeout=1) == "Connected"
+    assert inq.empty()
+
+
+def test_swift_socket_sends_bytes_payloads_as_binary_messages():
+    # A JSON-encoded bytes payload isn't even possible (json.dumps raises)
+    # -- a pre-packed frame has to go out as a binary websocket message.
+    import asyncio
+
+    import websockets
+
+    from swift.SwiftRoute import SwiftSocket
+
+    outq, inq = LoopChannel(), Queue()
+    t = threading.Thread(
+        target=SwiftSocket,
+        args=(outq, inq, lambda: True, threading.Event()),
+        daemon=True,
+    )
+    t.start()
+    port, instance = inq.get(timeout=5)
+
+    received = []
+
+    async def client():
+        async with websockets.connect(f"ws://localhost:{port}/") as ws:
+            await ws.send("Connected")
+            outq.put([False, ["shape_poses", b"\x01\x00\x00\x00\x00\x00\x00\x00"]])
+            received.append(await asyncio.wait_for(ws.recv(), 5))
+
+    asyncio.run(client())
+    instance.stop()
+    t.join(timeout=3)
+
+    assert received == [b"\x01\x00\x00\x00\x00\x00\x00\x00"]
+
+
+def test_swift_socket_coalesces_queued_messages_into_one_batch():
+    # Everything already queued when serve() wakes goes out as one
+    # ["batch", ...] envelope; a binary frame can't be nested in JSON, so
+    # it flushes the batch ahead of it and goes out on its own, in order.
+    import asyncio
+
+    import websockets
+
+    from swift.SwiftRoute import SwiftSocket
+
+    outq, inq = LoopChannel(), Queue()
+    t = threading.Thread(
+        target=SwiftSocket,
+        args=(outq, inq, lambda: True, threading.Event()),
+        daemon=True,
+    )
+    t.start()
+    port, instance = inq.get(timeout=5)
+
+    frame = b"\x01\x00\x00\x00\x00\x00\x00\x00"
+    outq.put([False, ["sim_time", "0.05"]])
+    outq.put([False, ["update_element", {"id": "a"}]])
+    outq.put([False, ["shape_poses", frame]])
+    outq.put([False, ["axes", True]])
+
+    received = []
+
+    async def client():
+        async with websockets.connect(f"ws://localhost:{port}/") as ws:
+            await ws.send("Connected")
+            for _ in range(3):
+                received.append(await asyncio.wait_for(ws.recv(), 5))
+
+    asyncio.run(client())
+    instance.stop()
+    t.join(timeout=3)
+
+    assert json.loads(received[0]) == [
+        "batch",
+        [["sim_time", "0.05"], ["update_element", {"id": "a"}]],
+    ]
+    assert received[1] == frame
+    assert json.loads(received[2]) == ["axes", True]
+
+
+def test_threshold_deflate_only_compresses_large_messages():
+    # Small messages go out with RSV1 clear (uncompressed) on a connection
+    # that negotiated permessage-deflate; skipping them must leave the
+    # compressor's shared window in step with the browser's inflater, so
+    # interleaved large messages still decode.
+    from websockets.extensions.permessage_deflate import PerMessageDeflate
+    from websockets.frames import Frame, Opcode
+
+    from swift.SwiftRoute import ThresholdDeflate
+
+    server = ThresholdDeflate(False, False, 12, 12, {"memLevel": 5}, threshold=1024)
+    browser = PerMessageDeflate(False, False, 12, 12)
+
+    small = json.dumps(["sim_time", 0.05]).encode()
+    large = json.dumps(["shape", [{"points": [[0.0, 0.0, 0.0]] * 500}]]).encode()
+    for data in [small, large, small, large]:
+        frame = server.encode(Frame(Opcode.TEXT, data))
+        if data is small:
+            assert not frame.rsv1 and frame.data == small
+        else:
+            assert frame.rsv1 and len(frame.data) < len(large) // 10
+        assert browser.decode(frame).data == data
+
+
+def test_swift_socket_negotiates_compression_unless_disabled():
+    import asyncio
+    import time
+
+    import websockets
+
+    from swift.SwiftRoute import SwiftSocket
+
+    large = {"points": [[0.0, 1.0, 2.0]] * 1000}
+    for threshold, negotiated in [(1024, ["permessage-deflate"]), (None, [])]:
+        outq, inq = LoopChannel(), Queue()
+        t = threading.Thread(
+            target=SwiftSocket,
+            args=(
+                outq,
+                inq,
+                lambda: True,
+                threading.Event(),
+                None,
+                None,
+                None,
+                threshold,
+            ),
+            daemon=True,
+        )
+        t.start()
+        port, instance = inq.get(timeout=5)
+
+        received = []
+
+        async def client():
+            async with websockets.connect(f"ws://localhost:{port}/") as ws:
+                await ws.send("Connected")
+                outq.put([None, ["sim_time", 0.05]])
+                received.append(await asyncio.wait_for(ws.recv(), 5))
+                outq.put([None, ["shape", large]])
+                received.append(await asyncio.wait_for(ws.recv(), 5))
+                return [ext.name for ext in ws.protocol.extensions]
+
+        assert asyncio.run(client()) == negotiated
+        # Let serve() see the close before its loop is stopped under it.
+        for _ in range(50):
+            if not instance.USERS:
+                break
+            time.sleep(0.05)
+        instance.stop()
+        t.join(timeout=3)
+
+        assert [json.loads(r) for r in received] == [
+            ["sim_time", 0.05],
+            ["shape", large],
+        ]
+
+
+def test_launch_rejects_a_negative_compression_threshold():
+    env = Swift()
+    with pytest.raises(ValueError, match="compression_threshold"):
+        env.launch(headless=True, compression_threshold=-1)
+
+
 def test_remove_sends_the_raw_object_index():
     env = make_env()
     browser = FakeBrowser(env, responses=["0", json.dumps([1, None]), "0"])
@@ -495,7 +1255,7 @@ def test_start_servers_socket_thread_actually_stops_on_close():
     # exercises the real SwiftSocket over a real socket instead.
     from swift.SwiftRoute import SwiftSocket
 
-    outq, inq = Queue(), Queue()
+    outq, inq = LoopChannel(), Queue()
     run_flag = [True]
     t = threading.Thread(
         target=SwiftSocket,
@@ -508,7 +1268,7 @@ def test_start_servers_socket_thread_actually_stops_on_close():
     assert isinstance(instance.USERS, set)  # what hold() polls
 
     # Mirrors what Swift.close() -> _stop_threads() actually does: queue a
-    # message (unblocks producer()'s blocking outq.get()), then stop().
+    # message (wakes serve()'s wait on outq.ready()), then stop().
     run_flag[0] = False
     outq.put([False, ["close", "0"]])
     instance.stop()
@@ -529,7 +1289,7 @@ def test_start_servers_http_thread_actually_stops_on_close():
     # running after the test function returns.
     from swift.SwiftRoute import SwiftServer
 
-    outq, inq = Queue(), Queue()
+    outq, inq = LoopChannel(), Queue()
     t = threading.Thread(
         target=SwiftServer, args=(outq, inq, 0, lambda: True), daemon=True
     )
@@ -560,7 +1320,7 @@ def test_swift_socket_notices_disconnect_even_while_idle():
 
     from swift.SwiftRoute import SwiftSocket
 
-    outq, inq = Queue(), Queue()
+    outq, inq = LoopChannel(), Queue()
     t = threading.Thread(
         target=SwiftSocket, args=(outq, inq, lambda: True, threading.Event()), daemon=True
     )
@@ -611,7 +1371,7 @@ def test_disconnect_while_waiting_for_a_reply_is_noticed_quickly():
 
     from swift.SwiftRoute import SwiftSocket
 
-    outq, inq = Queue(), Queue()
+    outq, inq = LoopChannel(), Queue()
     disconnected = threading.Event()
     t = threading.Thread(
         target=SwiftSocket, args=(outq, inq, lambda: True, disconnected), daemon=True
@@ -690,9 +1450,9 @@ def test_run_calls_step_and_stops_at_duration():
     steps = []
     orig_step = env.step
 
-    def counting_step(dt=0.05, render=True):
+    def counting_step(dt=0.05, render=True, substeps=1):
         steps.append(dt)
-        orig_step(dt, render=False)
+        orig_step(dt, render=False, substeps=substeps)
 
     env.step = counting_step
     env.run(duration=0.2, dt=0.05)
@@ -0,0 +1,253 @@
+"""
+Tests for ShapeStore -- the contiguous pose/twist arrays step() integrates
+every plain shape from in one phys.step_shapes() call -- and for how Swift
+moves shapes between it and the per-object step path.
+"""
+
+import importlib
+
+import numpy as np
+import pytest
+import spatialgeometry as sg
+import spatialmath as sm
+from numpy.testing import assert_allclose
+
+from swift import ShapeStore, Swift
+
+swift_module = importlib.import_module("swift.Swift")
+
+
+def make_env():
+    env = Swift()
+    env.launch(headless=True)
+    return env
+
+
+def moving_box(x=0.0, v=(1.0, 0, 0, 0, 0, 0)):
+    box = sg.Cuboid([0.1, 0.1, 0.1], pose=sm.SE3(x, 0, 0))
+    box.v = v
+    return box
+
+
+def test_stored_shapes_view_the_store_buffers():
+    store = ShapeStore(capacity=2)
+    boxes = [moving_box(x) for x in range(5)]
+    for id, box in enumerate(boxes):
+        store.add(box, id)
+
+    assert len(store) == 5 and store.capacity == 8
+    for i, box in enumerate(boxes):
+        assert np.shares_memory(box.v, store.v)
+        assert_allclose(store.T[i], box.T)
+
+    boxes[2].T = sm.SE3(3, 2, 1).A
+    assert_allclose(store.T[2][:3, 3], [3, 2, 1])
+    boxes[2].update()
+    assert_allclose(store.buffers()[2][2].T[:3, 3], [3, 2, 1])
+
+
+def test_remove_hands_the_shape_its_own_arrays_and_fills_the_gap():
+    store = ShapeStore()
+    boxes = [moving_box(x) for x in range(3)]
+    for id, box in enumerate(boxes):
+        store.add(box, id)
+
+    assert store.remove(boxes[0])
+    assert not store.remove(boxes[0])
+    assert store.ids == [2, 1]
+    assert not np.shares_memory(boxes[0].v, store.v)
+    assert_allclose(store.T[0][:3, 3], [2, 0, 0])
+    assert_allclose(boxes[0].T[:3, 3], [0, 0, 0])
+    boxes[0].T = sm.SE3(5, 0, 0).A
+    assert_allclose(store.T[:, 0, 3], [2, 1])
+
+
+def test_reassigned_v_is_copied_in_at_sync():
+    store = ShapeStore()
+    box = moving_box()
+    store.add(box, 0)
+
+    box.v = [0, 0, 2.0, 0, 0, 0]
+    store.sync_v()
+    assert_allclose(store.v[0], [0, 0, 2, 0, 0, 0])
+    box.v[0] = 3.0
+    assert store.v[0, 0] == 3.0
+
+
+def test_moving_follows_writes_to_v():
+    store = ShapeStore()
+    boxes = [moving_box(v=(0, 0, 0, 0, 0, 0)) for _ in range(3)]
+    for id, box in enumerate(boxes):
+        store.add(box, id)
+    assert store.moving().tolist() == []
+
+    boxes[2].v[5] = 1.0
+    boxes[0].v = [1.0, 0, 0, 0, 0, 0]
+    store.sync_v()
+    assert store.moving().tolist() == [0, 2]
+
+    boxes[2].v[:] = 0
+    assert store.moving().tolist() == [0]
+
+
+def test_frame_poses_returns_new_and_moved_shapes_by_id():
+    store = ShapeStore()
+    boxes = [moving_box(x) for x in range(3)]
+    for id, box in zip([7, 3, 5], boxes):
+        store.add(box, id)
+
+    ids, rows = store.frame_poses(0.0)
+    assert ids == [3, 5, 7]
+    assert_allclose(rows[:, 0], [1, 2, 0])
+    assert store.frame_poses(0.0)[0] == []
+
+    boxes[0].T = sm.SE3(0, 0, 1).A
+    ids, rows = store.frame_poses(0.0)
+    assert ids == [7]
+    assert_allclose(rows, [[0, 0, 1, 0, 0, 0, 1]])
+    assert store.frame_poses(None)[0] == [3, 5, 7]
+
+
+def test_only_scene_graph_roots_are_eligible():
+    parent, child = moving_box(), moving_box()
+    child.attach_to(parent)
+    assert not ShapeStore.eligible(parent)
+    assert not ShapeStore.eligible(child)
+    assert ShapeStore.eligible(moving_box())
+    with pytest.raises(ValueError, match="scene-graph"):
+        ShapeStore().add(child, 0)
+
+
+def test_step_integrates_stored_shapes_and_their_world_pose():
+    env = make_env()
+    boxes = [moving_box(x) for x in range(3)]
+    spinner = moving_box(v=(0, 0, 0, 0, 0, np.pi))
+    env.add_shapes(boxes + [spinner])
+    assert len(env._shape_store) == 4
+
+    env.step(0.5)
+    for x, box in enumerate(boxes):
+        assert_allclose(box.T[:3, 3], [x + 0.5, 0, 0])
+        assert_allclose(box._wT, box.T)
+    assert_allclose(spinner.T[:3, :3], sm.SE3.Rz(np.pi / 2).R, atol=1e-12)
+    assert_allclose(spinner._wq, [0, 0, np.sqrt(0.5), np.sqrt(0.5)])
+
+
+def test_static_shapes_are_left_out_of_the_step_and_the_frame(monkeypatch):
+    env = make_env()
+    env._pose_tolerance = 0.0
+    mover = moving_box()
+    scenery = [moving_box(x, v=(0, 0, 0, 0, 0, 0)) for x in range(1, 4)]
+    env.add_shapes([*scenery, mover])
+    env._frame_poses()
+
+    stepped = []
+    step_shapes = swift_module.step_shapes
+
+    def recording_step_shapes(dt, v, T, wT, wq, idx=None, substeps=1):
+        stepped.append(idx.tolist())
+        step_shapes(dt, v, T, wT, wq, idx, substeps)
+
+    monkeypatch.setattr(swift_module, "step_shapes", recording_step_shapes)
+    env.step(0.5)
+    assert [env._shape_store.ids[i] for i in stepped[0]] == [3]
+    assert [run[0] for run in env._frame_poses()[0]] == [3]
+
+    # Written to -- back in the next frame (T) and step (v)
+    scenery[0].T = sm.SE3(0, 1, 0).A
+    scenery[1].v = [0, 1.0, 0, 0, 0, 0]
+    env.step(0.5)
+    assert len(stepped[1]) == 2
+    assert [run[0] for run in env._frame_poses()[0]] == [0, 1, 3]
+
+
+def test_callback_shapes_and_linked_shapes_are_stepped_one_by_one():
+    env = make_env()
+    cb_box, parent, child = moving_box(), moving_box(), moving_box()
+    env.add_shape(cb_box, callback=lambda t, values: sm.SE3(0, t, 0))
+    env.add_shapes([parent, child])
+    child.attach_to(parent)
+    child.T = sm.SE3(0, 0, 1).A
+
+    env.step(0.5)
+    assert len(env._shape_store) == 0
+    assert_allclose(cb_box.T[:3, 3], [0, 0.5, 0])
+    assert_allclose(parent._wT[:3, 3], [0.5, 0, 0])
+    assert_allclose(child._wT[:3, 3], [1.0, 0, 1])
+
+
+def test_remove_takes_a_stored_shape_out_of_the_step():
+    env = make_env()
+    kept, removed = moving_box(), moving_box()
+    env.add_shapes([kept, removed])
+
+    env.remove(removed)
+    env.step(0.5)
+    assert env._shape_store.shapes == [kept]
+    assert_allclose(kept.T[:3, 3], [0.5, 0, 0])
+    assert_allclose(removed.T[:3, 3], [0, 0, 0])
+
+
+def test_group_callback_poses_stored_shapes_from_one_array():
+    env = make_env()
+    boxes = [moving_box(x) for x in range(3)]
+    calls = []
+
+    def positions(t, values):
+        calls.append(t)
+        poses = np.tile(np.eye(4), (3, 1, 1))
+        poses[:, :3, 3] = [[i, t, 0] for i in range(3)]
+        poses[2, :3, :3] = sm.SE3.Rz(np.pi / 2).R
+        return poses
+
+    env.add_shapes(boxes, callback=positions)
+    env.step(0.5)
+    assert calls == [0.5] and len(env._shape_store) == 3
+    for i, box in enumerate(boxes):
+        assert_allclose(box.T[:3, 3], [i, 0.5, 0])
+        assert_allclose(box._wT, box.T)
+    assert_allclose(boxes[2]._wq, [0, 0, np.sqrt(0.5), np.sqrt(0.5)])
+    assert [run[0] for run in env._frame_poses()[0]] == [0, 1, 2]
+
+
+def test_group_callback_accepts_t_xyzw_rows():
+    env = make_env()
+    boxes = [moving_box(v=(0, 0, 0, 0, 0, 0)) for _ in range(2)]
+    s = np.sqrt(0.5)
+    env.add_shapes(
+        boxes, callback=lambda t, values: [[1, 2, 3, 0, 0, 0, 2], [0, 0, t, s, 0, 0, s]]
+    )
+
+    env.step(0.25)
+    assert_allclose(boxes[0].T, sm.SE3(1, 2, 3).A)
+    assert_allclose(boxes[0]._wq, [0, 0, 0, 1])
+    assert_allclose(
+        boxes[1].T, (sm.SE3(0, 0, 0.25) * sm.SE3.Rx(np.pi / 2)).A, atol=1e-12
+    )
+
+    env.add_shapes([moving_box()], callback=lambda t, values: np.zeros((2, 7)))
+    with pytest.raises(ValueError, match=r"\(1, 4, 4\) or \(1, 7\)"):
+        env.step(0.25)
+
+
+def test_group_callback_skips_removed_shapes_and_poses_linked_ones():
+    env = make_env()
+    boxes = [moving_box(v=(0, 0, 0, 0, 0, 0)) for _ in range(3)]
+    env.add_shapes(
+        boxes, callback=lambda t, values: [[i, 0, 0, 0, 0, 0, 1] for i in range(3)]
+    )
+    child = moving_box(v=(0, 0, 0, 0, 0, 0))
+    env.add_shape(child)
+    child.attach_to(boxes[2])
+    child.T = sm.SE3(0, 0, 1).A
+
+    env.remove(boxes[0])
+    env.step(0.5)
+    assert_allclose(boxes[0].T[:3, 3], [0, 0, 0])
+    assert_allclose(boxes[1].T[:3, 3], [1, 0, 0])
+    assert_allclose(boxes[2]._wT[:3, 3], [2, 0, 0])
+    assert_allclose(child._wT[:3, 3], [2, 0, 1])
+
+    env.remove(boxes[1])
+    env.remove(boxes[2])
+    assert env.group_callbacks == []